@@ -5,21 +5,18 @@
     Project 1
     Mastermind Game
 """
-from src.mastermind import Mastermind
-from src.error_logger import ErrorLogger
-# the default parameters
-WIDTH = 750
-HEIGHT = 750
-SPEED = 1000
-BUTTON_RADIUS = 26
-MARBLE_RADIUS = 16
-REG_RADIUS = 5
-ROW_INTERVAL = 50
-TITLE = "Mastermind Game"
-COLORS = ["red", "blue", "green", "yellow", "purple", "black"]
-LEADERBOARD_PATH = "src/leaderboard.txt"
-FONT = ("Arial", 18, "normal")
-FONT_COLOR = "blue"
+import argparse
+import sys
+from src.config import MastermindConfig, ConfigError, load_config
+from src.leaderboard import read_leaderboard
+# typing.TYPE_CHECKING without importing typing, which checkers treat
+# alike
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    # the game window and the logger are imported only when they are used
+    from src.error_logger import ErrorLogger
+    from src.mastermind import Mastermind
+# the default parameters are the defaults of MastermindConfig
 CONFIGURATION_PATH = "src/config.txt"
 
 
@@ -29,30 +26,7 @@ call its methods to run and maintain the game.
 """
 
 
-def load_config(path: str) -> dict:
-    """ This function loads the configuration file.
-
-    Args:
-        path (str): the path of the configuration file.
-
-    Returns:
-        dict: a dict of configuration for the game.
-    """
-    config_dict = {}
-    with open(file=path, mode='r') as config:
-        for param in config:
-            # remove "\n"
-            param = param.replace("\n", '')
-            param_name, param_value = param.split('=')
-            # strip the param_name and param_value
-            param_name = param_name.strip(' ')
-            param_value = param_value.strip(' ')
-            # store name and value in config_dict
-            config_dict[param_name] = param_value
-    return config_dict
-
-
-def setup_Mastermind_config(path) -> Mastermind:
+def setup_Mastermind_config(path) -> "Mastermind":
     """ This function create a Mastermind instance based on
     the configuration file or default values.
 
@@ -66,66 +40,45 @@ def setup_Mastermind_config(path) -> Mastermind:
     try:
         # if the configuration file exists, load the configuration file
         config = load_config(path)
-        # pass the configuration parameters to the Mastermind
-        width = int(config["width"])
-        height = int(config["height"])
-        speed = int(config["speed"])
-        button_radius = int(config["button_radius"])
-        marble_radius = int(config["marble_radius"])
-        reg_radius = int(config["reg_radius"])
-        title = config["title"]
-        leaderboard_path = config["leaderboard_path"]
-        colors = config["colors"].replace(' ', '').split(',')
-        font = tuple(config['font'].replace(' ', '').split(','))
-        font_color = config['font_color']
-
-        mastermind = Mastermind(
-            width=width,
-            height=height,
-            title=title,
-            speed=speed,
-            button_radius=button_radius,
-            marble_radius=marble_radius,
-            reg_radius=reg_radius,
-            colors=colors,
-            leaderboard_path=leaderboard_path,
-            font=font,
-            font_color=font_color)
-
-    except FileNotFoundError:
-        # if the configuration file does't exist, load the default parameters
-        width = WIDTH
-        height = HEIGHT
-        speed = SPEED
-        button_radius = BUTTON_RADIUS
-        marble_radius = MARBLE_RADIUS
-        reg_radius = REG_RADIUS
-        title = TITLE
-        colors = COLORS
-        leaderboard_path = LEADERBOARD_PATH
-        font = FONT
-        font_color = FONT_COLOR
-
-        mastermind = Mastermind(
-            width=width,
-            height=height,
-            title=title,
-            speed=speed,
-            button_radius=button_radius,
-            marble_radius=marble_radius,
-            reg_radius=reg_radius,
-            colors=colors,
-            leaderboard_path=leaderboard_path,
-            font=font,
-            font_color=font_color)
-        # raise the configuration file error
-        mastermind.raise_config_error()
+        config_error = False
+    except (FileNotFoundError, ConfigError):
+        # if the configuration file does't exist or is invalid,
+        # load the default parameters
+        config = MastermindConfig()
+        config_error = True
+    # the GUI is imported only when a window is opened
+    from src.mastermind import Mastermind
+    mastermind = Mastermind(**config.mastermind_kwargs())
     # initilize the turtle UI window
     mastermind.initilize_turtle()
+    if config.session_address:
+        # play the game hosted by a session server
+        mastermind.use_remote_session(address=config.session_address)
+    if config.codemaker == "adversary" and not config.session_address:
+        # the secret code is chosen only when the game is over
+        mastermind.use_adversary()
+    if config.recording_dir:
+        # record every game to a session file
+        mastermind.enable_recorder(directory=config.recording_dir)
+    if config.snapshot_path:
+        # save the unfinished game so it can be resumed
+        mastermind.enable_snapshots(path=config.snapshot_path,
+                                    interval=config.snapshot_interval)
+    if config.memory_log:
+        # follow the memory of a window running for hours
+        mastermind.enable_memory_diagnostics(
+            path=config.memory_log, interval=config.memory_interval)
+    if config_error:
+        # raise the configuration file error
+        mastermind.raise_config_error()
+    elif config.hot_reload_interval > 0:
+        # apply later changes of the configuration file to the window
+        mastermind.enable_hot_reload(path=path,
+                                     interval=config.hot_reload_interval)
     return mastermind
 
 
-def get_player_sign_in(Mastermind: Mastermind):
+def get_player_sign_in(Mastermind: "Mastermind"):
     """ This function is to let players sign in the game with
     their names.
 
@@ -138,7 +91,7 @@ def get_player_sign_in(Mastermind: Mastermind):
                              prompt=prompt)
 
 
-def create_Mastermind_ui(Mastermind: Mastermind):
+def create_Mastermind_ui(Mastermind: "Mastermind"):
     """ This function is to create the Mastermind user interface window.
 
     Args:
@@ -148,6 +101,7 @@ def create_Mastermind_ui(Mastermind: Mastermind):
     Mastermind.generate_check_button()
     Mastermind.generate_x_button()
     Mastermind.generate_quit_button()
+    Mastermind.generate_hint_button()
     Mastermind.generate_marbles()
     Mastermind.generate_regs()
     Mastermind.generate_selections()
@@ -155,18 +109,20 @@ def create_Mastermind_ui(Mastermind: Mastermind):
     Mastermind.generate_leaderboard()
 
 
-def start_game_play(Mastermind: Mastermind) -> None:
-    """ This function start the game. At first, it will generate secret code,
-    and then, it will allow players to play the game.
+def start_game_play(Mastermind: "Mastermind") -> None:
+    """ This function start the game. At first, it will resume the saved
+    game or generate secret code, and then, it will allow players to play the
+    game.
 
     Args:
         Mastermind (Mastermind): a Mastermind object.
     """
-    Mastermind.generate_secret_code()
+    if not Mastermind.resume_snapshot():
+        Mastermind.generate_secret_code()
     Mastermind.play()
 
 
-def run_game_maintenance(Mastermind: Mastermind) -> None:
+def run_game_maintenance(Mastermind: "Mastermind") -> None:
     """ This function maint the running of the game.
 
     Args:
@@ -175,12 +131,18 @@ def run_game_maintenance(Mastermind: Mastermind) -> None:
     Mastermind.maintain()
 
 
-def game_exe():
+def game_exe(logger: "ErrorLogger" = None):
     """ This function is to combine all functions above to create a mastermind
     instance, and run a complete game.
+
+    Args:
+        logger (ErrorLogger): the logger capturing the exceptions raised in
+                              the window's event callbacks.
     """
     # initialize the game's configuration
     mastermind = setup_Mastermind_config(path=CONFIGURATION_PATH)
+    if logger is not None:
+        logger.install_tk_hook(mastermind.screen)
     # ask players to sign in the game
     get_player_sign_in(mastermind)
     # generate the game's UI
@@ -191,12 +153,66 @@ def game_exe():
     run_game_maintenance(mastermind)
 
 
+def show_leaderboard() -> None:
+    """ This function prints the leaderboard without opening a window.
+    """
+    try:
+        config = load_config(CONFIGURATION_PATH)
+    except (FileNotFoundError, ConfigError):
+        config = MastermindConfig()
+    for scores, name in read_leaderboard(config.leaderboard_path):
+        print(f"{scores}: {name}")
+
+
+def check_config() -> None:
+    """ This function validates the configuration file without opening a
+    window.
+    """
+    try:
+        print(load_config(CONFIGURATION_PATH))
+    except (FileNotFoundError, ConfigError) as e:
+        raise SystemExit(f"{CONFIGURATION_PATH}: {e}")
+
+
+def play_in_terminal() -> None:
+    """ This function plays the game in the terminal, without opening a
+    window. An invalid configuration file is reported, and the default
+    parameters are used instead, like in the window.
+    """
+    try:
+        config = load_config(CONFIGURATION_PATH)
+    except (FileNotFoundError, ConfigError) as e:
+        print(f"{CONFIGURATION_PATH}: {e}", file=sys.stderr)
+        config = MastermindConfig()
+    # the terminal frontend is imported only when it is played
+    from src.terminal_game import TerminalGame
+    TerminalGame(config).run()
+
+
 def main():
     """ The main function deploys a logger to log any possible
-    issue occurred in the game_exe function.
+    issue occurred in the game_exe function. The headless options
+    never import turtle or tkinter.
     """
-    logger = ErrorLogger()
-    logger.execute_and_log(game_exe)
+    parser = argparse.ArgumentParser(description="Play the Mastermind game.")
+    parser.add_argument("--leaderboard", action="store_true",
+                        help="print the leaderboard and exit")
+    parser.add_argument("--check-config", action="store_true",
+                        help="validate the configuration file and exit")
+    parser.add_argument("--terminal", action="store_true",
+                        help="play in the terminal instead of a window")
+    args = parser.parse_args()
+    if args.leaderboard:
+        show_leaderboard()
+    elif args.check_config:
+        check_config()
+    elif args.terminal:
+        play_in_terminal()
+    else:
+        # the logger is needed only by the window
+        from src.error_logger import ErrorLogger
+        logger = ErrorLogger()
+        logger.execute_and_log(lambda: game_exe(logger=logger))
 
 
 if __name__ == "__main__":
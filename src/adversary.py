@@ -0,0 +1,110 @@
+import random
+from src.code_table import code_table
+from src.game_state import GameState
+from src.mastermind_kernal import MastermindKernal
+
+
+class AdversarialGameState(GameState):
+    """ This class is a GameState whose codemaker does not commit to a
+    secret code. It keeps every code consistent with the feedback given so
+    far, and answers each check with the feedback that keeps the most of
+    them. A concrete secret code is picked only when the game is over.
+
+    Attributes:
+        table (CodeTable): the codes of the game.
+        mask (int): the set of codes consistent with the feedback so far.
+        rng (random.Random): the random generator breaking ties.
+    """
+
+    __slots__ = ("table", "mask", "rng")
+
+    def __init__(self, colors: list, code_length: int = 4,
+                 rounds: int = 10, rng: random.Random = None) -> None:
+        """ Construct all the necessary attributes for AdversarialGameState
+        object.
+
+        Args:
+            colors (list): the colors of the game.
+            code_length (int): the number of colors in a secret code.
+            rounds (int): the number of rounds of the game.
+            rng (random.Random): the random generator breaking ties.
+        """
+        super().__init__(colors=colors, code_length=code_length,
+                         rounds=rounds)
+        self.table = code_table(tuple(colors), code_length)
+        self.mask = self.table.full
+        self.rng = rng or random.Random()
+
+    def generate_secret_code(self) -> list[str]:
+        """ This method is to start a new game where every code is still
+        possible.
+
+        Returns:
+            list[str]: an empty secret code, until the game is over.
+        """
+        self.table = code_table(tuple(self.colors), self.code_length)
+        self.mask = self.table.full
+        self.secret_code = []
+        self.round = 0
+        self.selection_stack = []
+        self.is_win = False
+        self.is_over = False
+        self.history.clear()
+        return self.secret_code
+
+    def check(self) -> MastermindKernal:
+        """ This method is to answer the selections with the feedback that
+        keeps the most codes, preferring any feedback but a win.
+
+        Returns:
+            MastermindKernal: the result of this round, scored against a
+                              code consistent with every feedback.
+        """
+        guess = tuple(self.selection_stack)
+        classes = self.current_table().classes(self.mask, guess)
+        win = (self.code_length, 0)
+        largest = max((codes.bit_count(), feedback != win)
+                      for feedback, codes in classes.items())
+        feedback = self.rng.choice(sorted(
+            feedback for feedback, codes in classes.items()
+            if (codes.bit_count(), feedback != win) == largest))
+        self.mask = classes[feedback]
+        # any remaining code gives this feedback
+        result = MastermindKernal(secret_code=self.witness(),
+                                  picked_colors=self.selection_stack)
+        self.is_win = result.is_win()
+        self.is_over = self.is_win or self.round == self.last_round
+        if self.is_win:
+            self.secret_code = list(guess)
+        elif self.is_over:
+            # commit to any code consistent with every feedback
+            self.secret_code = list(self.rng.choice(
+                self.table.members(self.mask)))
+        self.history.append([self.colors.index(color)
+                             for color in self.selection_stack],
+                            result.get_number_of_correct_position(),
+                            result.get_number_of_wrong_position())
+        return result
+
+    def current_table(self):
+        """ This method is to return the codes of the game over its current
+        colors.
+
+        Returns:
+            CodeTable: the codes of the game.
+        """
+        if self.table.colors != tuple(self.colors):
+            # the colors were relabeled; codes keep their numbers
+            self.table = code_table(tuple(self.colors), self.code_length)
+        return self.table
+
+    def witness(self) -> list[str]:
+        """ This method is to pick a code consistent with every feedback
+        given so far, which replays the game like the secret code picked at
+        its end.
+
+        Returns:
+            list[str]: the first code still possible.
+        """
+        table = self.current_table()
+        return list(table.members(self.mask & -self.mask)[0])
@@ -0,0 +1,273 @@
+import argparse
+import concurrent.futures
+import itertools
+import json
+from collections import Counter
+from src import game_recorder
+from src.game_recorder import CHECK, LOSE, SELECT, UNDO, WIN
+from src.leaderboard import iter_leaderboard
+from src.replay import iter_session_paths
+
+# the resolution of the time-per-round histogram in milliseconds
+TIME_BUCKET = 10
+# the number of session files handed to a worker at once
+BATCH_SIZE = 256
+
+
+class GameAnalytics:
+    """ This class aggregates statistics over recorded sessions and the
+    leaderboard. It only keeps counters whose size is bounded by the number
+    of possible codes and round times, so any amount of history can be
+    streamed through it, and partial results can be merged.
+
+    Attributes:
+        outcomes (Counter): the number of sessions won, lost or unfinished.
+        guess_counts (Counter): the number of guesses of each won session.
+        leaderboard_scores (Counter): the scores on the leaderboard.
+        openings (Counter): the first guess of each session.
+        round_times (Counter): the time of each round, in TIME_BUCKET
+                               milliseconds.
+        secrets (dict): per secret code, [games, won games, guesses].
+        errors (int): the number of unreadable session files.
+    """
+
+    def __init__(self) -> None:
+        """ Construct all the necessary attributes for GameAnalytics object.
+        """
+        self.outcomes = Counter()
+        self.guess_counts = Counter()
+        self.leaderboard_scores = Counter()
+        self.openings = Counter()
+        self.round_times = Counter()
+        self.secrets = {}
+        self.errors = 0
+
+    def add_session(self, path: str) -> None:
+        """ This method is to stream the events of one session file into the
+        statistics.
+
+        Args:
+            path (str): the session file.
+        """
+        try:
+            with open(path, 'rb') as file:
+                session = game_recorder.read_header(file)
+                self.add_events(session, game_recorder.iter_records(file))
+        except (OSError, ValueError):
+            self.errors += 1
+
+    def add_events(self, session: game_recorder.Session, events) -> None:
+        """ This method is to add the events of one session.
+
+        Args:
+            session (Session): the header of the session.
+            events: the (delta, event, color, round, feedback) records.
+        """
+        colors = session.colors
+        guess = []
+        round_time = 0
+        checks = 0
+        outcome = "unfinished"
+        for delta, event, color, _, _ in events:
+            round_time += delta
+            if event == SELECT:
+                guess.append(color)
+            elif event == UNDO and guess:
+                guess.pop()
+            elif event == CHECK:
+                if checks == 0:
+                    self.openings[tuple(colors[index] for index in guess
+                                        if index < len(colors))] += 1
+                checks += 1
+                guess = []
+                self.round_times[round_time // TIME_BUCKET] += 1
+                round_time = 0
+            elif event == WIN:
+                outcome = "win"
+                break
+            elif event == LOSE:
+                outcome = "lose"
+                break
+        self.outcomes[outcome] += 1
+        if outcome == "win":
+            self.guess_counts[checks] += 1
+        if outcome != "unfinished":
+            secret = " ".join(colors[index] for index in session.secret
+                              if index < len(colors))
+            games = self.secrets.setdefault(secret, [0, 0, 0])
+            games[0] += 1
+            games[1] += outcome == "win"
+            games[2] += checks
+
+    def add_leaderboard(self, path: str) -> None:
+        """ This method is to stream the scores of a leaderboard file into
+        the statistics.
+
+        Args:
+            path (str): the leaderboard file.
+        """
+        for scores, _ in iter_leaderboard(path):
+            self.leaderboard_scores[scores] += 1
+
+    def merge(self, other: "GameAnalytics") -> None:
+        """ This method is to add the statistics of another instance.
+
+        Args:
+            other (GameAnalytics): the statistics to be added.
+        """
+        self.outcomes.update(other.outcomes)
+        self.guess_counts.update(other.guess_counts)
+        self.leaderboard_scores.update(other.leaderboard_scores)
+        self.openings.update(other.openings)
+        self.round_times.update(other.round_times)
+        for secret, games in other.secrets.items():
+            totals = self.secrets.setdefault(secret, [0, 0, 0])
+            for index, value in enumerate(games):
+                totals[index] += value
+        self.errors += other.errors
+
+    def round_time_percentile(self, percent: float) -> float:
+        """ This method is to return a percentile of the time per round.
+
+        Args:
+            percent (float): the percentile, from 0 to 100.
+
+        Returns:
+            float: the time in milliseconds, or None without any round.
+        """
+        total = sum(self.round_times.values())
+        if total == 0:
+            return None
+        rank = percent / 100 * (total - 1)
+        seen = 0
+        for bucket in sorted(self.round_times):
+            seen += self.round_times[bucket]
+            if seen > rank:
+                return bucket * TIME_BUCKET
+        return max(self.round_times) * TIME_BUCKET
+
+    def report(self, top: int = 5) -> dict:
+        """ This method is to summarize the statistics.
+
+        Args:
+            top (int): the number of openings and secrets to list.
+
+        Returns:
+            dict: the summary.
+        """
+        finished = self.outcomes["win"] + self.outcomes["lose"]
+        difficulty = sorted(
+            ((games[2] / games[0], 1 - games[1] / games[0], games[0], secret)
+             for secret, games in self.secrets.items()), reverse=True)
+        return {
+            "sessions": sum(self.outcomes.values()),
+            "unreadable": self.errors,
+            "outcomes": dict(self.outcomes),
+            "win_rate": self.outcomes["win"] / finished if finished else None,
+            "guess_counts": dict(sorted(self.guess_counts.items())),
+            "leaderboard_scores": dict(sorted(
+                self.leaderboard_scores.items())),
+            "openings": [[" ".join(guess), count] for guess, count
+                         in self.openings.most_common(top)],
+            "round_time_ms": {f"p{percent}":
+                              self.round_time_percentile(percent)
+                              for percent in (50, 90, 99)},
+            "hardest_secrets": [
+                {"secret": secret, "games": games,
+                 "mean_guesses": round(guesses, 2),
+                 "loss_rate": round(loss_rate, 3)}
+                for guesses, loss_rate, games, secret in difficulty[:top]],
+        }
+
+
+def analyze_batch(paths: list[str]) -> GameAnalytics:
+    """ This function is to aggregate a batch of session files.
+
+    Args:
+        paths (list[str]): the session files.
+
+    Returns:
+        GameAnalytics: the statistics of the batch.
+    """
+    analytics = GameAnalytics()
+    for path in paths:
+        analytics.add_session(path)
+    return analytics
+
+
+def batches(iterable, size: int):
+    """ This function is to split a stream into lists of a given size.
+
+    Args:
+        iterable: the stream.
+        size (int): the size of each list.
+
+    Yields:
+        list: the next batch.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def analyze(paths: list[str], leaderboard_path: str = None,
+            workers: int = 1) -> GameAnalytics:
+    """ This function is to aggregate session files and a leaderboard file,
+    optionally across a pool of processes.
+
+    Args:
+        paths (list[str]): session files or directories of session files.
+        leaderboard_path (str): the leaderboard file, if any.
+        workers (int): the number of processes.
+
+    Returns:
+        GameAnalytics: the statistics.
+    """
+    analytics = GameAnalytics()
+    if workers <= 1:
+        for path in iter_session_paths(paths):
+            analytics.add_session(path)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            # keep a bounded number of batches in flight
+            pending = set()
+            for batch in batches(iter_session_paths(paths), BATCH_SIZE):
+                if len(pending) >= 2 * workers:
+                    done, pending = concurrent.futures.wait(
+                        pending,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        analytics.merge(future.result())
+                pending.add(pool.submit(analyze_batch, batch))
+            for future in concurrent.futures.as_completed(pending):
+                analytics.merge(future.result())
+    if leaderboard_path:
+        analytics.add_leaderboard(leaderboard_path)
+    return analytics
+
+
+def main():
+    """ The main function prints the statistics of recorded sessions and the
+    leaderboard.
+    """
+    parser = argparse.ArgumentParser(
+        description="Report statistics over Mastermind game history.")
+    parser.add_argument("paths", nargs="*",
+                        help="session files or directories")
+    parser.add_argument("--leaderboard", default=None,
+                        help="the leaderboard file")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="the number of processes")
+    parser.add_argument("--top", type=int, default=5,
+                        help="the number of openings and secrets to list")
+    args = parser.parse_args()
+    analytics = analyze(args.paths, leaderboard_path=args.leaderboard,
+                        workers=args.workers)
+    print(json.dumps(analytics.report(top=args.top), indent=2))
+
+
+if __name__ == "__main__":
+    main()
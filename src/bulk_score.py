@@ -0,0 +1,302 @@
+import argparse
+import itertools
+import sys
+from src.code_space import CodeSpace
+from src.code_table import code_table
+from src.config import CODE_LENGTH, ConfigError, MastermindConfig, \
+    load_config
+from src.shared_tables import ScoreTable
+
+# the number of lines read, scored and written at once
+BATCH_SIZE = 65536
+# the largest score table built, in bytes; larger games are scored pair by
+# pair
+TABLE_LIMIT = 1 << 24
+# the line written for a pair that cannot be read
+INVALID = "-"
+# the packed feedback of a pair not scored yet, above any real feedback
+UNKNOWN = 0xFF
+# the boards with at most this many codes, repeats included, have every
+# code read in advance
+PRELOAD_LIMIT = 1 << 16
+
+
+class BulkScorer:
+    """ This class scores (secret, guess) pairs with the rules of
+    MastermindKernal. Each line holds the secret code and the guess,
+    separated by whitespace, and the colors of a code are separated by
+    commas, as color names or as indices in the colors of the game. The
+    codes seen are remembered by their text, so a pair costs a few
+    dictionary lookups instead of building a kernal; on a small board every
+    code is read in advance.
+
+    A code is remembered with its rank among every code, repeats included,
+    its number in the score table, and two bitsets: a bit per position and
+    color, and the bits of its colors at every position. The feedback of
+    two codes of the table is looked up in the score table built once.
+    Otherwise the black pegs are the common bits of the positions of both
+    codes, and the red pegs the positions of the guess whose color is in
+    the secret code, less the black pegs; that feedback is cached by the
+    ranks of the pair while the cache fits in TABLE_LIMIT bytes.
+
+    Attributes:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a code.
+        size (int): the number of codes of the score table.
+        feedback (bytes): the packed feedback of every guess to every code,
+                          or None if the game is too large.
+        index (dict): per code of the table, its number.
+        space (CodeSpace): every code, with repeated colors, by rank.
+        tokens (dict): per color name or index, the number of the color.
+        spread (int): a bit at the first color of every position.
+        codes (dict): per text of a code seen, its rank, its bitsets and
+                      its number in the score table or None.
+        cache (bytearray): per rank of a guess and of a secret code, the
+                           packed feedback or UNKNOWN, or None if there are
+                           too many codes.
+        labels (list): per packed feedback, its output line.
+        invalid (int): the number of lines that could not be read.
+    """
+
+    def __init__(self, colors, code_length: int = CODE_LENGTH) -> None:
+        """ Construct all the necessary attributes for BulkScorer object.
+
+        Args:
+            colors (Iterable[str]): the colors of the game.
+            code_length (int): the number of colors in a code.
+        """
+        self.colors = tuple(colors)
+        self.code_length = code_length
+        table = code_table(self.colors, code_length)
+        self.size = len(table)
+        self.feedback = None
+        if ScoreTable.nbytes(table) <= TABLE_LIMIT:
+            scores = table.scores
+            if scores is None:
+                scores = ScoreTable(self.colors, code_length,
+                                    bytearray(ScoreTable.nbytes(table)))
+                scores.fill()
+            self.feedback = bytes(scores.feedback)
+        self.index = table.index
+        self.space = CodeSpace(self.colors, code_length, repeats=True)
+        self.tokens = {color: number
+                       for number, color in enumerate(self.colors)}
+        self.tokens.update({str(number): number
+                            for number in range(len(self.colors))})
+        self.spread = sum(1 << position * len(self.colors)
+                          for position in range(code_length))
+        self.codes = {}
+        self.cache = None
+        if len(self.space) ** 2 <= TABLE_LIMIT:
+            self.cache = bytearray([UNKNOWN]) * len(self.space) ** 2
+        self.labels = [f"{packed >> 4} {packed & 15}" for packed in range(256)]
+        self.invalid = 0
+        if len(self.space) <= PRELOAD_LIMIT:
+            self.preload()
+
+    def parse(self, text: str) -> tuple:
+        """ This method is to read a code.
+
+        Args:
+            text (str): the colors of the code, separated by commas.
+
+        Raises:
+            ValueError: if the code is not a code of the game.
+
+        Returns:
+            tuple: the colors of the code.
+        """
+        code = []
+        for token in text.split(","):
+            if token.isdigit():
+                if int(token) >= len(self.colors):
+                    raise ValueError(f"bad color index {token}")
+                code.append(self.colors[int(token)])
+            elif token in self.colors:
+                code.append(token)
+            else:
+                raise ValueError(f"unknown color {token!r}")
+        if len(code) != self.code_length:
+            raise ValueError(f"a code has {self.code_length} colors")
+        return tuple(code)
+
+    def remember(self, text: str, numbers: list) -> tuple:
+        """ This method is to remember a code by its text.
+
+        Args:
+            text (str): the colors of the code, separated by commas.
+            numbers (list): the numbers of the colors of the code.
+
+        Returns:
+            tuple: the rank of the code, a bit per position and color, the
+                   bits of its colors at every position, and its number in
+                   the score table or None.
+        """
+        width = len(self.colors)
+        suffixes = self.space.suffixes
+        positions = 0
+        colors = 0
+        rank = 0
+        for position, number in enumerate(numbers):
+            positions |= 1 << (position * width + number)
+            colors |= 1 << number
+            rank += number * suffixes[position + 1]
+        table_number = None
+        if self.feedback is not None:
+            table_number = self.index.get(tuple(self.colors[number]
+                                                for number in numbers))
+        # the colors fit in one position, so the product copies them
+        code = (rank, positions, colors * self.spread, table_number)
+        self.codes[text] = code
+        return code
+
+    def preload(self) -> None:
+        """ This method is to remember every code of the board in advance,
+        by its color names; codes written with color indices are read when
+        they are first seen.
+        """
+        codes = [([], [])]
+        for _ in range(self.code_length):
+            codes = [(names + [color], numbers + [number])
+                     for names, numbers in codes
+                     for number, color in enumerate(self.colors)]
+        for names, numbers in codes:
+            self.remember(",".join(names), numbers)
+
+    def learn(self, text: str) -> tuple:
+        """ This method is to read a code seen for the first time and
+        remember it by its text.
+
+        Args:
+            text (str): the colors of the code, separated by commas.
+
+        Returns:
+            tuple: the code as remembered, or None if the text is not a
+                   code of the game.
+        """
+        try:
+            numbers = [self.tokens[token] for token in text.split(",")]
+        except KeyError:
+            # an index written another way, like "01", or a bad color
+            try:
+                numbers = [self.colors.index(color)
+                           for color in self.parse(text)]
+            except ValueError:
+                return None
+        if len(numbers) != self.code_length:
+            return None
+        return self.remember(text, numbers)
+
+    def read_pair(self, line: str) -> tuple:
+        """ This method is to read a line with a code not seen yet.
+
+        Args:
+            line (str): the secret code and the guess.
+
+        Returns:
+            tuple: the secret code and the guess as remembered, or None if
+                   the line is not a pair of codes of the game.
+        """
+        texts = line.split()
+        if len(texts) != 2:
+            return None
+        secret = self.codes.get(texts[0]) or self.learn(texts[0])
+        guess = self.codes.get(texts[1]) or self.learn(texts[1])
+        if secret is None or guess is None:
+            return None
+        return secret, guess
+
+    def score_batch(self, lines: list[str]) -> list[str]:
+        """ This method is to score a batch of lines.
+
+        Args:
+            lines (list[str]): the lines.
+
+        Returns:
+            list[str]: the black and red pegs of each line, or INVALID.
+        """
+        feedback = self.feedback
+        labels = self.labels
+        size = self.size
+        codes = self.codes
+        cache = self.cache
+        count = len(self.space)
+        results = []
+        for line in lines:
+            try:
+                secret, guess = line.split()
+                secret = codes[secret]
+                guess = codes[guess]
+            except (ValueError, KeyError):
+                pair = self.read_pair(line)
+                if pair is None:
+                    self.invalid += 1
+                    results.append(INVALID)
+                    continue
+                secret, guess = pair
+            if secret[3] is not None and guess[3] is not None:
+                results.append(labels[feedback[guess[3] * size
+                                               + secret[3]]])
+                continue
+            if cache is not None:
+                pair = guess[0] * count + secret[0]
+                packed = cache[pair]
+                if packed != UNKNOWN:
+                    results.append(labels[packed])
+                    continue
+            positions = guess[1]
+            black = (secret[1] & positions).bit_count()
+            # black << 4 | red, where red is the colors found less black
+            packed = 15 * black + (positions & secret[2]).bit_count()
+            if cache is not None:
+                cache[pair] = packed
+            results.append(labels[packed])
+        return results
+
+    def score_stream(self, lines):
+        """ This method is to score a stream of lines batch by batch,
+        without reading it all.
+
+        Args:
+            lines (Iterable[str]): the lines.
+
+        Yields:
+            str: the black and red pegs of each line of a batch, one line
+                 each.
+        """
+        lines = iter(lines)
+        while True:
+            batch = list(itertools.islice(lines, BATCH_SIZE))
+            if not batch:
+                return
+            yield "\n".join(self.score_batch(batch)) + "\n"
+
+
+def main():
+    """ The main function scores the (secret, guess) pairs of a file or of
+    the standard input, and writes the black and red pegs of each pair.
+    """
+    parser = argparse.ArgumentParser(
+        description="Score (secret, guess) pairs, one pair per line.")
+    parser.add_argument("path", nargs="?", default="-",
+                        help="the file of pairs, the standard input by "
+                             "default")
+    parser.add_argument("--config", default="src/config.txt",
+                        help="the configuration file of the game")
+    args = parser.parse_args()
+    try:
+        config = load_config(args.config)
+    except (FileNotFoundError, ConfigError):
+        config = MastermindConfig()
+    scorer = BulkScorer(config.colors, CODE_LENGTH)
+    file = sys.stdin if args.path == "-" else open(args.path)
+    with file:
+        for chunk in scorer.score_stream(file):
+            sys.stdout.write(chunk)
+    if scorer.invalid:
+        print(f"{scorer.invalid} invalid lines", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
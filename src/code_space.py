@@ -0,0 +1,181 @@
+import itertools
+import math
+import random
+
+
+class CodeSpace:
+    """ This class is the set of every code of a game, without building it.
+    The codes are numbered in lexicographic order of their color indices, so
+    a code can be found from its number (unrank) and the other way round
+    (rank), which allows uniform sampling and splitting the space into
+    chunks for workers.
+
+    Attributes:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a code.
+        repeats (bool): if a code may repeat a color.
+    """
+
+    def __init__(self, colors, code_length: int = 4,
+                 repeats: bool = False) -> None:
+        """ Construct all the necessary attributes for CodeSpace object.
+
+        Args:
+            colors (Iterable[str]): the colors of the game.
+            code_length (int): the number of colors in a code.
+            repeats (bool): if a code may repeat a color.
+
+        Raises:
+            ValueError: if there are too few colors for a code.
+        """
+        self.colors = tuple(colors)
+        self.code_length = code_length
+        self.repeats = repeats
+        if not repeats and code_length > len(self.colors):
+            raise ValueError(f"{code_length} distinct colors are needed")
+        # the number of codes completing a prefix of each length
+        self.suffixes = [self.count(code_length - length)
+                         for length in range(code_length + 1)]
+
+    def count(self, length: int) -> int:
+        """ This method is to return the number of ways to complete the last
+        positions of a code.
+
+        Args:
+            length (int): the number of positions to complete.
+
+        Returns:
+            int: the number of completions.
+        """
+        if self.repeats:
+            return len(self.colors) ** length
+        used = self.code_length - length
+        return math.perm(len(self.colors) - used, length)
+
+    def __len__(self) -> int:
+        """ This method is to return the number of codes.
+
+        Returns:
+            int: the number of codes.
+        """
+        return self.suffixes[0]
+
+    def __iter__(self):
+        """ This method is to iterate over every code in order.
+
+        Yields:
+            tuple: the codes.
+        """
+        if self.repeats:
+            return itertools.product(self.colors, repeat=self.code_length)
+        return itertools.permutations(self.colors, self.code_length)
+
+    def unrank(self, number: int) -> tuple:
+        """ This method is to return the code with a number, in time
+        independent of the number of codes.
+
+        Args:
+            number (int): the number of the code.
+
+        Raises:
+            IndexError: if there is no such code.
+
+        Returns:
+            tuple: the code.
+        """
+        if not 0 <= number < len(self):
+            raise IndexError("code number out of range")
+        remaining = list(self.colors)
+        code = []
+        for position in range(self.code_length):
+            digit, number = divmod(number, self.suffixes[position + 1])
+            if self.repeats:
+                code.append(remaining[digit])
+            else:
+                code.append(remaining.pop(digit))
+        return tuple(code)
+
+    def rank(self, code) -> int:
+        """ This method is to return the number of a code.
+
+        Args:
+            code (Sequence[str]): the code.
+
+        Raises:
+            ValueError: if the code is not in the space.
+
+        Returns:
+            int: the number of the code.
+        """
+        if len(code) != self.code_length:
+            raise ValueError(f"a code has {self.code_length} colors")
+        remaining = list(self.colors)
+        number = 0
+        for position, color in enumerate(code):
+            if color not in remaining:
+                raise ValueError(f"{color!r} cannot be at {position}")
+            digit = remaining.index(color)
+            if not self.repeats:
+                remaining.pop(digit)
+            number += digit * self.suffixes[position + 1]
+        return number
+
+    def sample(self, rng: random.Random = None) -> tuple:
+        """ This method is to draw a code uniformly.
+
+        Args:
+            rng (random.Random): the random generator, the shared one of the
+                                 random module by default.
+
+        Returns:
+            tuple: the code.
+        """
+        return self.unrank((rng or random).randrange(len(self)))
+
+    def codes(self, start: int = 0, stop: int = None):
+        """ This method is to iterate over the codes of a range of numbers.
+
+        Args:
+            start (int): the number of the first code.
+            stop (int): the number after the last code, the end by default.
+
+        Yields:
+            tuple: the codes.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start == 0 and stop == len(self):
+            yield from self
+            return
+        for number in range(start, stop):
+            yield self.unrank(number)
+
+    def chunks(self, size: int, start: int = 0, stop: int = None):
+        """ This method is to split a range of numbers into chunks, so each
+        worker can stream the codes of its own chunks.
+
+        Args:
+            size (int): the number of codes per chunk.
+            start (int): the number of the first code.
+            stop (int): the number after the last code, the end by default.
+
+        Yields:
+            tuple: the start and stop numbers of each chunk.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        for first in range(start, stop, size):
+            yield first, min(first + size, stop)
+
+
+def rng_stream(seed: int, worker: int) -> random.Random:
+    """ This function is to return the random generator of a worker. The
+    stream depends only on the seed and the worker, so a parallel run can be
+    reproduced whatever the scheduling of the workers.
+
+    Args:
+        seed (int): the seed of the run.
+        worker (int): the number of the worker.
+
+    Returns:
+        random.Random: the random generator.
+    """
+    return random.Random(f"{seed}/{worker}")
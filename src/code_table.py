@@ -0,0 +1,267 @@
+import functools
+from src.code_space import CodeSpace
+
+# the number of partitions kept by each table
+PARTITION_CACHE_SIZE = 65536
+# the number of smaller tables kept by each table
+SUBSET_CACHE_SIZE = 1024
+# the largest set split by reading the feedback of each code from a score
+# table, larger ones are split faster by bitwise operations
+ROW_SCAN_LIMIT = 48
+
+
+def to_bitset(indices, size: int) -> int:
+    """ This function is to build the integer whose set bits are the given
+    indices.
+
+    Args:
+        indices (Iterable[int]): the indices of the set bits.
+        size (int): the number of bits.
+
+    Returns:
+        int: the bitset.
+    """
+    flags = bytearray(b'0') * size
+    for index in indices:
+        flags[size - 1 - index] = ord('1')
+    return int(flags, 2) if size else 0
+
+
+def count_bits(bitsets: list[int]) -> list[int]:
+    """ This function is to add up bitsets bit by bit. The count of every
+    bit position is kept in binary across the returned planes, so adding a
+    bitset costs a few operations over the whole set.
+
+    Args:
+        bitsets (list[int]): the bitsets to be added up.
+
+    Returns:
+        list[int]: the planes, the lowest bit of the counts first.
+    """
+    planes = []
+    for carry in bitsets:
+        for number, plane in enumerate(planes):
+            planes[number], carry = plane ^ carry, plane & carry
+            if not carry:
+                break
+        if carry:
+            planes.append(carry)
+    return planes
+
+
+def split_counts(planes: list[int], mask: int) -> list[int]:
+    """ This function is to split a set of bits by their count.
+
+    Args:
+        planes (list[int]): the planes returned by count_bits.
+        mask (int): the bits to split.
+
+    Returns:
+        list[int]: per count, the bits of mask with that count.
+    """
+    sets = [mask]
+    for plane in reversed(planes):
+        parts = []
+        for bits in sets:
+            ones = bits & plane
+            parts.append(bits ^ ones)
+            parts.append(ones)
+        sets = parts
+    return sets
+
+
+class CodeTable:
+    """ This class numbers every secret code of a game, and keeps the set of
+    codes having each color at each position as the bits of an integer. A
+    set of candidate codes is an integer too, so the feedback classes of a
+    guess are computed for the whole set at once with bitwise operations,
+    instead of scoring the codes one by one. A table can also number only
+    some of the codes, so that the operations on a few candidates are
+    cheaper.
+
+    Attributes:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        codes (list): the numbered codes, in order of their number.
+        guesses (list): every code that can be guessed.
+        full (int): the set of all numbered codes.
+        scores (ScoreTable): the feedback of every guess to every code, if
+                             it was published, used to split small sets.
+    """
+
+    def __init__(self, colors: tuple, code_length: int = 4,
+                 codes: list = None, guesses: list = None,
+                 bitsets: tuple = None) -> None:
+        """ Construct all the necessary attributes for CodeTable object.
+
+        Args:
+            colors (tuple): the colors of the game.
+            code_length (int): the number of colors in a secret code.
+            codes (list): the codes to be numbered, every code by default.
+            guesses (list): the codes that can be guessed, every code by
+                            default.
+            bitsets (tuple): the at and contains sets of the codes, if they
+                             were built already, like in shared memory.
+        """
+        self.colors = tuple(colors)
+        self.code_length = code_length
+        # the secret code never repeats a color
+        self.guesses = guesses or list(CodeSpace(self.colors, code_length))
+        self.codes = self.guesses if codes is None else codes
+        self.index = {code: number for number, code in enumerate(self.codes)}
+        self.full = (1 << len(self.codes)) - 1
+        self.at, self.contains = bitsets or self.build_bitsets()
+        self.scores = None
+        self.partition = functools.lru_cache(maxsize=PARTITION_CACHE_SIZE)(
+            self.count_classes)
+        self.subset = functools.lru_cache(maxsize=SUBSET_CACHE_SIZE)(
+            self.renumber)
+
+    def __len__(self) -> int:
+        """ This method is to return the number of codes.
+
+        Returns:
+            int: the number of codes.
+        """
+        return len(self.codes)
+
+    def build_bitsets(self) -> tuple:
+        """ This method is to build the set of codes having each color at
+        each position, and the set of codes containing each color.
+
+        Returns:
+            tuple: the sets per (position, color), and per color.
+        """
+        at = {}
+        contains = {color: [] for color in self.colors}
+        for number, code in enumerate(self.codes):
+            for position, color in enumerate(code):
+                at.setdefault((position, color), []).append(number)
+                contains[color].append(number)
+        size = len(self.codes)
+        return ({key: to_bitset(numbers, size)
+                 for key, numbers in at.items()},
+                {color: to_bitset(numbers, size)
+                 for color, numbers in contains.items()})
+
+    def members(self, mask: int) -> list[tuple]:
+        """ This method is to list the codes of a set.
+
+        Args:
+            mask (int): the set of codes.
+
+        Returns:
+            list[tuple]: the codes, in order of their number.
+        """
+        return [self.codes[number]
+                for number, bit in enumerate(bin(mask)[:1:-1]) if bit == '1']
+
+    def renumber(self, mask: int) -> "CodeTable":
+        """ This method is to build a table numbering only the codes of a
+        set. The tables are memoized by the set in self.subset.
+
+        Args:
+            mask (int): the set of codes.
+
+        Returns:
+            CodeTable: the table of the set, whose full set is mask.
+        """
+        return CodeTable(self.colors, self.code_length,
+                         codes=self.members(mask), guesses=self.guesses)
+
+    def classes(self, mask: int, guess: tuple) -> dict[tuple, int]:
+        """ This method is to split a set of codes by the feedback each code
+        would give to a guess.
+
+        Args:
+            mask (int): the set of codes.
+            guess (tuple): the guessed code, without repeated colors.
+
+        Returns:
+            dict[tuple, int]: per (black, red) feedback, the set of codes.
+        """
+        if self.scores is not None and mask.bit_count() <= ROW_SCAN_LIMIT:
+            return self.scores.classes(mask, self.index[guess])
+        black = count_bits([self.at.get((position, color), 0)
+                            for position, color in enumerate(guess)])
+        common = count_bits([self.contains.get(color, 0)
+                             for color in guess])
+        # a guess color found in the secret code is black or red
+        common_sets = split_counts(common, mask)
+        result = {}
+        for blacks, black_set in enumerate(split_counts(black, mask)):
+            if not black_set:
+                continue
+            for number in range(blacks, len(common_sets)):
+                feedback_set = black_set & common_sets[number]
+                if feedback_set:
+                    result[(blacks, number - blacks)] = feedback_set
+        return result
+
+    def count_classes(self, mask: int, guess: tuple) -> dict[tuple, int]:
+        """ This method is to count the codes of a set by the feedback each
+        code would give to a guess. The results are memoized by the set and
+        the guess in self.partition.
+
+        Args:
+            mask (int): the set of codes.
+            guess (tuple): the guessed code, without repeated colors.
+
+        Returns:
+            dict[tuple, int]: per (black, red) feedback, the number of codes.
+        """
+        return {feedback: feedback_set.bit_count()
+                for feedback, feedback_set in self.classes(mask,
+                                                           guess).items()}
+
+
+# the number of games whose table is kept
+TABLE_CACHE_SIZE = 16
+# the tables of the games of this process, the oldest first
+_tables = {}
+
+
+def install_table(table: CodeTable) -> None:
+    """ This function is to make a table built elsewhere, like from shared
+    memory, the shared table of its game in this process.
+
+    Args:
+        table (CodeTable): the table of every code of a game.
+    """
+    key = (table.colors, table.code_length)
+    _tables.pop(key, None)
+    if len(_tables) >= TABLE_CACHE_SIZE:
+        # forget the oldest game
+        _tables.pop(next(iter(_tables)))
+    _tables[key] = table
+
+
+def has_table(colors: tuple, code_length: int = 4) -> bool:
+    """ This function is to check if the table of a game is built already.
+
+    Args:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+
+    Returns:
+        bool: True if code_table returns it without building it.
+    """
+    return (tuple(colors), code_length) in _tables
+
+
+def code_table(colors: tuple, code_length: int = 4) -> CodeTable:
+    """ This function is to return the shared table of a game, built the
+    first time it is needed.
+
+    Args:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+
+    Returns:
+        CodeTable: the table of the game.
+    """
+    table = _tables.get((tuple(colors), code_length))
+    if table is None:
+        table = CodeTable(colors, code_length)
+        install_table(table)
+    return table
@@ -0,0 +1,276 @@
+import dataclasses
+import os
+
+# the fields that change the layout of the window; they are never reloaded
+GEOMETRY_FIELDS = ("width", "height", "speed", "button_radius",
+                   "marble_radius", "reg_radius", "row_interval", "title")
+# the number of colors in a secret code
+CODE_LENGTH = 4
+# how the secret code is chosen
+CODEMAKERS = ("random", "adversary")
+
+
+class ConfigError(ValueError):
+    """ This class is raised when the configuration file has an invalid
+    line or value.
+    """
+
+
+@dataclasses.dataclass(frozen=True)
+class MastermindConfig:
+    """ This class holds the typed configuration of the game. The default
+    values are used for any parameter missing in the configuration file.
+
+    Attributes:
+        width (int): The width of the UI window.
+        height (int): The height of the UI window.
+        speed (int): The speed of the turtle that creates the UI window.
+        button_radius (int): The radius of the button (check_button,
+                             X_button).
+        marble_radius (int): The radius of the big circles in the UI window.
+        reg_radius (int): The radius of the small circles in the UI window.
+        row_interval (int): The vertical interval of each row.
+        title (str): The title of the UI window.
+        colors (tuple): The colors for generating secret code and for
+                        players to pick from.
+        leaderboard_path (str): Path to the leaderboard file.
+        font (tuple): The font settings for text in the game.
+        font_color (str): The font's color for text in the game.
+        leaderboard_address (str): Address of a shared leaderboard service,
+                                   None to use the leaderboard file only.
+        hot_reload_interval (int): The milliseconds between two checks of
+                                   the configuration file, 0 to disable.
+        recording_dir (str): The directory of the recorded game sessions,
+                             None to disable recording.
+        session_address (str): Address of a session server hosting the
+                               game, None to play locally.
+        snapshot_path (str): Path to the snapshot of the unfinished game,
+                             None to disable snapshots.
+        snapshot_interval (int): The milliseconds between two snapshots.
+        codemaker (str): "random" to fix the secret code at the start, or
+                         "adversary" to delay it as long as possible.
+        memory_log (str): Path to the memory samples of the window, None
+                          to disable memory diagnostics.
+        memory_interval (int): The milliseconds between two memory samples.
+    """
+    width: int = 750
+    height: int = 750
+    speed: int = 1000
+    button_radius: int = 26
+    marble_radius: int = 16
+    reg_radius: int = 5
+    row_interval: int = 50
+    title: str = "Mastermind Game"
+    colors: tuple = ("red", "blue", "green", "yellow", "purple", "black")
+    leaderboard_path: str = "src/leaderboard.txt"
+    font: tuple = ("Arial", 18, "normal")
+    font_color: str = "blue"
+    leaderboard_address: str = None
+    hot_reload_interval: int = 0
+    recording_dir: str = None
+    session_address: str = None
+    snapshot_path: str = None
+    snapshot_interval: int = 1000
+    codemaker: str = "random"
+    memory_log: str = None
+    memory_interval: int = 60000
+
+    def __post_init__(self) -> None:
+        """ This method is to validate the configuration.
+
+        Raises:
+            ConfigError: if any value is out of range.
+        """
+        for name in ("width", "height", "speed", "button_radius",
+                     "marble_radius", "reg_radius", "row_interval"):
+            if getattr(self, name) <= 0:
+                raise ConfigError(f"{name} must be positive")
+        if self.hot_reload_interval < 0:
+            raise ConfigError("hot_reload_interval must not be negative")
+        if self.snapshot_interval <= 0:
+            raise ConfigError("snapshot_interval must be positive")
+        if self.memory_interval <= 0:
+            raise ConfigError("memory_interval must be positive")
+        if self.codemaker not in CODEMAKERS:
+            raise ConfigError(f"codemaker must be one of {CODEMAKERS}")
+        if len(set(self.colors)) != len(self.colors):
+            raise ConfigError("colors must not repeat")
+        if len(self.colors) < CODE_LENGTH:
+            raise ConfigError(f"at least {CODE_LENGTH} colors are needed")
+        if len(self.font) != 3:
+            raise ConfigError("font must be: family, size, style")
+
+    def mastermind_kwargs(self) -> dict:
+        """ This method is to return the arguments of the Mastermind
+        constructor.
+
+        Returns:
+            dict: the keyword arguments for Mastermind.
+        """
+        kwargs = dataclasses.asdict(self)
+        kwargs.pop("hot_reload_interval")
+        kwargs.pop("recording_dir")
+        kwargs.pop("session_address")
+        kwargs.pop("snapshot_path")
+        kwargs.pop("snapshot_interval")
+        kwargs.pop("codemaker")
+        kwargs.pop("memory_log")
+        kwargs.pop("memory_interval")
+        kwargs["colors"] = list(self.colors)
+        return kwargs
+
+
+def to_int(text: str) -> int:
+    """ This function is to convert an integer parameter.
+
+    Args:
+        text (str): the text of the parameter.
+
+    Returns:
+        int: the value of the parameter.
+    """
+    return int(text)
+
+
+def to_optional(text: str) -> str:
+    """ This function is to convert an optional parameter, like an address
+    or a directory, where an empty value or "none" disables the feature.
+
+    Args:
+        text (str): the text of the parameter.
+
+    Returns:
+        str: the value or None.
+    """
+    if text == "" or text.lower() == "none":
+        return None
+    return text
+
+
+def to_colors(text: str) -> tuple:
+    """ This function is to convert a comma-separated list of colors.
+
+    Args:
+        text (str): the text of the parameter, like "red, blue, green".
+
+    Returns:
+        tuple: the colors.
+    """
+    return tuple(color.strip() for color in text.split(',') if color.strip())
+
+
+def to_font(text: str) -> tuple:
+    """ This function is to convert a font, like "Arial, 18, normal".
+
+    Args:
+        text (str): the text of the parameter.
+
+    Returns:
+        tuple: the font family, its size and style.
+    """
+    family, size, style = (part.strip() for part in text.split(','))
+    return (family, int(size), style)
+
+
+# the converter of each parameter in the configuration file
+CONVERTERS = {
+    "width": to_int,
+    "height": to_int,
+    "speed": to_int,
+    "button_radius": to_int,
+    "marble_radius": to_int,
+    "reg_radius": to_int,
+    "row_interval": to_int,
+    "title": str,
+    "colors": to_colors,
+    "leaderboard_path": str,
+    "font": to_font,
+    "font_color": str,
+    "leaderboard_address": to_optional,
+    "hot_reload_interval": to_int,
+    "recording_dir": to_optional,
+    "session_address": to_optional,
+    "snapshot_path": to_optional,
+    "snapshot_interval": to_int,
+    "codemaker": str,
+    "memory_log": to_optional,
+    "memory_interval": to_int,
+}
+
+# path -> (mtime, size, MastermindConfig) of the configuration files parsed
+_cache = {}
+
+
+def parse_config(text: str) -> MastermindConfig:
+    """ This function is to parse the text of a configuration file. Each line
+    is "name = value"; blank lines and lines starting with "#" are skipped,
+    and the value may contain "=".
+
+    Args:
+        text (str): the text of the configuration file.
+
+    Raises:
+        ConfigError: if a line or a value is invalid.
+
+    Returns:
+        MastermindConfig: the configuration, with defaults for missing
+                          parameters.
+    """
+    values = {}
+    for number, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if '=' not in line:
+            raise ConfigError(f"line {number}: expected 'name = value'")
+        name, value = (part.strip() for part in line.split('=', 1))
+        if name not in CONVERTERS:
+            # unknown parameters are ignored for forward compatibility
+            continue
+        try:
+            values[name] = CONVERTERS[name](value)
+        except ValueError:
+            raise ConfigError(f"line {number}: invalid {name}: {value!r}")
+    return MastermindConfig(**values)
+
+
+def load_config(path: str) -> MastermindConfig:
+    """ This function is to load the configuration file. The parsed result
+    is cached and reused as long as the file is not modified.
+
+    Args:
+        path (str): the path of the configuration file.
+
+    Raises:
+        FileNotFoundError: if the configuration file does not exist.
+        ConfigError: if the configuration file is invalid.
+
+    Returns:
+        MastermindConfig: the configuration of the game.
+    """
+    status = os.stat(path)
+    key = os.path.abspath(path)
+    cached = _cache.get(key)
+    if cached is not None and cached[:2] == (status.st_mtime_ns,
+                                             status.st_size):
+        return cached[2]
+    with open(file=path, mode='r') as config:
+        result = parse_config(config.read())
+    _cache[key] = (status.st_mtime_ns, status.st_size, result)
+    return result
+
+
+def config_mtime(path: str) -> int:
+    """ This function is to return the modification time of a configuration
+    file, or None if it does not exist.
+
+    Args:
+        path (str): the path of the configuration file.
+
+    Returns:
+        int: the modification time in nanoseconds.
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
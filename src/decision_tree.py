@@ -0,0 +1,149 @@
+import functools
+import json
+import os
+from src.code_table import code_table
+from src.config import CODE_LENGTH
+from src.opening_book import BOOK_DIR, DEFAULT_STRATEGY, book_key, \
+    shipped_book
+
+TREE_VERSION = 1
+# the objective of the optimal tree that plays each solver strategy
+TREE_OBJECTIVES = {"minimax": "worst", "expected": "expected",
+                   "entropy": "expected"}
+
+
+def tree_path(directory: str, colors: list, code_length: int,
+              objective: str) -> str:
+    """ This function is to return the path of an optimal decision tree.
+    Trees are named apart from the opening books, since their files differ.
+
+    Args:
+        directory (str): the directory of the trees and books.
+        colors (list): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        objective (str): "expected" or "worst".
+
+    Returns:
+        str: the path of the tree file.
+    """
+    key = book_key(colors, code_length, f"optimal-{objective}")
+    return os.path.join(directory, f"tree-{key}.json")
+
+
+class DecisionTree:
+    """ This class answers every guess of a game from an optimal decision
+    tree, without any search. It can be given to a Solver as its book, and
+    is by default when the tree of the game is shipped.
+
+    Attributes:
+        colors (list): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        tree (list): the decision tree.
+        key (str): the hash of the configuration of the tree, if known.
+    """
+
+    def __init__(self, colors: list, code_length: int, tree: list,
+                 key: str = None) -> None:
+        """ Construct all the necessary attributes for DecisionTree object.
+
+        Args:
+            colors (list): the colors of the game.
+            code_length (int): the number of colors in a secret code.
+            tree (list): the decision tree.
+            key (str): the hash of the configuration of the tree, if known.
+        """
+        self.colors = list(colors)
+        self.code_length = code_length
+        self.tree = tree
+        self.key = key
+
+    @classmethod
+    def load(cls, path: str) -> "DecisionTree":
+        """ This method is to read a tree file.
+
+        Args:
+            path (str): the path of the tree file.
+
+        Returns:
+            DecisionTree: the tree, or None if the file is missing or
+                          invalid.
+        """
+        try:
+            with open(path) as file:
+                result = json.load(file)
+            if result["v"] != TREE_VERSION:
+                return None
+            return cls(result["colors"], result["code_length"],
+                       result["tree"], result.get("key"))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def lookup(self, history) -> tuple:
+        """ This method is to return the tree's guess after the guesses so
+        far, if they all followed the tree.
+
+        Args:
+            history (Iterable[tuple]): the guess and the black and red pegs
+                                       of each round so far.
+
+        Returns:
+            tuple: the guess, or None if the game left the tree.
+        """
+        guesses = code_table(tuple(self.colors), self.code_length).guesses
+        node = self.tree
+        for guess, black, red in history:
+            if node is None or guesses[node[0]] != tuple(guess):
+                return None
+            node = next((subtree for branch_black, branch_red, subtree
+                         in node[1]
+                         if (branch_black, branch_red) == (black, red)),
+                        None)
+        return None if node is None else guesses[node[0]]
+
+
+@functools.lru_cache(maxsize=16)
+def load_tree(colors: tuple, code_length: int = CODE_LENGTH,
+              objective: str = "expected",
+              directory: str = BOOK_DIR) -> DecisionTree:
+    """ This function is to return the shared optimal decision tree of a
+    configuration.
+
+    Args:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        objective (str): "expected" or "worst".
+        directory (str): the directory of the trees.
+
+    Returns:
+        DecisionTree: the tree, or None if it is missing, invalid or built
+                      for another configuration.
+    """
+    path = tree_path(directory, colors, code_length, objective)
+    tree = DecisionTree.load(path)
+    if tree is None or tree.key != book_key(colors, code_length,
+                                            f"optimal-{objective}"):
+        return None
+    return tree
+
+
+def default_book(colors: tuple, code_length: int = CODE_LENGTH,
+                 strategy: str = DEFAULT_STRATEGY,
+                 directory: str = BOOK_DIR):
+    """ This function is to return what answers the guesses of a strategy
+    without search: the optimal decision tree of the game if it is shipped,
+    otherwise the opening book of the strategy if it is shipped.
+
+    Args:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        strategy (str): the solver strategy.
+        directory (str): the directory of the trees and books.
+
+    Returns:
+        DecisionTree or OpeningBook: the tree or the book, or None.
+    """
+    tree = load_tree(tuple(colors), code_length, TREE_OBJECTIVES[strategy],
+                     directory)
+    if tree is not None:
+        return tree
+    return shipped_book(tuple(colors), code_length, strategy, directory)
@@ -1,14 +1,160 @@
-from datetime import date
+import json
+import logging
+import logging.handlers
+import queue
+import time
+import traceback
+
+# the logger of the game; other modules log under "mastermind.<name>"
+LOGGER_NAME = "mastermind"
+# one JSON record per line; the plain-text records written before stay in
+# src/mastermind_errors.err
+ERROR_LOG_PATH = "src/mastermind_errors.jsonl"
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """ This class formats each log record as one line of JSON with its
+    timestamp, level, message, extra fields and full traceback. The extra
+    fields are nested under their own key, so they never replace the keys
+    of the record.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """ This method is to convert a log record into a line of JSON.
+
+        Args:
+            record (logging.LogRecord): the record to be formatted.
+
+        Returns:
+            str: the JSON text of the record.
+        """
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S",
+                                  time.localtime(record.created))
+            + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry["fields"] = fields
+        if record.exc_info:
+            entry["traceback"] = "".join(
+                traceback.format_exception(*record.exc_info))
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """ This class puts log records on a queue as they are. The records are
+    formatted by the writer thread, so logging costs the caller little more
+    than a queue put.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """ This method is to return the record without formatting it.
+
+        Args:
+            record (logging.LogRecord): the record to be queued.
+
+        Returns:
+            logging.LogRecord: the same record.
+        """
+        return record
 
 
 class ErrorLogger:
-    """ This class is to log errors.
+    """ This class is to log errors and game events. Records are queued by
+    the game and written by a background thread to a JSON-lines file that
+    rotates when it gets too large.
+
+    Attributes:
+        path (str): the path of the log file.
+        max_bytes (int): the size of the log file that starts a new file.
+        backup_count (int): the number of rotated files to keep.
+        level (int): the lowest level of the records to be written.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, path: str = ERROR_LOG_PATH,
+                 max_bytes: int = 1024 * 1024, backup_count: int = 3,
+                 level: int = logging.INFO) -> None:
         """ Construct all necessary attributes for ErrorLogger object.
+
+        Args:
+            path (str): the path of the log file.
+            max_bytes (int): the size of the log file that starts a new file.
+            backup_count (int): the number of rotated files to keep.
+            level (int): the lowest level of the records to be written.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.level = level
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.queue = queue.SimpleQueue()
+        self.queue_handler = NonBlockingQueueHandler(self.queue)
+        self.listener = None
+
+    def start(self) -> None:
+        """ This method is to start the writer thread and route the game's
+        records to it.
+        """
+        if self.listener is not None:
+            return
+        file_handler = logging.handlers.RotatingFileHandler(
+            self.path, maxBytes=self.max_bytes,
+            backupCount=self.backup_count, delay=True)
+        file_handler.setFormatter(JsonLinesFormatter())
+        self.listener = logging.handlers.QueueListener(self.queue,
+                                                       file_handler)
+        self.listener.start()
+        self.logger.addHandler(self.queue_handler)
+        self.logger.setLevel(self.level)
+        self.logger.propagate = False
+
+    def stop(self) -> None:
+        """ This method is to write the queued records and stop the writer
+        thread.
+        """
+        if self.listener is None:
+            return
+        self.logger.removeHandler(self.queue_handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        self.listener = None
+
+    def log_event(self, event: str, **fields) -> None:
+        """ This method is to log a game event with its fields.
+
+        Args:
+            event (str): the name of the event.
+            fields: the details of the event.
+        """
+        self.logger.info(event, extra={"fields": fields})
+
+    def report_callback_exception(self, exc_type, exc_value,
+                                  exc_traceback) -> None:
+        """ This method is to log an exception raised in a Tk callback,
+        such as a click on the turtle screen. The game keeps running.
+
+        Args:
+            exc_type: the class of the exception.
+            exc_value: the exception.
+            exc_traceback: the traceback of the exception.
+        """
+        self.logger.error("Exception in Tk callback: %s", exc_value,
+                          exc_info=(exc_type, exc_value, exc_traceback))
+
+    def install_tk_hook(self, screen) -> None:
+        """ This method is to capture the exceptions raised in the event
+        callbacks of a turtle screen.
+
+        Args:
+            screen (turtle.Screen): the screen of the game.
         """
-        self.day = date.today()
+        root = screen.getcanvas().winfo_toplevel()
+        root.report_callback_exception = self.report_callback_exception
 
     def execute_and_log(self, fun) -> None:
         """ This method is to execute a function and log errors from
@@ -17,12 +163,12 @@ class ErrorLogger:
         Args:
             fun: a particular function need to be executed and logged.
         """
+        self.start()
         try:
             # execute the function
             fun()
         except Exception as e:
             # if any error is raised
-            with open(file="src/mastermind_errors.err",
-                      mode='a') as error_file:
-                error_file.write(f"{self.day}: \n")
-                error_file.write(f"Exception occurred: {e}\n\n")
+            self.logger.exception("Exception occurred: %s", e)
+        finally:
+            self.stop()
@@ -0,0 +1,280 @@
+import os
+import struct
+import time
+
+# the file header: magic, version, number of colors, number of pegs and the
+# wall-clock start time; the color names and the secret code follow it, the
+# secret code being NONE bytes until an adversary picks it at the game's end
+MAGIC = b"MMRC"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBd")
+# each event: milliseconds since the last event, event type, color index,
+# round and feedback (black pegs in the high 4 bits, red pegs in the low 4)
+RECORD = struct.Struct("<IBBBB")
+# the value of a field that does not apply to an event
+NONE = 0xFF
+BUFFER_SIZE = 64 * 1024
+SESSION_SUFFIX = ".mmr"
+
+# the event types
+SELECT = 1
+UNDO = 2
+CHECK = 3
+WIN = 4
+LOSE = 5
+EVENT_NAMES = {SELECT: "select", UNDO: "undo", CHECK: "check",
+               WIN: "win", LOSE: "lose"}
+
+
+def pack_feedback(black: int, red: int) -> int:
+    """ This function is to pack the black and red pegs into one byte.
+
+    Args:
+        black (int): the number of colors in the correct position.
+        red (int): the number of colors in the wrong position.
+
+    Returns:
+        int: the packed feedback.
+    """
+    return (black << 4) | red
+
+
+def unpack_feedback(feedback: int) -> tuple[int, int]:
+    """ This function is to unpack a feedback byte into black and red pegs.
+
+    Args:
+        feedback (int): the packed feedback.
+
+    Returns:
+        tuple[int, int]: the black pegs and the red pegs.
+    """
+    return feedback >> 4, feedback & 0x0F
+
+
+class GameRecorder:
+    """ This class records the events of game sessions as fixed-width binary
+    records. Each session is written to its own file in a directory through
+    a buffered stream, and is flushed when the game ends.
+
+    Attributes:
+        directory (str): the directory of the session files.
+        path (str): the file of the current session.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """ Construct all the necessary attributes for GameRecorder object.
+
+        Args:
+            directory (str): the directory of the session files.
+        """
+        self.directory = directory
+        self.path = None
+        self.file = None
+        self.last_time = 0.0
+        # the offset of a secret code not picked yet in the header
+        self.secret_offset = None
+
+    def start(self, colors: list, secret_code: list,
+              code_length: int = None) -> None:
+        """ This method is to start recording a new session. A codemaker
+        that picks its secret code at the end of the game starts with an
+        empty secret code, which is written when the session is closed.
+
+        Args:
+            colors (list): the colors of the game.
+            secret_code (list): the secret code of the session, or an empty
+                                list if it is not picked yet.
+            code_length (int): the number of colors in the secret code, if
+                               it is not picked yet.
+        """
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(
+            self.directory,
+            f"session-{time.time_ns()}-{os.getpid()}{SESSION_SUFFIX}")
+        self.file = open(self.path, 'wb', buffering=BUFFER_SIZE)
+        if secret_code:
+            code_length = len(secret_code)
+        header = [HEADER.pack(MAGIC, VERSION, len(colors), code_length,
+                              time.time())]
+        for color in colors:
+            name = color.encode()
+            header.append(bytes([len(name)]) + name)
+        if secret_code:
+            self.secret_offset = None
+            header.append(bytes(colors.index(color)
+                                for color in secret_code))
+        else:
+            self.secret_offset = sum(len(part) for part in header)
+            header.append(bytes([NONE] * code_length))
+        self.file.write(b"".join(header))
+        self.last_time = time.perf_counter()
+
+    def record(self, event: int, color: int = NONE,
+               round_index: int = NONE, feedback: int = NONE) -> None:
+        """ This method is to append one event to the current session.
+
+        Args:
+            event (int): the event type, like SELECT or CHECK.
+            color (int): the index of the color of the event.
+            round_index (int): the round of the event.
+            feedback (int): the packed feedback of a check.
+        """
+        if self.file is None:
+            return
+        now = time.perf_counter()
+        delta = min(int((now - self.last_time) * 1000), 0xFFFFFFFF)
+        self.last_time = now
+        self.file.write(RECORD.pack(delta, event, color, round_index,
+                                     feedback))
+
+    def close(self, secret: list = None) -> None:
+        """ This method is to flush and close the current session.
+
+        Args:
+            secret (list): the indices of the colors of the secret code
+                           picked at the end of the game, if the session
+                           started without one.
+        """
+        if self.file is None:
+            return
+        if secret and self.secret_offset is not None:
+            self.file.seek(self.secret_offset)
+            self.file.write(bytes(secret))
+            self.secret_offset = None
+        self.file.close()
+        self.file = None
+
+
+class Session:
+    """ This class holds a recorded session read from a file.
+
+    Attributes:
+        path (str): the file of the session.
+        colors (list): the colors of the game.
+        secret (tuple): the indices of the colors of the secret code.
+        start_time (float): the wall-clock time the session started.
+        records (bytes): the fixed-width event records.
+    """
+
+    def __init__(self, path: str, colors: list, secret: tuple,
+                 start_time: float, records: bytes) -> None:
+        """ Construct all the necessary attributes for Session object.
+
+        Args:
+            path (str): the file of the session.
+            colors (list): the colors of the game.
+            secret (tuple): the indices of the colors of the secret code.
+            start_time (float): the wall-clock time the session started.
+            records (bytes): the fixed-width event records.
+        """
+        self.path = path
+        self.colors = colors
+        self.secret = secret
+        self.start_time = start_time
+        self.records = records
+
+    def events(self):
+        """ This method is to iterate over the events of the session.
+
+        Yields:
+            tuple: (milliseconds since the last event, event type, color
+                   index, round, packed feedback).
+        """
+        usable = len(self.records) - len(self.records) % RECORD.size
+        return RECORD.iter_unpack(memoryview(self.records)[:usable])
+
+
+def parse_session(data: bytes, path: str = None) -> Session:
+    """ This function is to parse the content of a session file.
+
+    Args:
+        data (bytes): the content of the session file.
+        path (str): the file of the session.
+
+    Raises:
+        ValueError: if the data is not a recorded session.
+
+    Returns:
+        Session: the recorded session.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path}: truncated session header")
+    magic, version, color_number, peg_number, start_time = \
+        HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a recorded session")
+    offset = HEADER.size
+    colors = []
+    for _ in range(color_number):
+        if offset >= len(data):
+            raise ValueError(f"{path}: truncated session header")
+        length = data[offset]
+        colors.append(data[offset + 1:offset + 1 + length].decode())
+        offset += 1 + length
+    secret = tuple(data[offset:offset + peg_number])
+    if len(secret) != peg_number:
+        raise ValueError(f"{path}: truncated session header")
+    if NONE in secret:
+        # the game was cut off before its codemaker picked a secret code
+        raise ValueError(f"{path}: the secret code was never picked")
+    offset += peg_number
+    return Session(path, colors, secret, start_time, data[offset:])
+
+
+def read_header(file) -> Session:
+    """ This function is to read the header of a session file, leaving the
+    file at its first event.
+
+    Args:
+        file: the session file opened in binary mode.
+
+    Raises:
+        ValueError: if the file is not a recorded session.
+
+    Returns:
+        Session: the session without its records.
+    """
+    data = file.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise ValueError(f"{file.name}: truncated session header")
+    color_number = data[5]
+    for _ in range(color_number):
+        length = file.read(1)
+        data += length + file.read(length[0] if length else 0)
+    data += file.read(data[6])
+    return parse_session(data, file.name)
+
+
+def iter_records(file, chunk_records: int = 4096):
+    """ This function is to stream the events of a session file in chunks,
+    so a long session never has to be loaded at once.
+
+    Args:
+        file: the session file positioned at its first event.
+        chunk_records (int): the number of events read at once.
+
+    Yields:
+        tuple: (milliseconds since the last event, event type, color
+               index, round, packed feedback).
+    """
+    size = RECORD.size * chunk_records
+    while True:
+        chunk = file.read(size)
+        usable = len(chunk) - len(chunk) % RECORD.size
+        yield from RECORD.iter_unpack(memoryview(chunk)[:usable])
+        if len(chunk) < size:
+            return
+
+
+def read_session(path: str) -> Session:
+    """ This function is to read a session file.
+
+    Args:
+        path (str): the file of the session.
+
+    Returns:
+        Session: the recorded session.
+    """
+    with open(path, 'rb') as file:
+        return parse_session(file.read(), path)
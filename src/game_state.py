@@ -0,0 +1,134 @@
+from src.code_space import CodeSpace
+from src.mastermind_kernal import MastermindKernal
+from src.round_history import RoundHistory
+
+
+class GameState:
+    """ This class holds the state of one Mastermind game without any UI:
+    the secret code, the current round and the players' selections. It
+    applies the same rules as the clicks on the game window.
+
+    Attributes:
+        colors (list): The colors for generating secret code and for
+                       players to pick from.
+        code_length (int): The number of colors in a secret code.
+        last_round (int): The index of the last round.
+        secret_code (list): The secret code of the game.
+        round (int): The current playing round, starting by 0.
+        selection_stack (list): The players' selections at this round.
+        is_win (bool): If the players found the secret code.
+        is_over (bool): If the game has been won or lost.
+        history (RoundHistory): The guess and the black and red pegs of
+                                each checked round.
+    """
+
+    __slots__ = ("colors", "code_length", "last_round", "secret_code",
+                 "round", "selection_stack", "is_win", "is_over", "history")
+
+    def __init__(self, colors: list, code_length: int = 4,
+                 rounds: int = 10) -> None:
+        """ Construct all the necessary attributes for GameState object.
+
+        Args:
+            colors (list): The colors for generating secret code and for
+                           players to pick from.
+            code_length (int): The number of colors in a secret code.
+            rounds (int): The number of rounds of the game.
+        """
+        self.colors = colors
+        self.code_length = code_length
+        self.last_round = rounds - 1
+        self.secret_code = []
+        self.round = 0
+        self.selection_stack = []
+        self.is_win = False
+        self.is_over = False
+        self.history = RoundHistory(capacity=rounds,
+                                    code_length=code_length)
+
+    def generate_secret_code(self) -> list[str]:
+        """ This method is to start a new game with a new secret code. It
+        draws the number of a code uniformly and unranks it, so every
+        ordering of the colors is possible and no list of codes is built.
+
+        Returns:
+            list[str]: a secret code list consists of 4 colors.
+        """
+        space = CodeSpace(self.colors, self.code_length)
+        self.secret_code = list(space.sample())
+        self.round = 0
+        self.selection_stack = []
+        self.is_win = False
+        self.is_over = False
+        self.history.clear()
+        return self.secret_code
+
+    def can_select(self, color: str) -> bool:
+        """ This method is to check if a color can be selected.
+
+        Args:
+            color (str): the color to be selected.
+
+        Returns:
+            bool: True if the color is not selected yet and the row is not
+                  full.
+        """
+        return (not self.is_over
+                and len(self.selection_stack) < self.code_length
+                and color not in self.selection_stack)
+
+    def select(self, color: str) -> bool:
+        """ This method is to append a color to the selections.
+
+        Args:
+            color (str): the color to be selected.
+
+        Returns:
+            bool: True if the color was selected.
+        """
+        if not self.can_select(color):
+            return False
+        self.selection_stack.append(color)
+        return True
+
+    def undo(self) -> str:
+        """ This method is to cancel the last selection.
+
+        Returns:
+            str: the cancelled color, or None if nothing was selected.
+        """
+        if self.is_over or not self.selection_stack:
+            return None
+        return self.selection_stack.pop()
+
+    def can_check(self) -> bool:
+        """ This method is to check if the selections can be checked.
+
+        Returns:
+            bool: True if the row is full.
+        """
+        return (not self.is_over
+                and len(self.selection_stack) == self.code_length)
+
+    def check(self) -> MastermindKernal:
+        """ This method is to compare the selections with the secret code.
+        The game is over if the players win or if this is the last round.
+
+        Returns:
+            MastermindKernal: the result of this round.
+        """
+        result = MastermindKernal(secret_code=self.secret_code,
+                                  picked_colors=self.selection_stack)
+        self.is_win = result.is_win()
+        self.is_over = self.is_win or self.round == self.last_round
+        self.history.append([self.colors.index(color)
+                             for color in self.selection_stack],
+                            result.get_number_of_correct_position(),
+                            result.get_number_of_wrong_position())
+        return result
+
+    def next_round(self) -> None:
+        """ This method is to move to the next round with empty selections.
+        """
+        self.round += 1
+        self.selection_stack = []
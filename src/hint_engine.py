@@ -0,0 +1,189 @@
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from src.code_table import code_table
+from src.decision_tree import TREE_OBJECTIVES, load_tree
+from src.opening_book import DEFAULT_STRATEGY, load_book
+from src.solver import STRATEGIES
+from src.symmetry import canonical, free_colors
+
+logger = logging.getLogger("mastermind.hint")
+
+# the milliseconds a hint may be searched for
+HINT_BUDGET_MS = 50
+
+
+class HintEngine:
+    """ This class suggests the next guess of a game among the codes that
+    are still consistent with the feedback so far. The search is anytime:
+    the candidates are rated one by one until the time budget is spent, and
+    the best one rated so far is suggested. When the optimal decision tree
+    of the game is shipped and the game followed it so far, its guess is
+    suggested at once, even if it cannot be the secret code, since it wins
+    sooner.
+
+    Attributes:
+        colors (list): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        strategy (str): the solver strategy rating the candidates.
+        budget (float): the seconds a hint may be searched for.
+        book (OpeningBook): the book answering the first guesses.
+        tree (DecisionTree): the optimal decision tree, if shipped.
+    """
+
+    def __init__(self, colors: list, code_length: int = 4,
+                 strategy: str = DEFAULT_STRATEGY,
+                 budget_ms: float = HINT_BUDGET_MS) -> None:
+        """ Construct all the necessary attributes for HintEngine object.
+
+        Args:
+            colors (list): the colors of the game.
+            code_length (int): the number of colors in a secret code.
+            strategy (str): the solver strategy rating the candidates.
+            budget_ms (float): the milliseconds a hint may be searched for.
+        """
+        self.colors = list(colors)
+        self.code_length = code_length
+        self.strategy = strategy
+        self.budget = budget_ms / 1000
+        self.book = load_book(tuple(self.colors), code_length, strategy)
+        self.tree = load_tree(tuple(self.colors), code_length,
+                              TREE_OBJECTIVES[strategy])
+
+    def candidates(self, history) -> int:
+        """ This method is to return the codes consistent with the feedback
+        so far.
+
+        Args:
+            history (Iterable[tuple]): the guess and the black and red pegs
+                                       of each round so far.
+
+        Returns:
+            int: the set of candidates of the game's code table.
+        """
+        table = code_table(tuple(self.colors), self.code_length)
+        mask = table.full
+        for guess, black, red in history:
+            mask = table.classes(mask, tuple(guess)).get((black, red), 0)
+        return mask
+
+    def suggest(self, history) -> tuple:
+        """ This method is to suggest the next guess within the time budget.
+        The budget also covers building the code table and filtering the
+        candidates, and once it is spent the first candidate is suggested
+        even if none was rated.
+
+        Args:
+            history (Iterable[tuple]): the guess and the black and red pegs
+                                       of each round so far.
+
+        Returns:
+            tuple: the suggested guess, or None if no code is consistent
+                   with the feedback.
+        """
+        # the clock starts before the table is built, which is the slowest
+        # step of a large board
+        deadline = time.perf_counter() + self.budget
+        history = list(history)
+        table = code_table(tuple(self.colors), self.code_length)
+        mask = self.candidates(history)
+        if not mask:
+            return None
+        if self.tree is not None:
+            guess = self.tree.lookup(history)
+            if guess is not None:
+                return guess
+        booked = self.book.lookup(history)
+        if booked is not None and mask >> table.index[booked] & 1:
+            return booked
+        rate = STRATEGIES[self.strategy]
+        free = free_colors(self.colors, (guess for guess, _, _ in history))
+        seen = set()
+        best = None
+        best_rating = None
+        for guess in table.members(mask):
+            if time.perf_counter() > deadline:
+                if best is None:
+                    best = guess
+                break
+            # candidates equivalent under the free colors rate the same
+            representative = canonical(guess, free)
+            if representative in seen:
+                continue
+            seen.add(representative)
+            rating = rate(list(table.partition(mask, guess).values()))
+            if best_rating is None or rating < best_rating:
+                best, best_rating = guess, rating
+        return best
+
+
+class HintWorker:
+    """ This class computes hints on a worker thread, so the window's event
+    loop keeps running while a hint is searched. The engine is built on the
+    worker thread too, since loading its book and tree takes a while. The
+    window collects the result with poll.
+
+    Attributes:
+        build (Callable[[], HintEngine]): the function building the engine.
+        engine (HintEngine): the engine computing the hints, None until the
+                             first hint is requested.
+        results (queue.Queue): the computed hints and their request tags.
+        busy (bool): if a hint is being computed.
+    """
+
+    def __init__(self, build: Callable[[], HintEngine]) -> None:
+        """ Construct all the necessary attributes for HintWorker object.
+
+        Args:
+            build (Callable[[], HintEngine]): the function building the
+                                              engine, called on the worker
+                                              thread by the first request.
+        """
+        self.build = build
+        self.engine = None
+        self.results = queue.Queue()
+        self.busy = False
+
+    def request(self, history, tag=None) -> bool:
+        """ This method is to start computing a hint.
+
+        Args:
+            history (Iterable[tuple]): the guess and the black and red pegs
+                                       of each round so far.
+            tag: a value returned with the hint, like the round it is for.
+
+        Returns:
+            bool: False if a hint is already being computed.
+        """
+        if self.busy:
+            return False
+        self.busy = True
+        history = list(history)
+
+        def work():
+            try:
+                if self.engine is None:
+                    self.engine = self.build()
+                hint = self.engine.suggest(history)
+            except Exception:
+                logger.exception("hint failed")
+                hint = None
+            self.results.put((tag, hint))
+
+        threading.Thread(target=work, daemon=True).start()
+        return True
+
+    def poll(self) -> tuple:
+        """ This method is to collect the computed hint, if it is ready.
+
+        Returns:
+            tuple: the tag and the hint, or None if it is not ready.
+        """
+        try:
+            result = self.results.get_nowait()
+        except queue.Empty:
+            return None
+        self.busy = False
+        return result
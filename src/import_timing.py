@@ -0,0 +1,63 @@
+import argparse
+import statistics
+import subprocess
+import sys
+
+# the modules of each start-up path
+PATHS = {
+    "headless": ["mastermind_game", "src.config", "src.leaderboard",
+                 "src.mastermind_kernal", "src.leaderboard_client"],
+    "terminal": ["mastermind_game", "src.terminal_game"],
+    "gui": ["mastermind_game", "src.mastermind", "turtle"],
+}
+
+# the code run in a fresh interpreter for each measurement
+PROBE = """
+import sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(elapsed, "tkinter" in sys.modules)
+"""
+
+
+def measure(modules: list[str], runs: int = 10) -> tuple[float, bool]:
+    """ This function is to measure the time of importing some modules in
+    fresh interpreters.
+
+    Args:
+        modules (list[str]): the modules to import.
+        runs (int): the number of interpreters to start.
+
+    Returns:
+        tuple[float, bool]: the median import time in milliseconds, and if
+                            tkinter was imported.
+    """
+    times = []
+    loads_tkinter = False
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(modules=modules)],
+            capture_output=True, text=True, check=True).stdout.split()
+        times.append(float(output[0]) * 1000)
+        loads_tkinter = output[1] == "True"
+    return statistics.median(times), loads_tkinter
+
+
+def main():
+    """ The main function prints the import time of each start-up path.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure the import time of the game's start-up paths.")
+    parser.add_argument("--runs", type=int, default=10,
+                        help="the number of fresh interpreters per path")
+    args = parser.parse_args()
+    for path, modules in PATHS.items():
+        milliseconds, loads_tkinter = measure(modules, runs=args.runs)
+        print(f"{path:>10}: {milliseconds:7.1f} ms  "
+              f"tkinter={'yes' if loads_tkinter else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
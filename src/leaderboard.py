@@ -0,0 +1,78 @@
+import heapq
+
+# the number of leaders displayed on the leaderboard
+LEADERBOARD_SIZE = 5
+
+
+def parse_leaderboard_line(line: str) -> tuple[int, str]:
+    """ This function is to convert one line of the leaderboard file into
+    a tuple of scores and name.
+
+        i.e. "5: Tong Cai\n" -> (5, "Tong Cai")
+
+    Args:
+        line (str): one line of the leaderboard file.
+
+    Returns:
+        tuple[int, str]: the scores and the name, or None if the line is not
+                         a leaderboard record.
+    """
+    if ":" not in line:
+        return None
+    scores, name = line.split(':', 1)
+    try:
+        scores = int(scores)
+    except ValueError:
+        return None
+    # drop any "\n" and space around name
+    return (scores, name.strip())
+
+
+def iter_leaderboard(path: str):
+    """ This function is to stream the records of the leaderboard file
+    one by one without loading the whole file.
+
+    Args:
+        path (str): the path of the leaderboard file.
+
+    Yields:
+        tuple[int, str]: the scores and the name of each record.
+    """
+    with open(path, 'r') as leaders:
+        for line in leaders:
+            leader = parse_leaderboard_line(line)
+            if leader is not None:
+                yield leader
+
+
+def read_leaderboard(path: str,
+                     top: int = LEADERBOARD_SIZE) -> list[tuple[int, str]]:
+    """ This function is to read the leaderboard file and return the best
+    players in ascending order of scores. Players with the same scores keep
+    their order in the file.
+
+        i.e. [(3, "Tong Cai"), (5, "Jenny Yi"), ......]
+
+    Args:
+        path (str): the path of the leaderboard file.
+        top (int): the number of players to return.
+
+    Returns:
+        list[tuple[int, str]]: a list consists of tuple elements. Each
+                               element is a tuple with scores and name.
+    """
+    return heapq.nsmallest(top, iter_leaderboard(path), key=lambda x: x[0])
+
+
+def write_leaderboard(path: str, leaders: list[tuple[int, str]]) -> None:
+    """ This function is to append a batch of records to the leaderboard
+    file with a single write. The text will be saved like:
+    "5: Tong Cai", "3: Jenny Yi"......
+
+    Args:
+        path (str): the path of the leaderboard file.
+        leaders (list[tuple[int, str]]): the scores and names to be saved.
+    """
+    text = "".join(f"{scores}: {name}\n" for scores, name in leaders)
+    with open(path, 'a') as file:
+        file.write(text)
@@ -0,0 +1,138 @@
+import time
+from src import leaderboard
+from src.leaderboard import LEADERBOARD_SIZE
+
+
+class LeaderboardClient:
+    """ This class is the game's side of the leaderboard service. It reuses
+    one connection for all requests. After a failure, it stops trying the
+    service for a while so that the game falls back to the local file
+    without waiting on every call.
+
+    Attributes:
+        address (str): the address of the leaderboard service.
+        retry_interval (float): the seconds to wait before trying the
+                                service again after a failure.
+    """
+
+    def __init__(self, address: str, timeout: float = 0.5,
+                 retry_interval: float = 5.0) -> None:
+        """ Construct all the necessary attributes for LeaderboardClient
+        object.
+
+        Args:
+            address (str): the address of the leaderboard service.
+            timeout (float): the timeout of connecting and of each request.
+            retry_interval (float): the seconds to wait before trying the
+                                    service again after a failure.
+        """
+        # the socket modules are imported only when there is a service
+        from src import protocol
+        self.address = address
+        self.retry_interval = retry_interval
+        self.connection = protocol.LineClient(address, timeout=timeout)
+        self.down_until = 0.0
+
+    def request(self, message: dict) -> dict:
+        """ This method is to send a request unless the service recently
+        failed.
+
+        Args:
+            message (dict): the request.
+
+        Raises:
+            ConnectionError: if the service is unreachable.
+            RuntimeError: if the service rejected the request.
+
+        Returns:
+            dict: the reply.
+        """
+        if time.monotonic() < self.down_until:
+            raise ConnectionError("leaderboard service is unavailable")
+        try:
+            reply = self.connection.request(message)
+        except OSError:
+            self.down_until = time.monotonic() + self.retry_interval
+            raise
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    def top(self, k: int = LEADERBOARD_SIZE) -> list[tuple[int, str]]:
+        """ This method is to read the best k records from the service.
+
+        Args:
+            k (int): the number of records.
+
+        Returns:
+            list[tuple[int, str]]: the scores and names of the best players.
+        """
+        reply = self.request({"op": "top", "k": k})
+        return [(scores, name) for scores, name in reply["leaders"]]
+
+    def add(self, scores: int, name: str) -> None:
+        """ This method is to send a record to the service. It is sent once:
+        if the reply is lost, the record is not sent again.
+
+        Args:
+            scores (int): the scores of the player.
+            name (str): the name of the player.
+
+        Raises:
+            NoReplyError: if the record was sent but not acknowledged.
+            RuntimeError: if the service rejected the record.
+        """
+        self.request({"op": "add", "score": scores, "name": name})
+
+    def close(self) -> None:
+        """ This method is to close the connection.
+        """
+        self.connection.close()
+
+
+def read_leaders(path: str,
+                 client: LeaderboardClient = None) -> list[tuple[int, str]]:
+    """ This function is to read the best players, from the shared
+    leaderboard service if there is one, otherwise from the leaderboard file.
+
+    Args:
+        path (str): the path of the leaderboard file.
+        client (LeaderboardClient): the client of the service, or None.
+
+    Returns:
+        list[tuple[int, str]]: the scores and names of the best players in
+                               ascending order of scores.
+    """
+    if client is not None:
+        try:
+            return client.top(LEADERBOARD_SIZE)
+        except (OSError, RuntimeError):
+            # the service is unreachable or failing, use the local file
+            pass
+    return leaderboard.read_leaderboard(path, top=LEADERBOARD_SIZE)
+
+
+def save_score(path: str, scores: int, name: str,
+               client: LeaderboardClient = None) -> None:
+    """ This function is to save the scores of a player, to the shared
+    leaderboard service if there is one, otherwise to the leaderboard file.
+
+    Args:
+        path (str): the path of the leaderboard file.
+        scores (int): the scores of the player.
+        name (str): the name of the player.
+        client (LeaderboardClient): the client of the service, or None.
+    """
+    if client is not None:
+        from src import protocol
+        try:
+            client.add(scores, name)
+            return
+        except protocol.NoReplyError:
+            # the service may have saved the record before the reply was
+            # lost, so it is not written a second time
+            return
+        except (OSError, RuntimeError):
+            # the record did not reach the service, or was rejected
+            pass
+    leaderboard.write_leaderboard(path, [(scores, name)])
@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import bisect
+import itertools
+import logging
+import os
+from src import protocol
+from src.leaderboard import LEADERBOARD_SIZE, iter_leaderboard, \
+    write_leaderboard
+
+logger = logging.getLogger("mastermind.leaderboard")
+
+
+class LeaderboardServer:
+    """ This class serves one leaderboard file to many game clients over a
+    local TCP port or Unix socket. The best records are kept in memory, and
+    new records are collected and appended to the file in batches.
+
+    The protocol is one JSON message per line:
+        {"op": "top", "k": 5}                  -> {"leaders": [[3, "Tong"]]}
+        {"op": "add", "score": 3, "name": "A"} -> {"ok": true}
+
+    Attributes:
+        path (str): the path of the leaderboard file.
+        capacity (int): the number of best records kept in memory.
+        flush_interval (float): the seconds between two disk commits.
+        batch_size (int): the number of pending records that forces an
+                          early disk commit.
+    """
+
+    def __init__(self, path: str, capacity: int = 1000,
+                 flush_interval: float = 0.05,
+                 batch_size: int = 512) -> None:
+        """ Construct all the necessary attributes for LeaderboardServer
+        object.
+
+        Args:
+            path (str): the path of the leaderboard file.
+            capacity (int): the number of best records kept in memory.
+            flush_interval (float): the seconds between two disk commits.
+            batch_size (int): the number of pending records that forces an
+                              early disk commit.
+        """
+        self.path = path
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # sorted (scores, sequence, name); the sequence keeps ties in order
+        self.leaders = []
+        self.sequence = itertools.count()
+        # records waiting for the next disk commit
+        self.pending = []
+        self.flush_needed = asyncio.Event()
+        self.server = None
+        self.flusher = None
+        self.commits = 0
+
+    def load(self) -> None:
+        """ This method is to load the best records of the leaderboard file
+        into memory.
+        """
+        try:
+            for scores, name in iter_leaderboard(self.path):
+                self.insert(scores, name)
+        except FileNotFoundError:
+            # the file will be created by the first commit
+            pass
+
+    def insert(self, scores: int, name: str) -> None:
+        """ This method is to insert one record into the in-memory
+        leaderboard, dropping the worst record beyond the capacity.
+
+        Args:
+            scores (int): the scores of the player.
+            name (str): the name of the player.
+        """
+        if len(self.leaders) >= self.capacity and \
+                scores >= self.leaders[-1][0]:
+            return
+        bisect.insort(self.leaders, (scores, next(self.sequence), name))
+        if len(self.leaders) > self.capacity:
+            self.leaders.pop()
+
+    def top(self, k: int = LEADERBOARD_SIZE) -> list[tuple[int, str]]:
+        """ This method is to return the best k records.
+
+        Args:
+            k (int): the number of records.
+
+        Returns:
+            list[tuple[int, str]]: the scores and names of the best players.
+        """
+        return [(scores, name) for scores, _, name in self.leaders[:k]]
+
+    def add(self, scores: int, name: str) -> None:
+        """ This method is to add a record. It is visible to "top" at once
+        and written to the file by the next commit.
+
+        Args:
+            scores (int): the scores of the player.
+            name (str): the name of the player.
+        """
+        self.insert(scores, name)
+        self.pending.append((scores, name))
+        if len(self.pending) >= self.batch_size:
+            self.flush_needed.set()
+
+    async def commit(self) -> None:
+        """ This method is to append all pending records to the file with
+        one write, off the event loop. If the write fails, the records are
+        put back in front of the ones added meanwhile, for the next commit.
+
+        Raises:
+            OSError: if the file cannot be written.
+        """
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, write_leaderboard, self.path,
+                                       batch)
+        except OSError:
+            self.pending = batch + self.pending
+            raise
+        self.commits += 1
+
+    async def run_flusher(self) -> None:
+        """ This method is to commit the pending records periodically, or
+        earlier when a full batch is waiting.
+        """
+        while True:
+            try:
+                await asyncio.wait_for(self.flush_needed.wait(),
+                                       timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.flush_needed.clear()
+            try:
+                await self.commit()
+            except OSError as e:
+                # the records stay pending until the file can be written
+                logger.error("leaderboard commit failed: %s", e,
+                             extra={"fields": {"pending":
+                                               len(self.pending)}})
+
+    def handle(self, message: dict) -> dict:
+        """ This method is to answer one request.
+
+        Args:
+            message (dict): the request.
+
+        Returns:
+            dict: the reply.
+        """
+        op = message.get("op")
+        if op == "top":
+            k = int(message.get("k", LEADERBOARD_SIZE))
+            return {"leaders": self.top(min(max(k, 0), self.capacity))}
+        if op == "add":
+            self.add(int(message["score"]), str(message["name"]))
+            return {"ok": True}
+        if op == "ping":
+            return {"ok": True}
+        return {"error": f"unknown op: {op}"}
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """ This method is to serve all requests of one connection.
+
+        Args:
+            reader (asyncio.StreamReader): the reading end of the connection.
+            writer (asyncio.StreamWriter): the writing end of the connection.
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # the rest of an over-long line cannot be told apart
+                    # from the next request, so the connection is closed
+                    writer.write(protocol.encode(
+                        {"error": "the line is too long"}))
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    reply = self.handle(protocol.decode(line))
+                except (ValueError, KeyError, TypeError,
+                        OverflowError) as e:
+                    reply = {"error": str(e)}
+                writer.write(protocol.encode(reply))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, address: str) -> None:
+        """ This method is to load the leaderboard and start serving.
+
+        Args:
+            address (str): "unix:<path>", "<host>:<port>" or "<port>".
+        """
+        self.load()
+        self.flusher = asyncio.create_task(self.run_flusher())
+        self.server = await protocol.start_server(self.handle_client,
+                                                  address)
+
+    async def close(self) -> None:
+        """ This method is to stop serving and commit the pending records.
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.flusher is not None:
+            self.flusher.cancel()
+            try:
+                await self.flusher
+            except asyncio.CancelledError:
+                pass
+        await self.commit()
+
+
+async def serve(path: str, address: str) -> None:
+    """ This function is to run a leaderboard server until interrupted.
+
+    Args:
+        path (str): the path of the leaderboard file.
+        address (str): the address to listen on.
+    """
+    server = LeaderboardServer(path=path)
+    await server.start(address)
+    print(f"Serving {path} on {address}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+        kind, *where = protocol.parse_address(address)
+        if kind == "unix" and os.path.exists(where[0]):
+            os.remove(where[0])
+
+
+def main():
+    """ The main function starts the leaderboard server from the command
+    line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Serve a shared Mastermind leaderboard.")
+    parser.add_argument("--path", default="src/leaderboard.txt",
+                        help="the leaderboard file")
+    parser.add_argument("--address", default="127.0.0.1:8765",
+                        help='"unix:<path>", "<host>:<port>" or "<port>"')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.path, args.address))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
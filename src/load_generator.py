@@ -0,0 +1,353 @@
+import argparse
+import asyncio
+import concurrent.futures
+import functools
+import json
+import platform
+import random
+import time
+from src import protocol
+from src.solver import Solver, STRATEGIES
+
+# the operations whose latency is reported
+OPERATIONS = ("new", "select", "undo", "check", "close")
+
+
+class RateLimiter:
+    """ This class spaces the requests of all players evenly to a target
+    rate. A rate of 0 sends requests as fast as possible.
+
+    Attributes:
+        rate (float): the requests per second of all players together.
+    """
+
+    def __init__(self, rate: float) -> None:
+        """ Construct all the necessary attributes for RateLimiter object.
+
+        Args:
+            rate (float): the requests per second of all players together.
+        """
+        self.rate = rate
+        self.next_time = time.perf_counter()
+
+    async def wait(self) -> None:
+        """ This method is to wait for the next free slot.
+        """
+        if self.rate <= 0:
+            return
+        now = time.perf_counter()
+        self.next_time = max(self.next_time, now) + 1 / self.rate
+        delay = self.next_time - 1 / self.rate - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class LoadReport:
+    """ This class collects the latency of each request and the games played.
+
+    Attributes:
+        latencies (dict): per operation, the latencies in milliseconds.
+        games (int): the number of games finished.
+        wins (int): the number of games won.
+        errors (int): the number of failed requests.
+    """
+
+    def __init__(self) -> None:
+        """ Construct all the necessary attributes for LoadReport object.
+        """
+        self.latencies = {op: [] for op in OPERATIONS}
+        self.games = 0
+        self.wins = 0
+        self.errors = 0
+
+    def summary(self, elapsed: float) -> dict:
+        """ This method is to summarize throughput and latency percentiles.
+
+        Args:
+            elapsed (float): the seconds of the run.
+
+        Returns:
+            dict: the summary.
+        """
+        operations = {}
+        for op, latencies in self.latencies.items():
+            if not latencies:
+                continue
+            latencies.sort()
+            operations[op] = {
+                "count": len(latencies),
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+                "max_ms": round(latencies[-1], 3),
+            }
+        requests = sum(len(latencies)
+                       for latencies in self.latencies.values())
+        return {
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 1),
+            "games": self.games,
+            "wins": self.wins,
+            "errors": self.errors,
+            "operations": operations,
+        }
+
+
+def percentile(ordered: list[float], percent: float) -> float:
+    """ This function is to return a percentile of sorted values by the
+    nearest-rank method.
+
+    Args:
+        ordered (list[float]): the sorted values.
+        percent (float): the percentile, from 0 to 100.
+
+    Returns:
+        float: the percentile.
+    """
+    rank = max(0, min(len(ordered) - 1,
+                      round(percent / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+async def request(reader, writer, message: dict, report: LoadReport,
+                  limiter: RateLimiter) -> dict:
+    """ This function is to send one request and record its latency. Only
+    the round trip is timed, not the wait for the rate limiter. A lost
+    connection, or a reply that cannot be read, is counted as an error.
+
+    Args:
+        reader: the reading end of the connection.
+        writer: the writing end of the connection.
+        message (dict): the request.
+        report (LoadReport): the report of the run.
+        limiter (RateLimiter): the limiter of the request rate.
+
+    Raises:
+        ConnectionError: if the connection was lost.
+
+    Returns:
+        dict: the reply.
+    """
+    await limiter.wait()
+    start = time.perf_counter()
+    try:
+        writer.write(protocol.encode(message))
+        await writer.drain()
+        # an empty line means the server closed the connection
+        reply = protocol.decode(await reader.readline())
+    except (ConnectionError, ValueError) as error:
+        report.errors += 1
+        raise ConnectionResetError("the connection was lost") from error
+    report.latencies[message["op"]].append(
+        (time.perf_counter() - start) * 1000)
+    if "error" in reply:
+        report.errors += 1
+    return reply
+
+
+async def play(address: str, mode: str, seed: int, deadline: float,
+               report: LoadReport, limiter: RateLimiter,
+               executor: concurrent.futures.Executor = None) -> None:
+    """ This function is to play games until the deadline as one player.
+    The solver runs on the executor, so that its turns do not hold up the
+    event loop, and the requests of the other players, while they are timed.
+    A lost connection ends this player only.
+
+    Args:
+        address (str): the address of the session server.
+        mode (str): "random", "solver" or a solver strategy.
+        seed (int): the seed of the player's random choices.
+        deadline (float): the perf_counter time to stop at.
+        report (LoadReport): the report of the run.
+        limiter (RateLimiter): the limiter of the request rate.
+        executor (concurrent.futures.Executor): the executor running the
+                                                solver, the loop's default
+                                                one if None.
+    """
+    loop = asyncio.get_running_loop()
+    rng = random.Random(seed)
+    reader, writer = await protocol.open_connection(address)
+    try:
+        while time.perf_counter() < deadline:
+            reply = await request(reader, writer, {"op": "new"}, report,
+                                  limiter)
+            session = reply["session"]
+            connected = True
+            try:
+                await play_game(reader, writer, session, reply["colors"],
+                                mode, rng, deadline, report, limiter,
+                                loop, executor)
+            except ConnectionError:
+                connected = False
+                raise
+            finally:
+                # a game cut off by the deadline is closed too, so the
+                # server does not keep it until it is evicted
+                if connected:
+                    await request(reader, writer,
+                                  {"op": "close", "session": session},
+                                  report, limiter)
+    except ConnectionError:
+        # the error was counted, the other players keep playing
+        pass
+    finally:
+        writer.close()
+
+
+async def play_game(reader, writer, session: str, colors: list, mode: str,
+                    rng: random.Random, deadline: float, report: LoadReport,
+                    limiter: RateLimiter, loop: asyncio.AbstractEventLoop,
+                    executor: concurrent.futures.Executor) -> None:
+    """ This function is to play one game of a session until it is over or
+    the deadline is reached.
+
+    Args:
+        reader: the reading end of the connection.
+        writer: the writing end of the connection.
+        session (str): the identifier of the session.
+        colors (list): the colors of the game.
+        mode (str): "random", "solver" or a solver strategy.
+        rng (random.Random): the player's random generator.
+        deadline (float): the perf_counter time to stop at.
+        report (LoadReport): the report of the run.
+        limiter (RateLimiter): the limiter of the request rate.
+        loop (asyncio.AbstractEventLoop): the running event loop.
+        executor (concurrent.futures.Executor): the executor running the
+                                                solver.
+    """
+    solver = None
+    if mode != "random":
+        # "solver" guesses any consistent code
+        solver = await loop.run_in_executor(executor, functools.partial(
+            Solver, colors, rng=rng,
+            strategy=mode if mode in STRATEGIES else "random"))
+    over = False
+    while not over and time.perf_counter() < deadline:
+        if solver is not None:
+            guess = await loop.run_in_executor(executor, solver.next_guess)
+        else:
+            guess = rng.sample(colors, 4)
+        for color in guess:
+            await request(reader, writer,
+                          {"op": "select", "session": session,
+                           "color": color}, report, limiter)
+            if solver is None and rng.random() < 0.1:
+                # a random player changes its mind now and then
+                await request(reader, writer,
+                              {"op": "undo", "session": session},
+                              report, limiter)
+                await request(reader, writer,
+                              {"op": "select", "session": session,
+                               "color": color}, report, limiter)
+        reply = await request(reader, writer,
+                              {"op": "check", "session": session},
+                              report, limiter)
+        if "error" in reply:
+            break
+        over = reply["over"]
+        if solver is not None and not over:
+            await loop.run_in_executor(executor, solver.update, tuple(guess),
+                                       reply["black"], reply["red"])
+    if over:
+        report.games += 1
+        report.wins += reply["win"]
+
+
+async def run(address: str, players: int, mode: str, duration: float,
+              rate: float, seed: int) -> dict:
+    """ This function is to simulate concurrent players against a session
+    server and report the results.
+
+    Args:
+        address (str): the address of the session server.
+        players (int): the number of concurrent players.
+        mode (str): "random", "solver" or a solver strategy.
+        duration (float): the seconds of the run.
+        rate (float): the requests per second of all players, 0 for as
+                      fast as possible.
+        seed (int): the seed of the players' random choices.
+
+    Returns:
+        dict: the settings and results of the run.
+    """
+    report = LoadReport()
+    limiter = RateLimiter(rate)
+    start = time.perf_counter()
+    deadline = start + duration
+    # one thread runs the solver turns of every player, so they compete
+    # with the event loop for the interpreter one at a time
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        await asyncio.gather(*(play(address, mode, seed + player, deadline,
+                                    report, limiter, executor)
+                               for player in range(players)))
+    elapsed = time.perf_counter() - start
+    return {
+        "settings": {"address": address, "players": players, "mode": mode,
+                     "duration_s": duration, "rate_rps": rate, "seed": seed,
+                     "python": platform.python_version(),
+                     "machine": platform.machine()},
+        "results": report.summary(elapsed),
+    }
+
+
+def compare(previous: dict, current: dict) -> list[str]:
+    """ This function is to describe the changes between two runs.
+
+    Args:
+        previous (dict): the earlier run.
+        current (dict): the later run.
+
+    Returns:
+        list[str]: one line per compared figure.
+    """
+    lines = []
+    before, after = previous["results"], current["results"]
+    lines.append(f"throughput: {before['throughput_rps']} -> "
+                 f"{after['throughput_rps']} rps")
+    for op, figures in after["operations"].items():
+        old = before["operations"].get(op)
+        if old is None:
+            continue
+        for name in ("p50_ms", "p99_ms"):
+            change = (figures[name] - old[name]) / old[name] * 100 \
+                if old[name] else 0.0
+            lines.append(f"{op} {name}: {old[name]} -> {figures[name]} "
+                         f"({change:+.1f}%)")
+    return lines
+
+
+def main():
+    """ The main function runs the load generator from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Simulate concurrent players against a session server.")
+    parser.add_argument("--address", default="127.0.0.1:8766",
+                        help="the address of the session server")
+    parser.add_argument("--players", type=int, default=100,
+                        help="the number of concurrent players")
+    parser.add_argument("--mode",
+                        choices=("random", "solver") + tuple(STRATEGIES),
+                        default="random", help="how players choose guesses")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="the seconds of the run")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="requests per second, 0 for unlimited")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="the seed of the players' random choices")
+    parser.add_argument("--output", default=None,
+                        help="write the results as JSON to this file")
+    parser.add_argument("--compare", default=None,
+                        help="a previous JSON result to compare with")
+    args = parser.parse_args()
+    result = asyncio.run(run(args.address, args.players, args.mode,
+                             args.duration, args.rate, args.seed))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(result, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            print("\n".join(compare(json.load(file), result)))
+
+
+if __name__ == "__main__":
+    main()
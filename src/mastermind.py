@@ -1,8 +1,38 @@
-import turtle
-import random
+import logging
 import time
 import math
-from src.mastermind_kernal import MastermindKernal
+import functools
+from src.game_state import GameState
+from src.session_client import RemoteGameState
+from src.adversary import AdversarialGameState
+from src.leaderboard_client import LeaderboardClient, read_leaders, \
+    save_score
+from src.config import ConfigError, config_mtime, load_config
+from src import game_recorder
+from src import snapshot
+from src.hint_engine import HintEngine, HintWorker
+from src.memory_diagnostics import MemoryDiagnostics
+from src.text_layer import TextLayer
+
+logger = logging.getLogger("mastermind.game")
+
+# turtle (and tkinter) is imported when the window is opened, so that the
+# game logic can be used without a display
+turtle = None
+
+
+def load_turtle():
+    """ This function is to import the turtle module the first time a
+    window is opened.
+
+    Returns:
+        module: the turtle module.
+    """
+    global turtle
+    if turtle is None:
+        import turtle as turtle_module
+        turtle = turtle_module
+    return turtle
 
 
 class Mastermind:
@@ -21,23 +51,31 @@ class Mastermind:
                             different rounds in the game.
         colors (list): The constant list of colors for generating secret code 
                        and for players to pick from.
+        state (GameState): The secret code, the round and the selections of
+                           the game, shared with the headless tools.
         leaderboard_path (str): Path to the leaderboard file.
         font (tuple): The font settings for text in the game.
         font_color (str): The font's color for text in the game.
+        leaderboard_address (str): Address of a shared leaderboard service.
+                                   The leaderboard file is used when it is
+                                   None or unreachable.
 
     Methods:
         initilize_turtle(self):
             Initializes Turtle and Screen to establish the foundation of the
             turtle UI window.
 
-        draw_circle(self, x: int, y: int, radius: int) -> None:
+        create_pen(self) -> turtle.Turtle:
+            Creates a hidden pen.
+
+        draw_circle(self, x: int, y: int, radius: int, pen=None) -> None:
             Draws an unfilled circle given its center coordinates (x, y) and
-            radius.
+            radius, with a new pen or a reused one.
 
         draw_solid_circle(self, x: int, y: int, radius: int,
-                          color: str) -> None:
+                          color: str, pen=None) -> None:
             Draws a filled circle given its center coordinates (x, y), radius,
-            and color.
+            and color, with a new pen or a reused one.
 
         draw_rectangle(self, x: int, y: int, width: int, height: int,
                        color: str):
@@ -64,7 +102,8 @@ class Mastermind:
             reg.
 
         generate_leaderboard(self) -> None:
-            Generates the leaderboard displaying the best performing players.
+            Generates the leaderboard displaying the best performing players,
+            rewriting it only if a row changed.
 
         generate_selections(self) -> dict[dict]:
             Generates a selection area of colored circles and returns a
@@ -88,7 +127,8 @@ class Mastermind:
             Generates a pop-up window for user input and returns the entered
             text.
 
-        remove_solid_circle(self, x: int, y: int, radius: int) -> None:
+        remove_solid_circle(self, x: int, y: int, radius: int,
+                            pen=None) -> None:
             Removes a solid circle's color, reverting it to the background
             color, but preserves its border.
 
@@ -103,7 +143,8 @@ class Mastermind:
             ascending order of scores.
 
         to_leaderboard(self, text: str) -> None:
-            Writes the current player's name and score to the leaderboard file.
+            Writes the current player's name and score to the leaderboard file
+            and refreshes the leaderboard.
 
         display_text(self, x: int, y: int, color: str,
                      font: tuple, text: str) -> None:
@@ -131,19 +172,40 @@ class Mastermind:
             Handles the action of clicking the check button, used to confirm
             selections and proceed in the game.
 
+        generate_hint_button(self) -> dict[str:int]:
+            Generates a button suggesting the next guess.
+
+        click_hint_button(self) -> None:
+            Searches a hint on a worker thread.
+
+        deliver_hint(self, worker: HintWorker) -> None:
+            Shows the hint once it was found.
+
+        show_hint(self, hint: tuple) -> None:
+            Paints the colors of a hint.
+
         click_quit_button(self) -> None:
             Handles the action of clicking the quit button, used to exit the
             game.
 
+        show_message(self, path: str) -> None:
+            Shows a message image in the middle of the window.
+
         win(self) -> None:
             Executes the sequence of events when the player wins the game.
 
         lose(self) -> None:
             Executes the sequence of events when the player loses the game.
 
-        proceed_to_next_round(self, last_result: MasterMindKernal) -> None:
+        offer_new_game(self) -> None:
+            Asks the players if they play again, or closes the window.
+
+        new_game(self) -> None:
+            Starts a new game in the same window.
+
+        proceed_to_next_round(self) -> None:
             Proceeds the game to the next round based on the last round's
-            result.
+            result in the round history.
 
         raise_leaderboard_error(self) -> None:
             Raises an error if the leaderboard file is not found.
@@ -154,6 +216,44 @@ class Mastermind:
         click(self, x: int, y: int) -> None:
             Sets the response to a click event in the game.
 
+        use_remote_session(self, address: str) -> None:
+            Plays the game hosted by a session server.
+
+        use_adversary(self) -> None:
+            Plays against a codemaker choosing the secret code at the end.
+
+        recorded_secret(self) -> list[int]:
+            Gives the secret code written when a recorded session is closed.
+
+        enable_recorder(self, directory: str) -> None:
+            Records the events of every game to a session file.
+
+        apply_config(self, config: MastermindConfig) -> None:
+            Applies the colors, font and leaderboard settings of a new
+            configuration to the running game.
+
+        enable_hot_reload(self, path: str, interval: int) -> None:
+            Polls the configuration file and applies its changes without
+            restarting the window.
+
+        save_snapshot(self) -> None:
+            Saves the unfinished game to the snapshot file.
+
+        enable_snapshots(self, path: str, interval: int) -> None:
+            Saves the unfinished game periodically while it changes.
+
+        resume_snapshot(self) -> bool:
+            Resumes the saved game with a single redraw of the board.
+
+        canvas_counts(self) -> dict:
+            Counts the turtles and the canvas items of the window.
+
+        enable_memory_diagnostics(self, path: str, interval: int) -> None:
+            Samples the memory of the window periodically and per game.
+
+        record_memory(self, event: str) -> None:
+            Appends a memory sample to the memory log.
+
         play(self) -> None:
             Activates the onclick function, enabling user interaction with the
             game's UI.
@@ -166,7 +266,8 @@ class Mastermind:
                  speed: int, button_radius: int, marble_radius: int,
                  reg_radius: int, colors: list,
                  leaderboard_path: str, font: tuple,
-                 font_color: str) -> None:
+                 font_color: str, leaderboard_address: str = None,
+                 row_interval: int = None) -> None:
         """
         Constructs all the necessary attributes for the Mastermind object.
 
@@ -180,12 +281,17 @@ class Mastermind:
             marble_radius (int): The radius of the big circles in the UI 
                                  windows.
             reg_radius (int): The radius of the small circles in the UI window.
-            row_interval (int): The vertical interval of each row, representing
-                                different rounds in the game.
             colors (list): The constant list of colors for generating secret 
                            code and for players to pick from.
             leaderboard_path (str): Path to the leaderboard file.
             font (tuple): The font settings for text in the game.
+            font_color (str): The font's color for text in the game.
+            leaderboard_address (str): Address of a shared leaderboard
+                                       service, like "127.0.0.1:8765" or
+                                       "unix:/tmp/leaderboard.sock".
+            row_interval (int): The vertical interval of each row,
+                                representing different rounds in the
+                                game, 7% of the height if None.
         """
         self.width = width
         self.height = height
@@ -193,37 +299,119 @@ class Mastermind:
         self.button_radius = button_radius
         self.marble_radius = marble_radius
         self.reg_radius = reg_radius
-        self.row_interval = self.height * 0.07
+        self.row_interval = row_interval
+        if row_interval is None:
+            self.row_interval = self.height * 0.07
         self.speed = speed
-        self.colors = colors
-        # create a stack to store players' selections at each round
-        self.selection_stack = []
-        # self.round indicates the current playing round (0-9), starting by 0
-        self.round = 0
-        self.last_round = 9
+        # the state of the game: colors, secret code, round and the stack
+        # storing players' selections at each round; self.round indicates
+        # the current playing round (0-9), starting by 0
+        self.state = GameState(colors=colors, rounds=10)
+        self.last_round = self.state.last_round
         # We have 10 rows
         self.row_number = self.last_round + 1
         # the path of the leaderboard.txt
         self.leaderboard_path = leaderboard_path
+        # the client of the shared leaderboard service, if any
+        self.leaderboard_client = None
+        if leaderboard_address:
+            self.leaderboard_client = LeaderboardClient(leaderboard_address)
         # the font of the text
         self.font = font
         self.font_color = font_color
-        # initialize the result of the game
-        self.is_win = False
         # set the width and height of quit button
         self.quit_button_width = 58
         self.quit_button_height = 29
+        # the text layer of the leaderboard, created when it is first drawn
+        self.leaderboard_layer = None
+        self.leaderboard_error_shown = False
+        # the recorder of the game's events, if recording is enabled
+        self.recorder = None
+        # the path of the snapshot of the unfinished game, if enabled
+        self.snapshot_path = None
+        # the worker computing hints, created by the first hint
+        self.hint_worker = None
+        self.hint_pen = None
+        # the memory samples of the window, if diagnostics are enabled
+        self.memory = None
+        # the pens of what a new game clears: the pegs and marbles painted
+        # on the board, and the changes of the selection area in a round
+        self.board_pen = None
+        self.selection_pen = None
+        # the pen of the circles of the selection area, redrawn by a reload
+        self.selection_area_pen = None
+        # the turtle showing the win, lose and quit messages
+        self.message = None
+        # the number of games started in this window
+        self.games = 0
+
+    @property
+    def colors(self) -> list:
+        """ The colors for players to pick from. """
+        return self.state.colors
+
+    @colors.setter
+    def colors(self, colors: list) -> None:
+        self.state.colors = colors
+
+    @property
+    def secret_code(self) -> list:
+        """ The secret code of the game. """
+        return self.state.secret_code
+
+    @secret_code.setter
+    def secret_code(self, secret_code: list) -> None:
+        self.state.secret_code = secret_code
+
+    @property
+    def round(self) -> int:
+        """ The current playing round, starting by 0. """
+        return self.state.round
+
+    @round.setter
+    def round(self, round: int) -> None:
+        self.state.round = round
+
+    @property
+    def selection_stack(self) -> list:
+        """ The players' selections at the current round. """
+        return self.state.selection_stack
+
+    @selection_stack.setter
+    def selection_stack(self, selection_stack: list) -> None:
+        self.state.selection_stack = selection_stack
+
+    @property
+    def is_win(self) -> bool:
+        """ If the players found the secret code. """
+        return self.state.is_win
 
     def initilize_turtle(self):
         """ This function is to initilize Screen to
         establish the foundation of the turtle UI window.
         """
         # initialize the self.screen
+        load_turtle()
         self.screen = turtle.Screen()
         self.screen.title(self.title)
         self.screen.setup(width=self.width, height=self.height)
+        self.board_pen = self.create_pen()
+        self.selection_pen = self.create_pen()
+
+    def create_pen(self) -> "turtle.Turtle":
+        """ This method is to create a hidden pen. The drawings of a pen
+        can be cleared together.
 
-    def draw_circle(self, x: int, y: int, radius: int) -> None:
+        Returns:
+            turtle.Turtle: the pen.
+        """
+        pen = turtle.Turtle()
+        pen.speed(self.speed)
+        pen.hideturtle()
+        return pen
+
+    def draw_circle(self, x: int, y: int, radius: int,
+                    pen: "turtle.Turtle" = None) -> None:
         """ This method is to draw a unfilled circle given
         its center's coordinate x, y and radius.
 
@@ -231,17 +419,20 @@ class Mastermind:
             x (int): the x-coordinate of the circle's cetner.
             y (int): the y-coordinate of the circle's center.
             radius (int): the radius of the circle.
+            pen (turtle.Turtle): the pen drawing the circle, a new one by
+                                 default.
         """
-        pen = turtle.Turtle()
-        pen.speed(self.speed)
-        pen.hideturtle()
+        if pen is None:
+            pen = self.create_pen()
+        pen.color("black")
         pen.penup()
         pen.setpos(x, y)
         pen.pendown()
         pen.circle(radius=radius)
 
     def draw_solid_circle(self, x: int, y: int,
-                          radius: int, color: str) -> None:
+                          radius: int, color: str,
+                          pen: "turtle.Turtle" = None) -> None:
         """ This method is to draw a filled circle given
         its center's coordinate x, y, radius and color.
 
@@ -250,10 +441,12 @@ class Mastermind:
             y (int): the y-coordinate of the circle's center.
             radius (int): the radius of the circle.
             color (str): the color of the circle.
+            pen (turtle.Turtle): the pen drawing the circle, a new one by
+                                 default.
         """
-        pen = turtle.Turtle()
-        pen.speed(self.speed)
-        pen.hideturtle()
+        if pen is None:
+            pen = self.create_pen()
+        pen.color("black")
         pen.penup()
         pen.setpos(x, y)
         pen.pendown()
@@ -309,8 +502,9 @@ class Mastermind:
         """
         image = turtle.Turtle()
         image.speed(self.speed)
-        # add the path of the image
-        self.screen.addshape(path)
+        # add the path of the image, loaded once per window
+        if path not in self.screen.getshapes():
+            self.screen.addshape(path)
         image.penup()
         # store the coordinate of the image
         image_coordinate = {'x': x, 'y': y}
@@ -328,9 +522,14 @@ class Mastermind:
         Returns:
             list[str]: a secret code list consists of 4 colors.
         """
-        self.secret_code = self.colors[:]
-        self.secret_code.pop(random.randint(0, len(self.secret_code) - 1))
-        self.secret_code.pop(random.randint(0, len(self.secret_code) - 1))
+        self.state.generate_secret_code()
+        # a remote game keeps its secret code on the server, while an
+        # adversary picks its secret code when the session is closed
+        if self.recorder is not None and \
+                not isinstance(self.state, RemoteGameState):
+            self.recorder.start(colors=self.colors,
+                                secret_code=self.secret_code,
+                                code_length=self.state.code_length)
         return self.secret_code
 
     def generate_frame(self):
@@ -440,38 +639,35 @@ class Mastermind:
 
     def generate_leaderboard(self) -> None:
         """ This method is to generate the leaderboard, consisting the list of
-        players who got the best performance before.
-        """
-        initial_x = 0.15 * self.width
-        initial_y = 0.40 * self.height
-        text = "Leaders: "
-        font_color = self.font_color
-        font = self.font
-        # write the intial line of the leaderboard
-        self.display_text(x=initial_x, y=initial_y, color=font_color,
-                          font=font, text=text)
+        players who got the best performance before. The leaderboard has its
+        own text layer, with a single pen, which rewrites the rows only if
+        one of them changed and leaves the rest of the window untouched.
+        """
+        if self.leaderboard_layer is None:
+            # each leader is one row interval lower on the leaderboard
+            self.leaderboard_layer = TextLayer(pen=self.create_pen(),
+                                               x=0.15 * self.width,
+                                               y=0.40 * self.height,
+                                               spacing=self.row_interval)
         # read the leaders_list
         try:
             leaders_list = self.read_leaderboard(path=self.leaderboard_path)
         except FileNotFoundError:
             # if cannot find the leaderboard.txt, display the leaderboard error
-            self.raise_leaderboard_error()
+            if not self.leaderboard_error_shown:
+                self.raise_leaderboard_error()
+                self.leaderboard_error_shown = True
             leaders_list = []
-
-        for rank, leader in enumerate(leaders_list):
-            x = initial_x
-            # adjust the y-coordinate for each subseq
-            # ent leader to be 50px
-            # lower on the leader board
-            y = initial_y - ((rank + 1) * self.row_interval)
-            self.display_text(x=x, y=y,
-                              color=self.font_color, font=font,
-                              text=f"{leader[0]}: {leader[1]}")
+        rows = ["Leaders: "]
+        rows += [f"{leader[0]}: {leader[1]}" for leader in leaders_list]
+        self.leaderboard_layer.render(rows, font=self.font,
+                                      color=self.font_color)
 
     def generate_selections(self) -> dict[dict]:
         """ This method is to generate the selection area consisting of
         a line of circles. This method creates and positions a series of
-        colored circles, storing their coordinates in a dictionary.
+        colored circles, storing their coordinates in a dictionary. The
+        circles share one pen, which is cleared when they are drawn again.
 
         Returns:
             dict[dict]: a list that contain the coordinate for
@@ -487,6 +683,9 @@ class Mastermind:
         initial_y = -0.4 * self.height
         index_interval = 0.06 * self.width
         selections_radius = self.marble_radius
+        if self.selection_area_pen is None:
+            self.selection_area_pen = self.create_pen()
+        self.selection_area_pen.clear()
         # save the selections' coordinates by dict
         self.selections_coordinate = {}
         for index, color in enumerate(self.colors):
@@ -495,7 +694,8 @@ class Mastermind:
             self.draw_solid_circle(x=x,
                                    y=y,
                                    radius=selections_radius,
-                                   color=color)
+                                   color=color,
+                                   pen=self.selection_area_pen)
             self.selections_coordinate[color] = {'x': x, 'y': y}
 
         return self.selections_coordinate
@@ -548,6 +748,25 @@ class Mastermind:
                                                       path=path)
         return self.quit_button_coordinate
 
+    def generate_hint_button(self) -> dict[str:int]:
+        """ This method is to generate a hint button for players to ask
+        for a suggestion of the next guess.
+
+        Returns:
+            dict[str:int]: the coordinate of the center of the hint button.
+        """
+        # below the leaders and above the configuration error image
+        x = 0.17 * self.width
+        y = -0.09 * self.height
+        # draw_circle starts from the bottom of the circle
+        self.draw_circle(x=x, y=y - self.button_radius,
+                         radius=self.button_radius)
+        self.display_text(x=x - 0.4 * self.button_radius,
+                          y=y - 0.6 * self.button_radius,
+                          color=self.font_color, font=self.font, text="?")
+        self.hint_button_coordinate = {'x': x, 'y': y}
+        return self.hint_button_coordinate
+
     def generate_arrow(self) -> dict[str:int]:
         """ This method is to generate a arrow to indicate the current round 
         of the game.
@@ -588,7 +807,8 @@ class Mastermind:
                                           prompt=prompt)
         return self.name
 
-    def remove_solid_circle(self, x: int, y: int, radius: int) -> None:
+    def remove_solid_circle(self, x: int, y: int, radius: int,
+                            pen: "turtle.Turtle" = None) -> None:
         """ This method is to remove a solid cirle's color with the
         background color but preserve its border.
 
@@ -596,15 +816,17 @@ class Mastermind:
             x (int): The x-coordinate of the circle's center.
             y (int): The y-coordinate of the circle's center.
             radius (int): the radius of the circle.
+            pen (turtle.Turtle): the pen drawing over the circle, a new one
+                                 by default.
         """
         # fill white color
         self.draw_solid_circle(x=x, y=y, radius=radius,
-                               color=self.screen.bgcolor())
+                               color=self.screen.bgcolor(), pen=pen)
         # redraw the border
-        self.draw_circle(x=x, y=y, radius=radius)
+        self.draw_circle(x=x, y=y, radius=radius, pen=pen)
 
     def light_up_regs(self, nums_correct_position: int,
-                      nums_wrong_position: int):
+                      nums_wrong_position: int, row: int = None):
         """ This method is to light up the hints at each round of the game,
         given the number of colors in correct position and number of color in
         wrong position. Red pegs meant a correct color but out of position,
@@ -613,32 +835,37 @@ class Mastermind:
         Args:
             nums_correct_position (int): the number of red pegs.
             nums_wrong_position (int): the number of black pegs.
+            row (int): the row of the hints, the current round by default.
         """
+        if row is None:
+            row = self.round
         # define the index of hints, the index will increase from 0 to 3
         index = 0
         # light up the red pegs for number of color in correct position
         while nums_correct_position > 0:
-            x = self.regs_coordinate[self.round][index]['x']
-            y = self.regs_coordinate[self.round][index]['y']
+            x = self.regs_coordinate[row][index]['x']
+            y = self.regs_coordinate[row][index]['y']
             radius = self.reg_radius
             color = "black"
-            self.draw_solid_circle(x, y, radius=radius, color=color)
+            self.draw_solid_circle(x, y, radius=radius, color=color,
+                                   pen=self.board_pen)
             index += 1
             nums_correct_position -= 1
         # light up the black regs for number of color in wrong position
         while nums_wrong_position > 0:
-            x = self.regs_coordinate[self.round][index]['x']
-            y = self.regs_coordinate[self.round][index]['y']
+            x = self.regs_coordinate[row][index]['x']
+            y = self.regs_coordinate[row][index]['y']
             radius = self.reg_radius
             color = "red"
-            self.draw_solid_circle(x, y, radius=radius, color=color)
+            self.draw_solid_circle(x, y, radius=radius, color=color,
+                                   pen=self.board_pen)
             index += 1
             nums_wrong_position -= 1
 
     def read_leaderboard(self, path) -> list[tuple[int:str]]:
-        """ This method is to read the leaderboard.txt file and convert the
-        text to a list with tuple elements. After that, this method will
-        sort the leader list based on ascending order.
+        """ This method is to read the leaderboard and return the leader list
+        sorted in ascending order. The shared leaderboard service is asked
+        first if there is one, otherwise the leaderboard file is read.
 
             i.e. [(3, "Tong Cai"), (5, "Jenny Yi"), ......]
 
@@ -646,23 +873,7 @@ class Mastermind:
             list[tuple[int:str]]: a list consists of tuple elements. Each
                                   element is a tuple with scores and name.
         """
-        leaders_list = []
-        # open the leaderboard.txt
-        with open(path, 'r') as leaders:
-            if leaders is None:
-                return []
-            for leader in leaders:
-                if ":" in leader:
-                    scores, name = leader.split(':')
-                    # drop any "\n" and space around name
-                    name = name.replace("\n", "").strip(' ')
-                    leaders_list.append(tuple([int(scores), name]))
-        # sort the leaders list with ascending order
-        sorted_leaders_list = sorted(leaders_list, key=lambda x: x[0])
-        # only display the top 5 players
-        sorted_leaders_list = sorted_leaders_list[0:5]
-
-        return sorted_leaders_list
+        return read_leaders(path, client=self.leaderboard_client)
 
     def to_leaderboard(self, text: str):
         """ This method is to save the current player's name and its scores.
@@ -671,11 +882,14 @@ class Mastermind:
         Args:
             text (str): the text to be saved into leaderboard.txt.
         """
-        with open(self.leaderboard_path, 'a') as file:
-            file.write(f"{self.round + 1}: {text}\n")
+        save_score(self.leaderboard_path, self.round + 1, text,
+                   client=self.leaderboard_client)
+        # show the new score without a restart
+        if self.leaderboard_layer is not None:
+            self.generate_leaderboard()
 
     def display_text(self, x: int, y: int, color: str,
-                     font: tuple, text: str) -> None:
+                     font: tuple, text: str) -> "turtle.Turtle":
         """ This method is to display specified text given its coordinate,
         color, and font on the leaderboard area.
 
@@ -685,6 +899,9 @@ class Mastermind:
             color (str): the color of the text.
             font (tuple): the font of the text.
             text (str): the text needed to be written.
+
+        Returns:
+            turtle.Turtle: the pen that wrote the text.
         """
         pen = turtle.Turtle()
         pen.hideturtle()
@@ -695,6 +912,7 @@ class Mastermind:
         pen.color(color)
         # choose the font
         pen.write(text, font=font)
+        return pen
 
     def remove_selected_circle_color(self, color: str):
         """ This method is to remove the circle's color of the
@@ -715,7 +933,8 @@ class Mastermind:
         index = self.colors.index(color)
         self.remove_solid_circle(x=initial_x + index * index_interval,
                                  y=initial_y,
-                                 radius=selections_radius)
+                                 radius=selections_radius,
+                                 pen=self.selection_pen)
 
     def recover_selected_circle_color(self, color: str):
         """ This method is to recover the circle's color of the selected
@@ -737,7 +956,7 @@ class Mastermind:
         self.draw_solid_circle(x=initial_x + index * index_interval,
                                y=initial_y,
                                radius=selections_radius,
-                               color=color)
+                               color=color, pen=self.selection_pen)
 
     def move_arrow(self, distance: int):
         """ This method is to move the arrow given a specific distance.
@@ -757,7 +976,12 @@ class Mastermind:
             color (str): the color that was selected by the players
         """
         # click the color circle
-        self.selection_stack.append(color)
+        if not self.state.select(color):
+            return
+        if self.recorder is not None:
+            self.recorder.record(game_recorder.SELECT,
+                                 color=self.colors.index(color),
+                                 round_index=self.round)
         # remove the color of the selected circle
         self.remove_selected_circle_color(color=color)
         # draw the selected solid circle
@@ -766,7 +990,7 @@ class Mastermind:
             y=self.marbles_coordinate[self.round][
             len(self.selection_stack) - 1]['y'],
             radius=self.marble_radius,
-            color=color)
+            color=color, pen=self.board_pen)
 
     def click_x_button(self):
         """ This method is to handle the action of clicking X button.
@@ -774,7 +998,12 @@ class Mastermind:
         # if the selection stack is over 0, we can pop the stack
         if len(self.selection_stack) > 0:
             # pop out the selected color
-            self.cancelled_color = self.selection_stack.pop()
+            self.cancelled_color = self.state.undo()
+            if self.recorder is not None:
+                self.recorder.record(
+                    game_recorder.UNDO,
+                    color=self.colors.index(self.cancelled_color),
+                    round_index=self.round)
             self.recover_selected_circle_color(color=self.cancelled_color)
             # remove the selected marble's color
             self.remove_solid_circle(x=(
@@ -784,7 +1013,7 @@ class Mastermind:
                 y=(self.marbles_coordinate[self.round][
                     len(self.selection_stack)]
                    ['y']),
-                radius=self.marble_radius)
+                radius=self.marble_radius, pen=self.board_pen)
 
     def click_check_button(self):
         """ This method is to handle the action of clicking check button.
@@ -799,12 +1028,23 @@ class Mastermind:
                 Clear the self.selction_stack, increase self.round by 1.
         """
         # use the last result to light up the hint to prompt players
-        last_round_result = MastermindKernal(
-            secret_code=self.secret_code,
-            picked_colors=self.selection_stack
-        )
         # to check whether the player win the game
-        self.is_win = last_round_result.is_win()
+        self.state.check()
+        _, black, red = self.state.history[-1]
+        if self.recorder is not None:
+            self.recorder.record(
+                game_recorder.CHECK, round_index=self.round,
+                feedback=game_recorder.pack_feedback(black, red))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("check", extra={"fields": {
+                "round": self.round,
+                "guess": list(self.selection_stack),
+                "black": black,
+                "red": red}})
+        if self.state.is_over:
+            # the pegs of the last round stay on the board with the result
+            self.light_up_regs(nums_correct_position=black,
+                               nums_wrong_position=red)
         # if the guess are correct, the users win
         if self.is_win is True:
             """
@@ -818,84 +1058,209 @@ class Mastermind:
                 The player loses the game.
             """
             self.lose()
+        else:
+            """
+            3. Move to the next round:
+                Clear the self.selction_stack, increase self.round by 1.
+            """
+            self.proceed_to_next_round()
+
+    def click_hint_button(self) -> None:
+        """ This method is to handle the action of clicking the hint
+        button. The hint is searched on a worker thread and shown by
+        deliver_hint once it is ready.
+        """
+        if self.state.is_over:
+            return
+        if self.hint_worker is None:
+            # the engine loads its book and tree on the worker thread
+            self.hint_worker = HintWorker(functools.partial(
+                HintEngine, colors=list(self.colors),
+                code_length=self.state.code_length))
+        history = self.state.history.with_colors(self.colors)
+        worker = self.hint_worker
+        if worker.request(history, tag=(self.games, self.round)):
+            self.screen.ontimer(lambda: self.deliver_hint(worker), 10)
+
+    def deliver_hint(self, worker: HintWorker) -> None:
+        """ This method is to show the hint once the worker found it. A
+        hint for a round or a game that is already over is dropped, and so
+        is a worker dropped by a change of colors.
+
+        Args:
+            worker (HintWorker): the worker searching the hint.
         """
-        3. Move to the next round:
-            Clear the self.selction_stack, increase self.round by 1.
+        if worker is not self.hint_worker:
+            # the hint was searched over the old colors
+            return
+        result = worker.poll()
+        if result is None:
+            self.screen.ontimer(lambda: self.deliver_hint(worker), 10)
+            return
+        tag, hint = result
+        if hint is not None and tag == (self.games, self.round) and \
+                not self.state.is_over:
+            self.show_hint(hint)
+
+    def show_hint(self, hint: tuple) -> None:
+        """ This method is to paint the colors of a hint next to the hint
+        button, replacing the previous hint.
+
+        Args:
+            hint (tuple): the suggested colors.
         """
-        self.proceed_to_next_round(last_result=last_round_result)
+        if self.hint_pen is None:
+            self.hint_pen = turtle.Turtle()
+            self.hint_pen.hideturtle()
+            self.hint_pen.speed(0)
+        self.hint_pen.clear()
+        radius = self.reg_radius * 2
+        for index, color in enumerate(hint):
+            self.hint_pen.penup()
+            self.hint_pen.setpos(
+                self.hint_button_coordinate['x'] + self.button_radius +
+                (index + 1) * 3 * radius,
+                self.hint_button_coordinate['y'] - radius)
+            self.hint_pen.pendown()
+            self.hint_pen.color(color)
+            self.hint_pen.begin_fill()
+            self.hint_pen.circle(radius=radius)
+            self.hint_pen.end_fill()
 
     def click_quit_button(self) -> None:
         """ This method is to handle the action of clicking
         the quit button.
         """
+        if self.recorder is not None:
+            self.recorder.close(secret=self.recorded_secret())
+        if self.snapshot_path is not None:
+            # keep the latest moves so the game can be resumed
+            self.save_snapshot()
+        if isinstance(self.state, RemoteGameState):
+            # free the hosted game for the other players
+            self.state.end_session()
+            self.state.client.close()
         # pop up the quit.gif window
-        x = 0
-        y = 0
-        path = "src/quitmsg.gif"
-        self.draw_image(x=x, y=y, path=path)
+        self.show_message(path="src/quitmsg.gif")
         # after 2 seconds, close the screen
         self.screen.onscreenclick(None)
         time.sleep(2)
         self.screen.bye()
 
+    def show_message(self, path: str) -> None:
+        """ This method is to show a message image in the middle of the
+        window. The same turtle shows the messages of every game, and is
+        hidden when a new game starts.
+
+        Args:
+            path (str): the path of the image.
+        """
+        if self.message is None:
+            self.message = turtle.Turtle()
+            self.message.penup()
+        if path not in self.screen.getshapes():
+            self.screen.addshape(path)
+        self.message.shape(path)
+        self.message.showturtle()
+
     def win(self):
         """ This method is to function the condition that the player won.
         """
-        x = 0
-        y = 0
-        path = "src/winner.gif"
         # pop up the winner.gif window
-        self.draw_image(x=x, y=y, path=path)
+        self.show_message(path="src/winner.gif")
+        logger.info("win", extra={"fields": {"round": self.round}})
+        if self.recorder is not None:
+            self.recorder.record(game_recorder.WIN, round_index=self.round)
+            self.recorder.close(secret=self.recorded_secret())
+        if self.snapshot_path is not None:
+            snapshot.remove_snapshot(self.snapshot_path)
         self.to_leaderboard(self.name)
+        self.record_memory("game")
         # after 2 seconds, end the onscreenclick
         self.screen.onscreenclick(None)
         time.sleep(2)
-        self.screen.bye()
+        self.offer_new_game()
 
     def lose(self):
         """ This method is to function the condition that the player lost.
         """
         # pop up the lose.gif window
-        x = 0
-        y = 0
-        path = "src/Lose.gif"
-        self.draw_image(x=x, y=y, path=path)
+        self.show_message(path="src/Lose.gif")
+        logger.info("lose", extra={"fields": {"secret": self.secret_code}})
+        if self.recorder is not None:
+            self.recorder.record(game_recorder.LOSE, round_index=self.round)
+            self.recorder.close(secret=self.recorded_secret())
+        if self.snapshot_path is not None:
+            snapshot.remove_snapshot(self.snapshot_path)
+        self.record_memory("game")
         self.screen.onscreenclick(None)
         time.sleep(2)
-        self.pop_up_window(title="Secret Code: ",
-                           prompt=f"{self.secret_code[0]} "
-                           f"{self.secret_code[1]} "
-                           f"{self.secret_code[2]} "
-                           f"{self.secret_code[3]} ")
-        self.screen.bye()
-
-    def proceed_to_next_round(self, last_result: MastermindKernal):
+        # not pop_up_window, which would replace the player's name
+        self.screen.textinput(title="Secret Code: ",
+                              prompt=f"{self.secret_code[0]} "
+                              f"{self.secret_code[1]} "
+                              f"{self.secret_code[2]} "
+                              f"{self.secret_code[3]} ")
+        self.offer_new_game()
+
+    def offer_new_game(self) -> None:
+        """ This method is to ask the players if they play again. The
+        window is closed if they do not.
+        """
+        answer = self.screen.textinput(title=self.title,
+                                       prompt="Play again? (yes/no)")
+        if answer is not None and answer.strip().lower() in ("y", "yes"):
+            self.new_game()
+        else:
+            self.screen.bye()
+
+    def new_game(self) -> None:
+        """ This method is to start a new game in the same window. Only the
+        state of the game and what was drawn during the game are reset: the
+        pens of the board and of the selection area are cleared, and the
+        frames, buttons, empty marbles and pegs, and loaded images are kept.
+        The window is redrawn once.
+        """
+        self.games += 1
+        self.screen.tracer(0)
+        try:
+            self.board_pen.clear()
+            self.selection_pen.clear()
+            if self.hint_pen is not None:
+                self.hint_pen.clear()
+            if self.message is not None:
+                self.message.hideturtle()
+            self.arrow.setpos(self.arrow_coordinate['x'],
+                              self.arrow_coordinate['y'])
+            self.generate_leaderboard()
+            self.generate_secret_code()
+            self.screen.update()
+        finally:
+            self.screen.tracer(1)
+        logger.info("new game", extra={"fields": {"games": self.games}})
+        self.play()
+
+    def proceed_to_next_round(self):
         """ This method is to proceed the game to the next round.
         To proceed the next round, this method will light up the hints of
-        last round. After that, this method will increase self.round by 1, and
-        clear the self.selection_stack for the next round's selection. Finally,
-        this method will recover all selections in the selection area and move
-        the arrow to the next round's position.
-
-        Args:
-            last_result (MastermindKernal): the hints of last game, which
-                contains the number of color int he correct position and
-                the number of color in the wrong position.
+        last round, read from the round history. After that, this method will
+        increase self.round by 1, and clear the self.selection_stack for the
+        next round's selection. Finally, this method will recover all
+        selections in the selection area and move the arrow to the next
+        round's position.
         """
         # if the guess are not correct, prompt the hints
-        self.light_up_regs(
-            nums_correct_position=(
-                last_result.get_number_of_correct_position()
-            ),
-            nums_wrong_position=(
-                last_result.get_number_of_wrong_position()
-            )
-        )
+        _, black, red = self.state.history[-1]
+        self.light_up_regs(nums_correct_position=black,
+                           nums_wrong_position=red)
+        # the hint was for the last round
+        if self.hint_pen is not None:
+            self.hint_pen.clear()
         # go into the next round
-        self.round += 1
-        self.selection_stack = []
-        # regain all selections
-        self.generate_selections()
+        self.state.next_round()
+        # regain all selections: the circles drawn by generate_selections
+        # show again once the changes of this round are cleared
+        self.selection_pen.clear()
         # move the arrow
         self.move_arrow(distance=self.row_interval)
 
@@ -959,6 +1324,16 @@ class Mastermind:
         ))):
             self.click_quit_button()
 
+        if hasattr(self, "hint_button_coordinate") and \
+                self.is_within_circular_button_area(
+                    x=x,
+                    y=y,
+                    center_x=self.hint_button_coordinate['x'],
+                    center_y=self.hint_button_coordinate['y'],
+                    radius=self.button_radius):
+            # ask for a suggestion of the next guess
+            self.click_hint_button()
+
         """
         Condition 1:
             If players have selected less or equal to 4 colors,
@@ -1029,6 +1404,248 @@ class Mastermind:
             ):
                 self.click_check_button()
 
+    def use_remote_session(self, address: str) -> None:
+        """ This method is to play the game hosted by a session server,
+        which keeps the secret code and scores the checks.
+
+        Args:
+            address (str): the address of the session server.
+        """
+        self.state = RemoteGameState(address=address, colors=self.colors,
+                                     rounds=self.row_number)
+
+    def use_adversary(self) -> None:
+        """ This method is to play against a codemaker that delays its
+        choice of the secret code, answering every check with the feedback
+        that keeps the most secret codes possible.
+        """
+        self.state = AdversarialGameState(colors=self.colors,
+                                          rounds=self.row_number)
+
+    def recorded_secret(self) -> list[int]:
+        """ This method is to give the secret code written when a recorded
+        session is closed. An adversary that has not picked its secret code
+        yet is given any code consistent with the feedback so far, which
+        replays the game all the same.
+
+        Returns:
+            list[int]: the indices of the colors of the secret code.
+        """
+        secret_code = self.secret_code
+        if not secret_code and isinstance(self.state, AdversarialGameState):
+            secret_code = self.state.witness()
+        return [self.colors.index(color) for color in secret_code]
+
+    def enable_recorder(self, directory: str) -> None:
+        """ This method is to record the events of every game to a session
+        file in a directory.
+
+        Args:
+            directory (str): the directory of the session files.
+        """
+        self.recorder = game_recorder.GameRecorder(directory=directory)
+
+    def apply_config(self, config) -> None:
+        """ This method is to apply the non-geometry settings of a new
+        configuration to the running game. A new list of colors is applied
+        only if it has as many colors as the current one; the colors are
+        matched by their position, so the secret code and the current
+        selections keep their meaning. Rows of past rounds keep their paint.
+        A game hosted by a session server keeps its colors, since the server
+        scores the guesses by their names.
+
+        Args:
+            config (MastermindConfig): the new configuration.
+        """
+        relabeled = tuple(config.colors) != tuple(self.colors) and \
+            len(config.colors) == len(self.colors)
+        if relabeled and isinstance(self.state, RemoteGameState):
+            logger.warning("colors not reloaded for a remote game",
+                           extra={"fields": {"colors": config.colors}})
+        elif relabeled:
+            relabel = dict(zip(self.colors, config.colors))
+            self.colors = list(config.colors)
+            # the hints are searched over the new colors
+            self.hint_worker = None
+            self.secret_code = [relabel[color] for color in self.secret_code]
+            self.selection_stack = [relabel[color]
+                                    for color in self.selection_stack]
+            if hasattr(self, "selections_coordinate"):
+                # repaint the selection area and the current row
+                self.generate_selections()
+                for color in self.selection_stack:
+                    self.remove_selected_circle_color(color=color)
+                for index, color in enumerate(self.selection_stack):
+                    coordinate = self.marbles_coordinate[self.round][index]
+                    self.draw_solid_circle(x=coordinate['x'],
+                                           y=coordinate['y'],
+                                           radius=self.marble_radius,
+                                           color=color, pen=self.board_pen)
+        self.font = config.font
+        self.font_color = config.font_color
+        self.leaderboard_path = config.leaderboard_path
+        if config.leaderboard_address != getattr(
+                self.leaderboard_client, "address", None):
+            if self.leaderboard_client is not None:
+                self.leaderboard_client.close()
+            self.leaderboard_client = None
+            if config.leaderboard_address:
+                self.leaderboard_client = LeaderboardClient(
+                    config.leaderboard_address)
+        if self.leaderboard_layer is not None:
+            self.generate_leaderboard()
+
+    def enable_hot_reload(self, path: str, interval: int) -> None:
+        """ This method is to poll the modification time of the
+        configuration file and apply its changes without restarting the
+        window. The settings of the window's geometry are not reloaded.
+
+        Args:
+            path (str): the path of the configuration file.
+            interval (int): the milliseconds between two checks.
+        """
+        self.config_path = path
+        self.config_mtime = config_mtime(path)
+
+        def poll():
+            mtime = config_mtime(path)
+            if mtime is not None and mtime != self.config_mtime:
+                self.config_mtime = mtime
+                try:
+                    self.apply_config(load_config(path))
+                except (FileNotFoundError, ConfigError):
+                    # keep the current settings until the file is fixed
+                    pass
+            self.screen.ontimer(poll, interval)
+
+        self.screen.ontimer(poll, interval)
+
+    def save_snapshot(self) -> None:
+        """ This method is to save the unfinished game to the snapshot file.
+        A game hosted by a session server is never saved, because its secret
+        code is only known by the server. An adversary's game is saved with
+        the codes it still keeps.
+        """
+        if isinstance(self.state, RemoteGameState) or self.state.is_over:
+            return
+        try:
+            snapshot.save_snapshot(self.snapshot_path, self.state)
+        except OSError as e:
+            logger.warning("snapshot failed",
+                           extra={"fields": {"error": repr(e)}})
+
+    def enable_snapshots(self, path: str, interval: int) -> None:
+        """ This method is to save the unfinished game periodically, so it
+        can be resumed after the window is closed or the process crashes. A
+        snapshot is written only if a color was selected or cancelled, or a
+        round was checked, since the last one.
+
+        Args:
+            path (str): the path of the snapshot file.
+            interval (int): the milliseconds between two checks.
+        """
+        self.snapshot_path = path
+        saved = (self.round, tuple(self.selection_stack),
+                 len(self.state.history))
+
+        def poll():
+            nonlocal saved
+            current = (self.round, tuple(self.selection_stack),
+                       len(self.state.history))
+            if current != saved:
+                saved = current
+                self.save_snapshot()
+            self.screen.ontimer(poll, interval)
+
+        self.screen.ontimer(poll, interval)
+
+    def resume_snapshot(self) -> bool:
+        """ This method is to resume the game saved in the snapshot file.
+        The board is rebuilt with the screen's animation turned off, and
+        drawn once at the end, instead of replaying every click. A resumed
+        game is not recorded, since its first rounds were never recorded.
+
+        Returns:
+            bool: True if a saved game was resumed.
+        """
+        if self.snapshot_path is None or \
+                isinstance(self.state, RemoteGameState):
+            return False
+        state = snapshot.read_snapshot(self.snapshot_path)
+        if state is None or state.colors != self.colors or \
+                state.last_round != self.last_round:
+            return False
+        self.state = state
+        self.screen.tracer(0)
+        try:
+            for row, (guess, black, red) in enumerate(
+                    state.history.with_colors(self.colors)):
+                for index, color in enumerate(guess):
+                    coordinate = self.marbles_coordinate[row][index]
+                    self.draw_solid_circle(x=coordinate['x'],
+                                           y=coordinate['y'],
+                                           radius=self.marble_radius,
+                                           color=color, pen=self.board_pen)
+                self.light_up_regs(nums_correct_position=black,
+                                   nums_wrong_position=red, row=row)
+            for index, color in enumerate(self.selection_stack):
+                coordinate = self.marbles_coordinate[self.round][index]
+                self.draw_solid_circle(x=coordinate['x'],
+                                       y=coordinate['y'],
+                                       radius=self.marble_radius,
+                                       color=color, pen=self.board_pen)
+                self.remove_selected_circle_color(color=color)
+            self.move_arrow(distance=self.round * self.row_interval)
+            self.screen.update()
+        finally:
+            self.screen.tracer(1)
+        logger.info("resume", extra={"fields": {"round": self.round}})
+        return True
+
+    def canvas_counts(self) -> dict:
+        """ This method is to count what the window keeps drawn: every
+        drawing creates a turtle, and every line or fill a canvas item.
+
+        Returns:
+            dict: the number of turtles and of canvas items.
+        """
+        return {"turtles": len(self.screen.turtles()),
+                "canvas_items": len(self.screen.getcanvas().find_all())}
+
+    def enable_memory_diagnostics(self, path: str, interval: int) -> None:
+        """ This method is to trace the allocations of the window and
+        append a memory sample to a file periodically and after every
+        finished game.
+
+        Args:
+            path (str): the file of the samples.
+            interval (int): the milliseconds between two samples.
+        """
+        self.memory = MemoryDiagnostics(path)
+        self.memory.start()
+        self.record_memory("start")
+
+        def poll():
+            self.record_memory("interval")
+            self.screen.ontimer(poll, interval)
+
+        self.screen.ontimer(poll, interval)
+
+    def record_memory(self, event: str) -> None:
+        """ This method is to append a memory sample to the memory log, if
+        memory diagnostics are enabled.
+
+        Args:
+            event (str): why the sample is taken.
+        """
+        if self.memory is None:
+            return
+        try:
+            self.memory.sample(event, self.canvas_counts())
+        except OSError as e:
+            logger.warning("memory sample failed",
+                           extra={"fields": {"error": repr(e)}})
+
     def play(self) -> None:
         """ This method is to activate the onclick function, which allows
         users to click the UI to play the game
@@ -0,0 +1,167 @@
+import argparse
+import json
+import time
+import tracemalloc
+
+# the number of allocation sites written per sample
+TOP_ALLOCATIONS = 10
+# the frames kept per allocation; one frame is enough to find the line
+TRACE_FRAMES = 1
+
+
+class MemoryDiagnostics:
+    """ This class follows the memory of a long-running window. Each sample
+    is one line of JSON appended to a file: the memory traced by
+    tracemalloc, the counts given by the window, like its turtles and
+    canvas items, and the lines whose allocations grew the most since the
+    previous sample. A steady growth per finished game points to a leak.
+
+    Attributes:
+        path (str): the file of the samples.
+        top (int): the number of allocation sites written per sample.
+        games (int): the number of finished games sampled.
+        previous (tracemalloc.Snapshot): the allocations at the previous
+                                         sample.
+        tracing (bool): if this object started tracing.
+    """
+
+    def __init__(self, path: str, top: int = TOP_ALLOCATIONS) -> None:
+        """ Construct all the necessary attributes for MemoryDiagnostics
+        object.
+
+        Args:
+            path (str): the file of the samples.
+            top (int): the number of allocation sites written per sample.
+        """
+        self.path = path
+        self.top = top
+        self.games = 0
+        self.previous = None
+        self.tracing = False
+
+    def start(self) -> None:
+        """ This method is to start tracing the allocations, if they are not
+        traced yet, and take the first snapshot.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            self.tracing = True
+        self.previous = self.take_snapshot()
+
+    def stop(self) -> None:
+        """ This method is to stop tracing, if this object started it.
+        """
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+        self.previous = None
+
+    def take_snapshot(self) -> tracemalloc.Snapshot:
+        """ This method is to take a snapshot of the allocations, without
+        the ones of tracemalloc itself.
+
+        Returns:
+            tracemalloc.Snapshot: the snapshot.
+        """
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False,
+                               "<frozen importlib._bootstrap_external>"),
+        ))
+
+    def sample(self, event: str, counts: dict = None) -> dict:
+        """ This method is to append a sample to the file.
+
+        Args:
+            event (str): why the sample is taken, "game" once per finished
+                         game.
+            counts (dict): the counts of the window to be written, like
+                           its turtles and canvas items.
+
+        Raises:
+            OSError: if the file cannot be written.
+
+        Returns:
+            dict: the sample.
+        """
+        if event == "game":
+            self.games += 1
+        traced, peak = tracemalloc.get_traced_memory()
+        snapshot = self.take_snapshot()
+        growth = []
+        if self.previous is not None:
+            for statistic in snapshot.compare_to(self.previous,
+                                                 "lineno")[:self.top]:
+                if statistic.size_diff <= 0:
+                    continue
+                frame = statistic.traceback[0]
+                growth.append({"where": f"{frame.filename}:{frame.lineno}",
+                               "size": statistic.size_diff,
+                               "count": statistic.count_diff})
+        self.previous = snapshot
+        entry = {"time": round(time.time(), 3), "event": event,
+                 "games": self.games, "traced": traced, "peak": peak}
+        entry.update(counts or {})
+        entry["growth"] = growth
+        with open(self.path, 'a') as file:
+            file.write(json.dumps(entry) + "\n")
+        return entry
+
+
+def read_samples(path: str) -> list[dict]:
+    """ This function is to read the samples of a file, skipping a line
+    cut short by a crash.
+
+    Args:
+        path (str): the file of the samples.
+
+    Returns:
+        list[dict]: the samples.
+    """
+    samples = []
+    with open(path) as file:
+        for line in file:
+            try:
+                samples.append(json.loads(line))
+            except ValueError:
+                continue
+    return samples
+
+
+def trend(samples: list[dict]) -> dict:
+    """ This function is to compute how much each measure grew per finished
+    game, between the first and the last game samples.
+
+    Args:
+        samples (list[dict]): the samples.
+
+    Returns:
+        dict: the number of games, and per measure its growth per game, or
+              None if less than two games were sampled.
+    """
+    games = [sample for sample in samples if sample["event"] == "game"]
+    measures = [name for name in ("traced", "turtles", "canvas_items")
+                if all(name in sample for sample in games)]
+    if len(games) < 2:
+        return {"games": len(games),
+                "per_game": {name: None for name in measures}}
+    first, last = games[0], games[-1]
+    played = last["games"] - first["games"]
+    return {"games": len(games),
+            "per_game": {name: (last[name] - first[name]) / played
+                         for name in measures}}
+
+
+def main():
+    """ The main function prints the growth per game of a file of samples.
+    """
+    parser = argparse.ArgumentParser(
+        description="Report the memory growth per game of a window.")
+    parser.add_argument("path", help="the file of the samples")
+    args = parser.parse_args()
+    print(json.dumps(trend(read_samples(args.path)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
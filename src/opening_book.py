@@ -0,0 +1,261 @@
+import argparse
+import functools
+import hashlib
+import json
+import os
+import time
+from src.code_table import code_table
+from src.config import CODE_LENGTH, ConfigError, MastermindConfig, \
+    load_config
+from src.solver import Solver, STRATEGIES
+
+BOOK_VERSION = 1
+# the directory of the opening books shipped with the game
+BOOK_DIR = "src/books"
+DEFAULT_STRATEGY = "entropy"
+
+
+def book_key(colors: list, code_length: int, strategy: str) -> str:
+    """ This function is to return the hash of the configuration an opening
+    book is built for.
+
+    Args:
+        colors (list): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        strategy (str): the solver strategy of the book.
+
+    Returns:
+        str: the hash, used as the name of the book file.
+    """
+    text = json.dumps({"colors": list(colors), "code_length": code_length,
+                       "repeats": False, "strategy": strategy})
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def book_path(directory: str, colors: list, code_length: int,
+              strategy: str) -> str:
+    """ This function is to return the path of an opening book.
+
+    Args:
+        directory (str): the directory of the books.
+        colors (list): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        strategy (str): the solver strategy of the book.
+
+    Returns:
+        str: the path of the book file.
+    """
+    key = book_key(colors, code_length, strategy)
+    return os.path.join(directory, f"book-{key}.json")
+
+
+def path_key(history) -> str:
+    """ This function is to name a position of the book by the feedback of
+    the guesses so far, like "0,2/1,1".
+
+    Args:
+        history (Iterable[tuple]): the black and red pegs of each guess.
+
+    Returns:
+        str: the name of the position.
+    """
+    return "/".join(f"{black},{red}" for black, red in history)
+
+
+def build_book(colors: list, code_length: int = CODE_LENGTH,
+               strategy: str = DEFAULT_STRATEGY, plies: int = 3) -> dict:
+    """ This function is to search the guesses of a strategy for the first
+    plies of every game.
+
+    Args:
+        colors (list): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        strategy (str): the solver strategy.
+        plies (int): the number of guesses stored per game.
+
+    Returns:
+        dict: the book, with the guesses as numbers of the table's codes.
+    """
+    table = code_table(tuple(colors), code_length)
+    number = {code: index for index, code in enumerate(table.guesses)}
+    moves = {}
+
+    def search(history: list) -> None:
+        # the book is searched, not read from a shipped one
+        solver = Solver(colors, code_length, strategy=strategy, book=None)
+        for guess, black, red in history:
+            solver.update(guess, black, red)
+        guess = solver.next_guess()
+        moves[path_key((black, red) for _, black, red in history)] = \
+            number[guess]
+        if len(history) + 1 == plies:
+            return
+        for feedback, codes in solver.table.classes(solver.mask,
+                                                    guess).items():
+            # a won game or a single candidate needs no book
+            if feedback != (code_length, 0) and codes.bit_count() > 1:
+                search(history + [(guess, *feedback)])
+
+    search([])
+    return {"v": BOOK_VERSION,
+            "key": book_key(colors, code_length, strategy),
+            "colors": list(colors), "code_length": code_length,
+            "strategy": strategy, "plies": plies, "moves": moves}
+
+
+def save_book(directory: str, book: dict) -> str:
+    """ This function is to write an opening book to its file.
+
+    Args:
+        directory (str): the directory of the books.
+        book (dict): the book.
+
+    Returns:
+        str: the path of the book file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = book_path(directory, book["colors"], book["code_length"],
+                     book["strategy"])
+    with open(path, 'w') as file:
+        json.dump(book, file, separators=(',', ':'), sort_keys=True)
+    return path
+
+
+class OpeningBook:
+    """ This class answers the first guesses of a game from a book file. The
+    file is read the first time a guess is looked up.
+
+    Attributes:
+        path (str): the path of the book file.
+        colors (list): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        strategy (str): the solver strategy of the book.
+    """
+
+    def __init__(self, path: str, colors: list, code_length: int,
+                 strategy: str) -> None:
+        """ Construct all the necessary attributes for OpeningBook object.
+
+        Args:
+            path (str): the path of the book file.
+            colors (list): the colors of the game.
+            code_length (int): the number of colors in a secret code.
+            strategy (str): the solver strategy of the book.
+        """
+        self.path = path
+        self.colors = list(colors)
+        self.code_length = code_length
+        self.strategy = strategy
+        self.moves = None
+
+    def load(self) -> dict:
+        """ This method is to read the book file once. A missing, invalid or
+        mismatched file gives an empty book.
+
+        Returns:
+            dict: per position, the number of the guess.
+        """
+        if self.moves is None:
+            self.moves = {}
+            try:
+                with open(self.path) as file:
+                    book = json.load(file)
+                if book["v"] == BOOK_VERSION and book["key"] == book_key(
+                        self.colors, self.code_length, self.strategy):
+                    self.moves = book["moves"]
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+        return self.moves
+
+    def lookup(self, history) -> tuple:
+        """ This method is to return the book's guess after the guesses so
+        far, if they all followed the book.
+
+        Args:
+            history (Iterable[tuple]): the guess and the black and red pegs
+                                       of each round so far.
+
+        Returns:
+            tuple: the guess, or None if the game left the book.
+        """
+        moves = self.load()
+        guesses = code_table(tuple(self.colors), self.code_length).guesses
+        feedbacks = []
+        for guess, black, red in history:
+            number = moves.get(path_key(feedbacks))
+            if number is None or guesses[number] != tuple(guess):
+                return None
+            feedbacks.append((black, red))
+        number = moves.get(path_key(feedbacks))
+        return None if number is None else guesses[number]
+
+
+@functools.lru_cache(maxsize=16)
+def load_book(colors: tuple, code_length: int = CODE_LENGTH,
+              strategy: str = DEFAULT_STRATEGY,
+              directory: str = BOOK_DIR) -> OpeningBook:
+    """ This function is to return the shared opening book of a
+    configuration. The book file is read on its first lookup.
+
+    Args:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        strategy (str): the solver strategy of the book.
+        directory (str): the directory of the books.
+
+    Returns:
+        OpeningBook: the book.
+    """
+    return OpeningBook(book_path(directory, colors, code_length, strategy),
+                       colors, code_length, strategy)
+
+
+def shipped_book(colors: tuple, code_length: int = CODE_LENGTH,
+                 strategy: str = DEFAULT_STRATEGY,
+                 directory: str = BOOK_DIR) -> OpeningBook:
+    """ This function is to return the opening book of a configuration if
+    its file exists.
+
+    Args:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        strategy (str): the solver strategy of the book.
+        directory (str): the directory of the books.
+
+    Returns:
+        OpeningBook: the book, or None if there is no book file.
+    """
+    if not os.path.exists(book_path(directory, colors, code_length,
+                                    strategy)):
+        return None
+    return load_book(tuple(colors), code_length, strategy, directory)
+
+
+def main():
+    """ The main function builds the opening book of the configured game.
+    """
+    parser = argparse.ArgumentParser(
+        description="Build the opening book of the configured game.")
+    parser.add_argument("--config", default="src/config.txt",
+                        help="the configuration file of the game")
+    parser.add_argument("--strategy", choices=tuple(STRATEGIES),
+                        default=DEFAULT_STRATEGY, help="the solver strategy")
+    parser.add_argument("--plies", type=int, default=3,
+                        help="the number of guesses stored per game")
+    parser.add_argument("--directory", default=BOOK_DIR,
+                        help="the directory of the books")
+    args = parser.parse_args()
+    try:
+        config = load_config(args.config)
+    except (FileNotFoundError, ConfigError):
+        config = MastermindConfig()
+    start = time.perf_counter()
+    book = build_book(list(config.colors), CODE_LENGTH, args.strategy,
+                      args.plies)
+    path = save_book(args.directory, book)
+    print(f"{path}: {len(book['moves'])} positions in "
+          f"{time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
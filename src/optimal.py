@@ -0,0 +1,367 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import time
+from src.code_table import CodeTable, code_table
+from src.config import CODE_LENGTH, ConfigError, MastermindConfig, \
+    load_config
+from src.decision_tree import TREE_VERSION, tree_path
+from src.opening_book import BOOK_DIR, book_key
+from src.shared_tables import SharedTableRegistry, attach
+from src.symmetry import anchor_symmetries, canonical_set, \
+    unique_guesses
+
+# "expected" minimizes the total number of guesses over all secret codes,
+# "worst" the number of guesses of the hardest one
+OBJECTIVES = ("expected", "worst")
+
+
+class OptimalSearch:
+    """ This class searches the optimal strategy for sets of candidate codes
+    depth-first. A guess is skipped as soon as a lower bound of its cost
+    reaches the best cost found so far, and the results are kept in a
+    transposition table. Given the first guess of the game, the table is
+    keyed by the canonical set of candidates under the relabelings of colors
+    and pegs that keep that guess, so a set reached by different guesses,
+    or equivalent to one searched already, is searched once.
+
+    Attributes:
+        table (CodeTable): the codes of the game.
+        objective (str): "expected" or "worst".
+        symmetries (tuple): the relabelings keeping the first guess, or
+                            none.
+        values (dict): per canonical set of candidates, its cost and
+                       whether it is exact or only a lower bound.
+        best (dict): per canonical set of candidates, the number of its
+                     best guess.
+        nodes (int): the number of sets searched.
+    """
+
+    def __init__(self, table: CodeTable, objective: str = "expected",
+                 anchor: tuple = None) -> None:
+        """ Construct all the necessary attributes for OptimalSearch object.
+
+        Args:
+            table (CodeTable): the codes of the game.
+            objective (str): "expected" or "worst".
+            anchor (tuple): the first guess of the game, if the sets
+                            searched all follow it.
+
+        Raises:
+            ValueError: if the objective is unknown.
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"unknown objective {objective!r}")
+        self.table = table
+        self.objective = objective
+        self.symmetries = ()
+        if anchor is not None:
+            self.symmetries = anchor_symmetries(table.colors,
+                                                table.code_length,
+                                                tuple(anchor))
+        self.number = {code: index
+                       for index, code in enumerate(table.guesses)}
+        self.values = {}
+        self.best = {}
+        self.nodes = 0
+        length = table.code_length
+        # every feedback but the winning one
+        self.branches = (length + 1) * (length + 2) // 2 - 1
+        self.bounds = [0, 1]
+
+    def lower_bound(self, size: int) -> int:
+        """ This method is to bound the cost of any set of a size, as if
+        each guess could win and split the other codes evenly over every
+        feedback.
+
+        Args:
+            size (int): the number of candidates.
+
+        Returns:
+            int: the lower bound.
+        """
+        while len(self.bounds) <= size:
+            count = len(self.bounds)
+            share, extra = divmod(count - 1, self.branches)
+            if self.objective == "expected":
+                rest = (extra * self.bounds[share + 1] +
+                        (self.branches - extra) * self.bounds[share])
+                self.bounds.append(count + rest)
+            else:
+                self.bounds.append(1 + self.bounds[share + (extra > 0)])
+        return self.bounds[size]
+
+    def combine(self, size: int, costs) -> int:
+        """ This method is to add up the cost of a guess from the costs of
+        its feedback classes.
+
+        Args:
+            size (int): the number of candidates.
+            costs (Iterable[int]): the costs of the classes but the winning
+                                   one.
+
+        Returns:
+            int: the cost of the guess.
+        """
+        if self.objective == "expected":
+            return size + sum(costs)
+        return 1 + max(costs, default=0)
+
+    def ordered_guesses(self, mask: int, free: tuple) -> list[tuple]:
+        """ This method is to list the guesses that split a set, the lowest
+        lower bound first. Guesses equivalent under the relabeling of the
+        free colors are listed once.
+
+        Args:
+            mask (int): the set of candidates.
+            free (tuple): the colors no guess used so far.
+
+        Returns:
+            list[tuple]: the lower bound, the guess and its classes but the
+                         winning one, largest first.
+        """
+        size = mask.bit_count()
+        win = (self.table.code_length, 0)
+        options = []
+        for guess in unique_guesses(self.table.colors,
+                                    self.table.code_length, free, False):
+            classes = self.table.classes(mask, guess)
+            if len(classes) == 1 and win not in classes:
+                # every candidate gives the same feedback
+                continue
+            children = sorted((codes for feedback, codes in classes.items()
+                               if feedback != win),
+                              key=int.bit_count, reverse=True)
+            bound = self.combine(size, [self.lower_bound(codes.bit_count())
+                                        for codes in children])
+            options.append((bound, win not in classes,
+                            self.number[guess], children))
+        options.sort(key=lambda option: option[:3])
+        return [(bound, number, children)
+                for bound, _, number, children in options]
+
+    def solve(self, mask: int, limit: float = math.inf,
+              free: tuple = ()) -> int:
+        """ This method is to return the cost of the optimal strategy for a
+        set of candidates, if it is lower than a limit. Otherwise, the
+        returned cost is only a lower bound, at least the limit.
+
+        Args:
+            mask (int): the set of candidates.
+            limit (float): the cost to beat.
+            free (tuple): the colors no guess used so far.
+
+        Returns:
+            int: the optimal cost, or a lower bound of it.
+        """
+        size = mask.bit_count()
+        if size <= 2:
+            # guess one candidate, then the other
+            if self.objective == "expected":
+                return 2 * size - 1
+            return size
+        key, symmetry = canonical_set(mask, self.symmetries)
+        value, exact = self.values.get(key, (0, False))
+        if exact or value >= limit:
+            return value
+        value = max(value, self.lower_bound(size))
+        if value >= limit:
+            return value
+        self.nodes += 1
+        best = None
+        for bound, number, children in self.ordered_guesses(mask, free):
+            if bound >= limit:
+                break
+            guess = self.table.guesses[number]
+            cost = self.guess_cost(size, children, limit, tuple(
+                color for color in free if color not in guess))
+            if cost < limit:
+                best, limit = number, cost
+        if best is not None:
+            self.values[key] = (limit, True)
+            # the guess is stored for the canonical set
+            self.best[key] = best if symmetry is None else symmetry[0][best]
+            return limit
+        # every guess costs at least the limit
+        value = max(value, limit)
+        self.values[key] = (value, False)
+        return value
+
+    def guess_cost(self, size: int, children: list[int], limit: float,
+                   free: tuple) -> int:
+        """ This method is to return the cost of a guess from its feedback
+        classes, if it is lower than a limit. Otherwise, the returned cost is
+        only a lower bound, at least the limit.
+
+        Args:
+            size (int): the number of candidates.
+            children (list[int]): the classes of the guess but the winning
+                                  one.
+            limit (float): the cost to beat.
+            free (tuple): the colors no guess used, including this one.
+
+        Returns:
+            int: the cost of the guess, or a lower bound of it.
+        """
+        costs = [self.lower_bound(codes.bit_count()) for codes in children]
+        for index, codes in enumerate(children):
+            # the most this class may cost for the guess to beat limit
+            if self.objective == "expected":
+                room = limit - (self.combine(size, costs) - costs[index])
+            else:
+                room = limit - 1
+            costs[index] = self.solve(codes, room, free)
+            if self.combine(size, costs) >= limit:
+                break
+        return self.combine(size, costs)
+
+    def decision_tree(self, mask: int) -> list:
+        """ This method is to serialize the strategy found for a set.
+
+        Args:
+            mask (int): a set whose optimal cost was found.
+
+        Returns:
+            list: the number of the guess, and per feedback the subtree of
+                  its class, like [guess, [[black, red, subtree], ...]].
+        """
+        if mask.bit_count() <= 2:
+            number = (mask & -mask).bit_length() - 1
+        else:
+            key, symmetry = canonical_set(mask, self.symmetries)
+            number = self.best[key]
+            if symmetry is not None:
+                number = symmetry[1][number]
+        guess = self.table.guesses[number]
+        branches = []
+        for (black, red), codes in sorted(self.table.classes(mask,
+                                                             guess).items()):
+            if (black, red) != (self.table.code_length, 0):
+                branches.append([black, red, self.decision_tree(codes)])
+        return [number, branches]
+
+
+def evaluate_class(arguments: tuple) -> tuple:
+    """ This function is to search the optimal strategy after the first
+    guess for one of its feedback classes, in a worker process.
+
+    Args:
+        arguments (tuple): the colors, code length, objective, first guess,
+                           feedback, set of candidates and free colors of
+                           the class.
+
+    Returns:
+        tuple: the feedback, the optimal cost of the class, its decision
+               tree and the number of sets searched.
+    """
+    colors, code_length, objective, first, feedback, mask, free = arguments
+    search = OptimalSearch(code_table(colors, code_length), objective,
+                           first)
+    cost = search.solve(mask, free=free)
+    return feedback, cost, search.decision_tree(mask), search.nodes
+
+
+def optimal_tree(colors: list, code_length: int = CODE_LENGTH,
+                 objective: str = "expected", workers: int = None) -> dict:
+    """ This function is to search the optimal strategy of a game. Every
+    first guess is equivalent under the relabeling of colors and pegs, so
+    only one is searched, and its feedback classes are searched in parallel
+    by a pool of processes, the largest first. The score table of the game
+    is built once in shared memory and attached by every process, unless it
+    is too large.
+
+    Args:
+        colors (list): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        objective (str): "expected" or "worst".
+        workers (int): the number of processes, all cores by default.
+
+    Returns:
+        dict: the optimal cost, the decision tree and the search figures.
+    """
+    table = code_table(tuple(colors), code_length)
+    first = unique_guesses(table.colors, code_length, table.colors, True)[0]
+    search = OptimalSearch(table, objective)
+    free = tuple(color for color in table.colors if color not in first)
+    classes = sorted(((feedback, codes) for feedback, codes in
+                      table.classes(table.full, first).items()
+                      if feedback != (code_length, 0)),
+                     key=lambda item: item[1].bit_count(), reverse=True)
+    tasks = [(table.colors, code_length, objective, first, feedback, codes,
+              free) for feedback, codes in classes]
+    branches = []
+    costs = []
+    nodes = 0
+    with SharedTableRegistry() as registry:
+        registry.publish(table.colors, code_length)
+        with multiprocessing.Pool(workers or os.cpu_count(), attach,
+                                  (registry.handles(),)) as pool:
+            for (black, red), cost, subtree, searched in \
+                    pool.imap_unordered(evaluate_class, tasks):
+                branches.append([black, red, subtree])
+                costs.append(cost)
+                nodes += searched
+    return {"v": TREE_VERSION,
+            "key": book_key(colors, code_length, f"optimal-{objective}"),
+            "colors": list(colors),
+            "code_length": code_length, "objective": objective,
+            "cost": search.combine(len(table), costs), "codes": len(table),
+            "nodes": nodes,
+            "tree": [search.number[first], sorted(branches)]}
+
+
+def save_tree(directory: str, result: dict) -> str:
+    """ This function is to write an optimal decision tree next to the
+    opening books, under a name of its own.
+
+    Args:
+        directory (str): the directory of the books.
+        result (dict): the result of optimal_tree.
+
+    Returns:
+        str: the path of the tree file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = tree_path(directory, result["colors"], result["code_length"],
+                     result["objective"])
+    with open(path, 'w') as file:
+        json.dump(result, file, separators=(',', ':'))
+    return path
+
+
+def main():
+    """ The main function searches the optimal strategy of the configured
+    game and saves its decision tree.
+    """
+    parser = argparse.ArgumentParser(
+        description="Search the optimal strategy of the configured game.")
+    parser.add_argument("--config", default="src/config.txt",
+                        help="the configuration file of the game")
+    parser.add_argument("--objective", choices=OBJECTIVES,
+                        default="expected",
+                        help="minimize the expected or the worst case "
+                             "number of guesses")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="the number of processes, all cores by default")
+    parser.add_argument("--directory", default=BOOK_DIR,
+                        help="the directory of the books")
+    args = parser.parse_args()
+    try:
+        config = load_config(args.config)
+    except (FileNotFoundError, ConfigError):
+        config = MastermindConfig()
+    start = time.perf_counter()
+    result = optimal_tree(list(config.colors), CODE_LENGTH, args.objective,
+                          args.workers)
+    path = save_tree(args.directory, result)
+    total = result["cost"]
+    average = total / result["codes"] if args.objective == "expected" \
+        else total
+    print(f"{path}: cost {total} ({average:.4f}), {result['nodes']} sets "
+          f"searched in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
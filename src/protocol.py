@@ -0,0 +1,214 @@
+import json
+import select
+import socket
+
+# the prefix of a Unix socket address, i.e. "unix:/tmp/mastermind.sock"
+UNIX_PREFIX = "unix:"
+DEFAULT_HOST = "127.0.0.1"
+
+
+class NoReplyError(OSError):
+    """ This exception is raised when a request was sent but its reply could
+    not be read, so the service may or may not have applied it.
+    """
+
+
+def parse_address(address: str) -> tuple:
+    """ This function is to parse the address of a local service. The address
+    is either "unix:<path>", "<host>:<port>" or "<port>".
+
+    Args:
+        address (str): the address of the service.
+
+    Returns:
+        tuple: ("unix", path) or ("tcp", host, port).
+    """
+    address = str(address).strip()
+    if address.startswith(UNIX_PREFIX):
+        return ("unix", address[len(UNIX_PREFIX):])
+    if ":" in address:
+        host, port = address.rsplit(':', 1)
+        return ("tcp", host or DEFAULT_HOST, int(port))
+    return ("tcp", DEFAULT_HOST, int(address))
+
+
+def encode(message: dict) -> bytes:
+    """ This function is to encode a message as one line of JSON.
+
+    Args:
+        message (dict): the message to be sent.
+
+    Returns:
+        bytes: the encoded line ending with "\\n".
+    """
+    return json.dumps(message, separators=(',', ':')).encode() + b"\n"
+
+
+def decode(line: bytes) -> dict:
+    """ This function is to decode one line of JSON into a message.
+
+    Args:
+        line (bytes): the received line.
+
+    Raises:
+        ValueError: if the line is not a JSON object.
+
+    Returns:
+        dict: the decoded message.
+    """
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("a message is a JSON object")
+    return message
+
+
+async def start_server(handler, address: str,
+                       backlog: int = 4096):
+    """ This function is to start an asyncio server on a TCP port or a Unix
+    socket given by its address.
+
+    Args:
+        handler: the coroutine handling each (reader, writer) connection.
+        address (str): the address of the service.
+        backlog (int): the number of pending connections to queue.
+
+    Returns:
+        asyncio.AbstractServer: the started server.
+    """
+    # asyncio is only imported by the services, not by the game clients
+    import asyncio
+    kind, *where = parse_address(address)
+    if kind == "unix":
+        return await asyncio.start_unix_server(handler, path=where[0],
+                                               backlog=backlog)
+    return await asyncio.start_server(handler, host=where[0], port=where[1],
+                                      backlog=backlog)
+
+
+async def open_connection(address: str) -> tuple:
+    """ This function is to open an asyncio connection to a service.
+
+    Args:
+        address (str): the address of the service.
+
+    Returns:
+        tuple: the (reader, writer) pair of the connection.
+    """
+    import asyncio
+    kind, *where = parse_address(address)
+    if kind == "unix":
+        return await asyncio.open_unix_connection(path=where[0])
+    return await asyncio.open_connection(host=where[0], port=where[1])
+
+
+def connect(address: str, timeout: float) -> socket.socket:
+    """ This function is to open a blocking socket to a service.
+
+    Args:
+        address (str): the address of the service.
+        timeout (float): the timeout of connecting and of each request.
+
+    Returns:
+        socket.socket: the connected socket.
+    """
+    kind, *where = parse_address(address)
+    if kind == "unix":
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(where[0])
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    sock = socket.create_connection((where[0], where[1]), timeout=timeout)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def is_stale(sock: socket.socket) -> bool:
+    """ This function is to check if an idle connection can still carry a
+    request. Between two requests the service sends nothing, so a readable
+    socket means it was closed by the service, or is out of step.
+
+    Args:
+        sock (socket.socket): the idle connection.
+
+    Returns:
+        bool: True if the connection must be replaced.
+    """
+    readable, _, _ = select.select([sock], [], [], 0)
+    return bool(readable)
+
+
+class LineClient:
+    """ This class keeps one blocking connection to a local service and
+    reuses it for every request. A connection closed by the service is
+    replaced before sending, and a request is sent again only if it could
+    not be sent at all: once it is sent, the service may have applied it,
+    so a failure to read the reply is raised instead of sending it twice.
+
+    Attributes:
+        address (str): the address of the service.
+        timeout (float): the timeout of connecting and of each request.
+    """
+
+    def __init__(self, address: str, timeout: float = 0.5) -> None:
+        """ Construct all the necessary attributes for LineClient object.
+
+        Args:
+            address (str): the address of the service.
+            timeout (float): the timeout of connecting and of each request.
+        """
+        self.address = address
+        self.timeout = timeout
+        self.sock = None
+        self.reader = None
+
+    def request(self, message: dict) -> dict:
+        """ This method is to send a message and wait for its reply.
+
+        Args:
+            message (dict): the message to be sent.
+
+        Raises:
+            OSError: if the service cannot be reached.
+            NoReplyError: if the request was sent but the reply cannot be
+                          read.
+
+        Returns:
+            dict: the reply of the service.
+        """
+        if self.sock is not None and is_stale(self.sock):
+            self.close()
+        for attempt in range(2):
+            try:
+                if self.sock is None:
+                    self.sock = connect(self.address, self.timeout)
+                    self.reader = self.sock.makefile('rb')
+                self.sock.sendall(encode(message))
+                break
+            except OSError:
+                self.close()
+                if attempt == 1:
+                    raise
+        try:
+            line = self.reader.readline()
+            if not line:
+                raise ConnectionResetError("connection closed by server")
+            return decode(line)
+        except (OSError, ValueError) as e:
+            # the connection is out of step with the replies
+            self.close()
+            raise NoReplyError(f"no reply to {message.get('op')}: {e}") \
+                from e
+
+    def close(self) -> None:
+        """ This method is to close the connection.
+        """
+        if self.reader is not None:
+            self.reader.close()
+        if self.sock is not None:
+            self.sock.close()
+        self.sock = None
+        self.reader = None
@@ -0,0 +1,255 @@
+import argparse
+import multiprocessing
+import os
+import time
+from src import game_recorder
+from src.game_recorder import CHECK, LOSE, NONE, SELECT, UNDO, WIN
+from src.game_state import GameState
+
+
+class ReplayResult:
+    """ This class holds the result of replaying one recorded session.
+
+    Attributes:
+        path (str): the file of the session.
+        outcome (str): "win", "lose" or "unfinished" as recorded.
+        rounds (int): the number of checks replayed.
+        errors (list): the differences between the recording and the game
+                       logic; empty if the session matches.
+    """
+
+    __slots__ = ("path", "outcome", "rounds", "errors")
+
+    def __init__(self, path: str) -> None:
+        """ Construct all the necessary attributes for ReplayResult object.
+
+        Args:
+            path (str): the file of the session.
+        """
+        self.path = path
+        self.outcome = "unfinished"
+        self.rounds = 0
+        self.errors = []
+
+    @property
+    def ok(self) -> bool:
+        """ If the session matches the game logic. """
+        return not self.errors
+
+
+def replay_session(session: game_recorder.Session) -> ReplayResult:
+    """ This function is to replay a recorded session through the game logic
+    and verify that every selection, feedback and outcome matches.
+
+    Args:
+        session (Session): the recorded session.
+
+    Returns:
+        ReplayResult: the result of the replay.
+    """
+    result = ReplayResult(session.path)
+    colors = session.colors
+    state = GameState(colors=colors, code_length=len(session.secret))
+    state.secret_code = [colors[index] for index in session.secret]
+    for number, (_, event, color, round_index, feedback) in enumerate(
+            session.events()):
+        if round_index != NONE and round_index != state.round:
+            result.errors.append(f"event {number}: round {round_index}, "
+                                 f"expected {state.round}")
+            break
+        if event == SELECT or event == UNDO:
+            if color >= len(colors):
+                result.errors.append(f"event {number}: bad color {color}")
+                break
+            if event == SELECT and not state.select(colors[color]):
+                result.errors.append(f"event {number}: cannot select "
+                                     f"{colors[color]}")
+                break
+            if event == UNDO and state.undo() != colors[color]:
+                result.errors.append(f"event {number}: cannot undo "
+                                     f"{colors[color]}")
+                break
+        elif event == CHECK:
+            if not state.can_check():
+                result.errors.append(f"event {number}: cannot check")
+                break
+            checked = state.check()
+            result.rounds += 1
+            expected = game_recorder.pack_feedback(
+                checked.get_number_of_correct_position(),
+                checked.get_number_of_wrong_position())
+            if feedback != expected:
+                result.errors.append(
+                    f"event {number}: feedback "
+                    f"{game_recorder.unpack_feedback(feedback)}, expected "
+                    f"{game_recorder.unpack_feedback(expected)}")
+                break
+            if not state.is_over:
+                state.next_round()
+        elif event == WIN or event == LOSE:
+            result.outcome = "win" if event == WIN else "lose"
+            if not state.is_over or state.is_win != (event == WIN):
+                result.errors.append(f"event {number}: unexpected "
+                                     f"{result.outcome}")
+            break
+        else:
+            result.errors.append(f"event {number}: unknown event {event}")
+            break
+    if not result.errors and state.is_over and result.outcome == \
+            "unfinished":
+        result.errors.append("the game ended without an outcome")
+    return result
+
+
+def replay_file(path: str) -> ReplayResult:
+    """ This function is to read and replay one session file.
+
+    Args:
+        path (str): the file of the session.
+
+    Returns:
+        ReplayResult: the result of the replay.
+    """
+    try:
+        return replay_session(game_recorder.read_session(path))
+    except (OSError, ValueError) as e:
+        result = ReplayResult(path)
+        result.errors.append(str(e))
+        return result
+
+
+def iter_session_paths(paths: list[str]):
+    """ This function is to stream the session files in files and
+    directories.
+
+    Args:
+        paths (list[str]): session files or directories of session files.
+
+    Yields:
+        str: the path of each session file.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name.endswith(game_recorder.SESSION_SUFFIX):
+                        yield entry.path
+        else:
+            yield path
+
+
+def replay_paths(paths: list[str], workers: int = 1):
+    """ This function is to replay session files as a stream, optionally
+    across a pool of processes.
+
+    Args:
+        paths (list[str]): session files or directories of session files.
+        workers (int): the number of processes.
+
+    Yields:
+        ReplayResult: the result of each session.
+    """
+    if workers <= 1:
+        yield from map(replay_file, iter_session_paths(paths))
+        return
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap_unordered(replay_file, iter_session_paths(paths),
+                                       chunksize=64)
+
+
+def render_session(session: game_recorder.Session, config,
+                   rate: float) -> None:
+    """ This function is to replay a session on the game window, faster than
+    it was played by the given rate.
+
+    Args:
+        session (Session): the recorded session.
+        config (MastermindConfig): the configuration of the window.
+        rate (float): how many times faster than recorded.
+    """
+    from src.mastermind import Mastermind
+    kwargs = config.mastermind_kwargs()
+    kwargs["colors"] = list(session.colors)
+    mastermind = Mastermind(**kwargs)
+    mastermind.initilize_turtle()
+    mastermind.generate_frame()
+    mastermind.generate_check_button()
+    mastermind.generate_x_button()
+    mastermind.generate_marbles()
+    mastermind.generate_regs()
+    mastermind.generate_selections()
+    mastermind.generate_arrow()
+    mastermind.secret_code = [session.colors[index]
+                              for index in session.secret]
+    events = list(session.events())
+
+    def play(number):
+        if number == len(events):
+            return
+        _, event, color, _, _ = events[number]
+        if event == SELECT:
+            mastermind.click_selection_button(color=session.colors[color])
+        elif event == UNDO:
+            mastermind.click_x_button()
+        elif event == CHECK:
+            mastermind.state.check()
+            if mastermind.state.is_over:
+                _, black, red = mastermind.state.history[-1]
+                mastermind.light_up_regs(black, red)
+            else:
+                mastermind.proceed_to_next_round()
+        elif event in (WIN, LOSE):
+            path = "src/winner.gif" if event == WIN else "src/Lose.gif"
+            mastermind.draw_image(x=0, y=0, path=path)
+            return
+        if number + 1 < len(events):
+            delay = max(1, int(events[number + 1][0] / rate))
+            mastermind.screen.ontimer(lambda: play(number + 1), delay)
+
+    mastermind.screen.ontimer(lambda: play(0), 1)
+    mastermind.maintain()
+
+
+def main():
+    """ The main function replays recorded sessions and reports the ones
+    that do not match the game logic.
+    """
+    parser = argparse.ArgumentParser(
+        description="Replay recorded Mastermind sessions.")
+    parser.add_argument("paths", nargs="+",
+                        help="session files or directories")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="the number of processes")
+    parser.add_argument("--render", action="store_true",
+                        help="show the first session on the game window")
+    parser.add_argument("--rate", type=float, default=10.0,
+                        help="how many times faster than recorded to render")
+    parser.add_argument("--config", default="src/config.txt",
+                        help="the configuration of the rendered window")
+    args = parser.parse_args()
+    if args.render:
+        from src.config import ConfigError, MastermindConfig, load_config
+        try:
+            config = load_config(args.config)
+        except (FileNotFoundError, ConfigError):
+            config = MastermindConfig()
+        path = next(iter_session_paths(args.paths))
+        render_session(game_recorder.read_session(path), config,
+                       rate=args.rate)
+        return
+    start = time.perf_counter()
+    total = failed = 0
+    for result in replay_paths(args.paths, workers=args.workers):
+        total += 1
+        if not result.ok:
+            failed += 1
+            print(f"{result.path}: {'; '.join(result.errors)}")
+    elapsed = time.perf_counter() - start
+    print(f"{total} sessions, {failed} mismatched, "
+          f"{total / elapsed if elapsed else 0:.0f} sessions/s")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
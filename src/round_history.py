@@ -0,0 +1,124 @@
+class RoundHistory:
+    """ This class stores the guess and the black and red pegs of each
+    checked round in one preallocated bytearray. A guess is stored as the
+    indices of its colors, so a round takes code_length + 2 bytes. When the
+    store is full, the oldest round is overwritten.
+
+    Attributes:
+        capacity (int): the number of rounds that can be stored.
+        code_length (int): the number of colors in a guess.
+    """
+
+    __slots__ = ("capacity", "code_length", "stride", "buffer", "start",
+                 "size")
+
+    def __init__(self, capacity: int, code_length: int = 4) -> None:
+        """ Construct all the necessary attributes for RoundHistory object.
+
+        Args:
+            capacity (int): the number of rounds that can be stored.
+            code_length (int): the number of colors in a guess.
+        """
+        self.capacity = capacity
+        self.code_length = code_length
+        # the color indices of the guess, then the black and red pegs
+        self.stride = code_length + 2
+        self.buffer = bytearray(capacity * self.stride)
+        self.start = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        """ This method is to return the number of stored rounds.
+
+        Returns:
+            int: the number of stored rounds.
+        """
+        return self.size
+
+    def __getitem__(self, index: int) -> tuple:
+        """ This method is to return a stored round, the oldest first.
+
+        Args:
+            index (int): the index of the round, negative from the newest.
+
+        Raises:
+            IndexError: if there is no such round.
+
+        Returns:
+            tuple: the color indices of the guess, the black and red pegs.
+        """
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("round history index out of range")
+        offset = (self.start + index) % self.capacity * self.stride
+        end = offset + self.code_length
+        return (tuple(self.buffer[offset:end]), self.buffer[end],
+                self.buffer[end + 1])
+
+    def __iter__(self):
+        """ This method is to iterate over the stored rounds, the oldest
+        first.
+
+        Yields:
+            tuple: the color indices of the guess, the black and red pegs.
+        """
+        for index in range(self.size):
+            yield self[index]
+
+    def __eq__(self, other) -> bool:
+        """ This method is to compare the stored rounds of two histories.
+
+        Args:
+            other (RoundHistory): the other history.
+
+        Returns:
+            bool: True if both hold the same rounds.
+        """
+        if not isinstance(other, RoundHistory):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def append(self, guess, black: int, red: int) -> None:
+        """ This method is to store a checked round.
+
+        Args:
+            guess (Sequence[int]): the color indices of the guess.
+            black (int): the number of colors in the correct position.
+            red (int): the number of colors in the wrong position.
+
+        Raises:
+            ValueError: if the guess has the wrong length.
+        """
+        if len(guess) != self.code_length:
+            raise ValueError(f"a guess has {self.code_length} colors")
+        if self.size == self.capacity:
+            position = self.start
+            self.start = (self.start + 1) % self.capacity
+        else:
+            position = (self.start + self.size) % self.capacity
+            self.size += 1
+        offset = position * self.stride
+        end = offset + self.code_length
+        self.buffer[offset:end] = bytes(guess)
+        self.buffer[end] = black
+        self.buffer[end + 1] = red
+
+    def clear(self) -> None:
+        """ This method is to forget every stored round.
+        """
+        self.start = 0
+        self.size = 0
+
+    def with_colors(self, colors: list):
+        """ This method is to iterate over the stored rounds with the
+        guesses as colors.
+
+        Args:
+            colors (list): the colors of the game.
+
+        Yields:
+            tuple: the colors of the guess, the black and red pegs.
+        """
+        for guess, black, red in self:
+            yield tuple(colors[index] for index in guess), black, red
@@ -0,0 +1,20 @@
+def score(secret: tuple, guess: tuple) -> tuple[int, int]:
+    """ This function is to score a guess against a secret code with the same
+    rules as MastermindKernal: a color in the correct position is a black
+    peg, and any other color that appears in the secret code is a red peg.
+
+    Args:
+        secret (tuple): the secret code.
+        guess (tuple): the guessed code.
+
+    Returns:
+        tuple[int, int]: the number of black pegs and of red pegs.
+    """
+    black = 0
+    red = 0
+    for secret_color, guess_color in zip(secret, guess):
+        if secret_color == guess_color:
+            black += 1
+        elif guess_color in secret:
+            red += 1
+    return black, red
@@ -0,0 +1,175 @@
+from src import protocol
+from src.game_state import GameState
+
+
+class RemoteResult:
+    """ This class holds the feedback of a check answered by the session
+    server, with the same methods as MastermindKernal.
+
+    Attributes:
+        black (int): the number of colors in the correct position.
+        red (int): the number of colors in the wrong position.
+        win (bool): if the selections match the secret code.
+    """
+
+    __slots__ = ("black", "red", "win")
+
+    def __init__(self, black: int, red: int, win: bool) -> None:
+        """ Construct all the necessary attributes for RemoteResult object.
+
+        Args:
+            black (int): the number of colors in the correct position.
+            red (int): the number of colors in the wrong position.
+            win (bool): if the selections match the secret code.
+        """
+        self.black = black
+        self.red = red
+        self.win = win
+
+    def get_number_of_correct_position(self) -> int:
+        """ This method is to return the number of colors in the correct
+        position.
+
+        Returns:
+            int: the number of black pegs.
+        """
+        return self.black
+
+    def get_number_of_wrong_position(self) -> int:
+        """ This method is to return the number of colors in the wrong
+        position.
+
+        Returns:
+            int: the number of red pegs.
+        """
+        return self.red
+
+    def is_win(self) -> bool:
+        """ This method is to return if the selections match the secret code.
+
+        Returns:
+            bool: True if the players won.
+        """
+        return self.win
+
+
+class RemoteGameState(GameState):
+    """ This class is a GameState whose game is hosted by a session server.
+    The selections are mirrored locally for drawing, while the secret code
+    and the scoring stay on the server until the game is over.
+
+    Attributes:
+        client (LineClient): the connection to the session server.
+        session (str): the identifier of the hosted game.
+    """
+
+    __slots__ = ("client", "session")
+
+    def __init__(self, address: str, colors: list, timeout: float = 2.0,
+                 code_length: int = 4, rounds: int = 10) -> None:
+        """ Construct all the necessary attributes for RemoteGameState object.
+
+        Args:
+            address (str): the address of the session server.
+            colors (list): the colors of the game.
+            timeout (float): the timeout of each request.
+            code_length (int): the number of colors in a secret code.
+            rounds (int): the number of rounds of the game.
+        """
+        super().__init__(colors=colors, code_length=code_length,
+                         rounds=rounds)
+        self.client = protocol.LineClient(address, timeout=timeout)
+        self.session = None
+
+    def request(self, message: dict) -> dict:
+        """ This method is to send a request about the hosted game.
+
+        Args:
+            message (dict): the request.
+
+        Raises:
+            RuntimeError: if the server answers with an error.
+
+        Returns:
+            dict: the reply.
+        """
+        message["session"] = self.session
+        reply = self.client.request(message)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    def end_session(self) -> None:
+        """ This method is to close the hosted game on the server, so it
+        does not wait there for the idle sweep. A game the server already
+        evicted, or a server that cannot be reached, is left as it is.
+        """
+        if self.session is None:
+            return
+        try:
+            self.request({"op": "close"})
+        except (OSError, RuntimeError):
+            pass
+        self.session = None
+
+    def generate_secret_code(self) -> list[str]:
+        """ This method is to start a new game on the server, closing the
+        previous one. The secret code stays unknown until the game is over.
+
+        Returns:
+            list[str]: an empty secret code.
+        """
+        self.end_session()
+        reply = self.request({"op": "new", "colors": self.colors})
+        self.session = reply["session"]
+        self.secret_code = []
+        self.round = 0
+        self.selection_stack = []
+        self.is_win = False
+        self.is_over = False
+        self.history.clear()
+        return self.secret_code
+
+    def select(self, color: str) -> bool:
+        """ This method is to select a color on the server and locally.
+
+        Args:
+            color (str): the color to be selected.
+
+        Returns:
+            bool: True if the color was selected.
+        """
+        if not self.can_select(color):
+            return False
+        if not self.request({"op": "select", "color": color})["ok"]:
+            return False
+        self.selection_stack.append(color)
+        return True
+
+    def undo(self) -> str:
+        """ This method is to cancel the last selection on the server and
+        locally.
+
+        Returns:
+            str: the cancelled color, or None if nothing was selected.
+        """
+        if self.is_over or not self.selection_stack:
+            return None
+        self.request({"op": "undo"})
+        return self.selection_stack.pop()
+
+    def check(self) -> RemoteResult:
+        """ This method is to let the server score the selections.
+
+        Returns:
+            RemoteResult: the result of this round.
+        """
+        reply = self.request({"op": "check"})
+        self.is_win = reply["win"]
+        self.is_over = reply["over"]
+        if self.is_over:
+            self.secret_code = reply["secret"]
+        self.history.append([self.colors.index(color)
+                             for color in self.selection_stack],
+                            reply["black"], reply["red"])
+        return RemoteResult(reply["black"], reply["red"], reply["win"])
@@ -0,0 +1,329 @@
+import argparse
+import asyncio
+import os
+import secrets
+import time
+from collections import OrderedDict
+from src import protocol
+from src.config import MastermindConfig
+from src.game_state import GameState
+
+# the bounds of the colors of a game, which bound the memory of a session
+MAX_COLORS = 16
+MAX_COLOR_NAME = 32
+# the number of distinct color lists shared by the sessions at most
+MAX_PALETTES = 1024
+
+
+class ServerSession:
+    """ This class is one game hosted by the session server.
+
+    Attributes:
+        state (GameState): the secret code, round and selections.
+        last_seen (float): the monotonic time of the last request.
+    """
+
+    __slots__ = ("state", "last_seen")
+
+    def __init__(self, state: GameState) -> None:
+        """ Construct all the necessary attributes for ServerSession object.
+
+        Args:
+            state (GameState): the state of the game.
+        """
+        self.state = state
+        self.last_seen = time.monotonic()
+
+
+class SessionServer:
+    """ This class hosts many independent Mastermind games in one process
+    over a local TCP port or Unix socket. Sessions are kept from the least
+    to the most recently used; idle sessions are evicted periodically, and
+    the least recently used session is evicted when the cap is reached.
+
+    The memory of the server is capped through the number of sessions: a
+    session has at most MAX_COLORS colors of at most MAX_COLOR_NAME
+    characters and the rounds of one game. Measured with tracemalloc, it
+    takes about 650 bytes with the default colors and 2.5 KB at most, with
+    colors of its own, so the default cap of 100000 sessions keeps the
+    sessions under 250 MB.
+
+    The protocol is one JSON message per line:
+        {"op": "new", "colors": [...]}       -> {"session": "ab12..."}
+        {"op": "select", "session": s,
+         "color": c}                         -> {"ok": true}
+        {"op": "undo", "session": s}         -> {"color": "red"}
+        {"op": "check", "session": s}        -> {"black": 1, "red": 2}
+        {"op": "state", "session": s}        -> {"round": 3, ...}
+        {"op": "close", "session": s}        -> {"ok": true}
+
+    Attributes:
+        colors (list): the default colors of a new game.
+        max_sessions (int): the number of sessions kept at most.
+        idle_timeout (float): the seconds after which an idle session is
+                              evicted.
+    """
+
+    def __init__(self, colors: list = None, max_sessions: int = 100000,
+                 idle_timeout: float = 600.0,
+                 sweep_interval: float = 10.0) -> None:
+        """ Construct all the necessary attributes for SessionServer object.
+
+        Args:
+            colors (list): the default colors of a new game.
+            max_sessions (int): the number of sessions kept at most.
+            idle_timeout (float): the seconds after which an idle session is
+                                  evicted.
+            sweep_interval (float): the seconds between two sweeps of idle
+                                    sessions.
+        """
+        self.colors = list(colors or MastermindConfig().colors)
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self.sessions = OrderedDict()
+        # the color lists shared by the sessions using them
+        self.palettes = {tuple(self.colors): self.colors}
+        self.evicted = 0
+        self.server = None
+        self.sweeper = None
+
+    def palette(self, colors: list) -> list:
+        """ This method is to return a shared list of colors, so that
+        sessions with the same colors do not each keep a copy.
+
+        Args:
+            colors (list): the colors requested by a client.
+
+        Raises:
+            ValueError: if the colors are not valid.
+
+        Returns:
+            list: the shared list of colors.
+        """
+        if colors is None:
+            return self.colors
+        key = tuple(str(color) for color in colors)
+        if not 4 <= len(key) <= MAX_COLORS or len(set(key)) != len(key):
+            raise ValueError(f"colors must be 4 to {MAX_COLORS} distinct "
+                             "names")
+        if max(len(color) for color in key) > MAX_COLOR_NAME:
+            raise ValueError(f"a color name has {MAX_COLOR_NAME} "
+                             "characters at most")
+        if key in self.palettes:
+            return self.palettes[key]
+        if len(self.palettes) >= MAX_PALETTES:
+            # the palettes are never freed, so the rest are not shared
+            return list(key)
+        self.palettes[key] = list(key)
+        return self.palettes[key]
+
+    def new_session(self, colors: list = None) -> str:
+        """ This method is to start a new game with a random secret code.
+
+        Args:
+            colors (list): the colors of the game.
+
+        Returns:
+            str: the identifier of the session.
+        """
+        state = GameState(colors=self.palette(colors))
+        state.generate_secret_code()
+        identifier = secrets.token_hex(8)
+        self.sessions[identifier] = ServerSession(state)
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+            self.evicted += 1
+        return identifier
+
+    def get_session(self, identifier: str) -> ServerSession:
+        """ This method is to find a session and mark it as used.
+
+        Args:
+            identifier (str): the identifier of the session.
+
+        Raises:
+            KeyError: if the session does not exist or was evicted.
+
+        Returns:
+            ServerSession: the session.
+        """
+        session = self.sessions[identifier]
+        session.last_seen = time.monotonic()
+        self.sessions.move_to_end(identifier)
+        return session
+
+    def evict_idle(self) -> int:
+        """ This method is to remove the sessions idle for too long.
+
+        Returns:
+            int: the number of sessions removed.
+        """
+        deadline = time.monotonic() - self.idle_timeout
+        removed = 0
+        # the oldest sessions come first, so stop at the first active one
+        while self.sessions:
+            identifier, session = next(iter(self.sessions.items()))
+            if session.last_seen > deadline:
+                break
+            del self.sessions[identifier]
+            removed += 1
+        self.evicted += removed
+        return removed
+
+    def handle(self, message: dict) -> dict:
+        """ This method is to answer one request.
+
+        Args:
+            message (dict): the request.
+
+        Returns:
+            dict: the reply.
+        """
+        op = message.get("op")
+        if op == "new":
+            identifier = self.new_session(message.get("colors"))
+            state = self.sessions[identifier].state
+            return {"session": identifier, "colors": state.colors,
+                    "rounds": state.last_round + 1}
+        if op == "ping":
+            return {"ok": True, "sessions": len(self.sessions)}
+        state = self.get_session(message["session"]).state
+        if op == "select":
+            color = message["color"]
+            return {"ok": color in state.colors and state.select(color),
+                    "selection": state.selection_stack}
+        if op == "undo":
+            return {"color": state.undo()}
+        if op == "check":
+            if not state.can_check():
+                return {"error": "the row is not full"}
+            checked_round = state.round
+            result = state.check()
+            reply = {"black": result.get_number_of_correct_position(),
+                     "red": result.get_number_of_wrong_position(),
+                     "round": checked_round, "win": state.is_win,
+                     "over": state.is_over}
+            if state.is_over:
+                reply["secret"] = state.secret_code
+            else:
+                state.next_round()
+            return reply
+        if op == "state":
+            return {"round": state.round, "selection": state.selection_stack,
+                    "win": state.is_win, "over": state.is_over}
+        if op == "close":
+            del self.sessions[message["session"]]
+            return {"ok": True}
+        return {"error": f"unknown op: {op}"}
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """ This method is to serve all requests of one connection.
+
+        Args:
+            reader (asyncio.StreamReader): the reading end of the connection.
+            writer (asyncio.StreamWriter): the writing end of the connection.
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # the rest of an over-long line cannot be told apart
+                    # from the next request, so the connection is closed
+                    writer.write(protocol.encode(
+                        {"error": "the line is too long"}))
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    reply = self.handle(protocol.decode(line))
+                except KeyError as e:
+                    reply = {"error": f"unknown session or field: {e}"}
+                except (ValueError, TypeError) as e:
+                    reply = {"error": str(e)}
+                writer.write(protocol.encode(reply))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def run_sweeper(self) -> None:
+        """ This method is to evict idle sessions periodically.
+        """
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.evict_idle()
+
+    async def start(self, address: str) -> None:
+        """ This method is to start serving.
+
+        Args:
+            address (str): "unix:<path>", "<host>:<port>" or "<port>".
+        """
+        self.sweeper = asyncio.create_task(self.run_sweeper())
+        self.server = await protocol.start_server(self.handle_client,
+                                                  address)
+
+    async def close(self) -> None:
+        """ This method is to stop serving.
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.sweeper is not None:
+            self.sweeper.cancel()
+            try:
+                await self.sweeper
+            except asyncio.CancelledError:
+                pass
+
+
+async def serve(address: str, max_sessions: int,
+                idle_timeout: float) -> None:
+    """ This function is to run a session server until interrupted.
+
+    Args:
+        address (str): the address to listen on.
+        max_sessions (int): the number of sessions kept at most.
+        idle_timeout (float): the seconds after which an idle session is
+                              evicted.
+    """
+    server = SessionServer(max_sessions=max_sessions,
+                           idle_timeout=idle_timeout)
+    await server.start(address)
+    print(f"Hosting Mastermind sessions on {address}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+        kind, *where = protocol.parse_address(address)
+        if kind == "unix" and os.path.exists(where[0]):
+            os.remove(where[0])
+
+
+def main():
+    """ The main function starts the session server from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Host many Mastermind games in one process.")
+    parser.add_argument("--address", default="127.0.0.1:8766",
+                        help='"unix:<path>", "<host>:<port>" or "<port>"')
+    parser.add_argument("--max-sessions", type=int, default=100000,
+                        help="the number of sessions kept at most, "
+                        "about 2.5 KB each at most")
+    parser.add_argument("--idle-timeout", type=float, default=600.0,
+                        help="the seconds after which a session is evicted")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.address, args.max_sessions,
+                          args.idle_timeout))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
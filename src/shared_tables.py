@@ -0,0 +1,318 @@
+from multiprocessing import shared_memory
+from src.code_space import CodeSpace
+from src.code_table import CodeTable, code_table, has_table, \
+    install_table
+from src.game_recorder import pack_feedback
+
+# the largest score table published, in bytes; the table of a larger game,
+# like 10 colors and 5 pegs (about 914 MB), is not built, and every process
+# splits the sets with the bitwise operations of its code table instead
+SHARED_TABLE_LIMIT = 1 << 27
+
+
+class ScoreTable:
+    """ This class keeps the feedback of every guess to every code of a
+    game in one buffer, one packed byte per pair and one row per guess. The
+    buffer can be a shared memory block, so the processes of a pool read the
+    same table without copying it.
+
+    Attributes:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        size (int): the number of codes.
+        feedback (memoryview): the packed feedback, row by row.
+    """
+
+    def __init__(self, colors: tuple, code_length: int, buffer) -> None:
+        """ Construct all the necessary attributes for ScoreTable object.
+
+        Args:
+            colors (tuple): the colors of the game.
+            code_length (int): the number of colors in a secret code.
+            buffer: a writable buffer of at least nbytes bytes.
+        """
+        self.colors = tuple(colors)
+        self.code_length = code_length
+        self.size = len(code_table(self.colors, code_length))
+        self.feedback = memoryview(buffer)[:self.size * self.size]
+
+    @staticmethod
+    def nbytes(table: CodeTable) -> int:
+        """ This method is to return the size of the buffer of a game.
+
+        Args:
+            table (CodeTable): the codes of the game.
+
+        Returns:
+            int: the number of bytes.
+        """
+        return len(table) * len(table)
+
+    def fill(self) -> None:
+        """ This method is to score every guess against every code.
+        """
+        table = code_table(self.colors, self.code_length)
+        for number, guess in enumerate(table.guesses):
+            row = bytearray(self.size)
+            for (black, red), codes in table.classes(table.full,
+                                                     guess).items():
+                packed = pack_feedback(black, red)
+                for code, bit in enumerate(bin(codes)[:1:-1]):
+                    if bit == '1':
+                        row[code] = packed
+            start = number * self.size
+            self.feedback[start:start + self.size] = row
+
+    def row(self, guess: int) -> memoryview:
+        """ This method is to return the feedback of every code to a guess,
+        without copying it.
+
+        Args:
+            guess (int): the number of the guess.
+
+        Returns:
+            memoryview: the packed feedback, in order of the codes.
+        """
+        return self.feedback[guess * self.size:(guess + 1) * self.size]
+
+    def score(self, guess: int, code: int) -> tuple:
+        """ This method is to return the feedback of a code to a guess.
+
+        Args:
+            guess (int): the number of the guess.
+            code (int): the number of the code.
+
+        Returns:
+            tuple: the black and red pegs.
+        """
+        return divmod(self.feedback[guess * self.size + code], 16)
+
+    def classes(self, mask: int, guess: int) -> dict[tuple, int]:
+        """ This method is to split a set of codes by the feedback each code
+        would give to a guess, reading the feedback code by code.
+
+        Args:
+            mask (int): the set of codes.
+            guess (int): the number of the guess.
+
+        Returns:
+            dict[tuple, int]: per (black, red) feedback, the set of codes,
+                              in the order of CodeTable.classes.
+        """
+        row = self.row(guess)
+        sets = {}
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            packed = row[low.bit_length() - 1]
+            sets[packed] = sets.get(packed, 0) | low
+        return {divmod(packed, 16): sets[packed] for packed in sorted(sets)}
+
+    def release(self) -> None:
+        """ This method is to drop the view on the buffer, so that the
+        buffer can be closed.
+        """
+        self.feedback.release()
+
+
+def code_bytes(table: CodeTable) -> int:
+    """ This function is to return the size of the codes and bitsets of a
+    game in shared memory.
+
+    Args:
+        table (CodeTable): the codes of the game.
+
+    Returns:
+        int: the number of bytes.
+    """
+    width = (len(table) + 7) // 8
+    sets = (table.code_length + 1) * len(table.colors)
+    return len(table) * table.code_length + sets * width
+
+
+def write_code_table(table: CodeTable, buffer) -> None:
+    """ This function is to write the codes of a game, as one byte per
+    color index, and then its sets of codes having each color at each
+    position and containing each color, as little-endian bitsets.
+
+    Args:
+        table (CodeTable): the codes of the game.
+        buffer: a writable buffer of at least code_bytes bytes.
+    """
+    number = {color: index for index, color in enumerate(table.colors)}
+    data = bytearray(number[color] for code in table.codes
+                     for color in code)
+    width = (len(table) + 7) // 8
+    for position in range(table.code_length):
+        for color in table.colors:
+            data += table.at.get((position, color), 0).to_bytes(width,
+                                                                'little')
+    for color in table.colors:
+        data += table.contains[color].to_bytes(width, 'little')
+    buffer[:len(data)] = data
+
+
+def read_code_table(colors: tuple, code_length: int, buffer) -> CodeTable:
+    """ This function is to build the table of a game from what
+    write_code_table wrote, without building its bitsets again.
+
+    Args:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        buffer: the buffer written by write_code_table.
+
+    Returns:
+        CodeTable: the table of every code of the game.
+    """
+    size = len(CodeSpace(colors, code_length))
+    width = (size + 7) // 8
+    data = bytes(buffer[:size * code_length])
+    codes = [tuple(colors[index] for index in data[start:start
+                                                    + code_length])
+             for start in range(0, len(data), code_length)]
+    offset = len(data)
+    at = {}
+    for position in range(code_length):
+        for color in colors:
+            bits = int.from_bytes(buffer[offset:offset + width], 'little')
+            if bits:
+                at[(position, color)] = bits
+            offset += width
+    contains = {}
+    for color in colors:
+        contains[color] = int.from_bytes(buffer[offset:offset + width],
+                                         'little')
+        offset += width
+    return CodeTable(colors, code_length, guesses=codes,
+                     bitsets=(at, contains))
+
+
+class SharedTableRegistry:
+    """ This class publishes the tables of games in shared memory, and hands
+    out the handles the processes of a pool attach them with: the codes and
+    bitsets of each game, read by a process instead of building them again,
+    and its score table, read in place by every process. The blocks are
+    freed when the registry is closed.
+
+    Attributes:
+        blocks (dict): per (colors, code length), the shared memory block
+                       of the codes, and the block of the score table and
+                       the table, or None if it was too large.
+    """
+
+    def __init__(self) -> None:
+        """ Construct all the necessary attributes for SharedTableRegistry
+        object.
+        """
+        self.blocks = {}
+
+    def publish(self, colors: tuple, code_length: int,
+                limit: int = SHARED_TABLE_LIMIT) -> ScoreTable:
+        """ This method is to write the codes of a game and build its score
+        table in shared memory, once per game. The score table is left out
+        if it is larger than a limit.
+
+        Args:
+            colors (tuple): the colors of the game.
+            code_length (int): the number of colors in a secret code.
+            limit (int): the largest score table published, in bytes.
+
+        Returns:
+            ScoreTable: the table, also used by this process's code table,
+                        or None if it is too large to be published.
+        """
+        key = (tuple(colors), code_length)
+        if key not in self.blocks:
+            table = code_table(*key)
+            codes = shared_memory.SharedMemory(
+                create=True, size=max(code_bytes(table), 1))
+            write_code_table(table, codes.buf)
+            block = scores = None
+            if ScoreTable.nbytes(table) <= limit:
+                block = shared_memory.SharedMemory(
+                    create=True, size=max(ScoreTable.nbytes(table), 1))
+                scores = ScoreTable(*key, block.buf)
+                scores.fill()
+                table.scores = scores
+            self.blocks[key] = (codes, block, scores)
+        return self.blocks[key][2]
+
+    def handles(self) -> list[tuple]:
+        """ This method is to return what a process needs to attach the
+        tables.
+
+        Returns:
+            list[tuple]: the name of the block of the codes, the name of the
+                         block of the score table or None, the colors and
+                         the code length of each game.
+        """
+        return [(codes.name, block.name if block is not None else None,
+                 colors, code_length)
+                for (colors, code_length), (codes, block, _)
+                in self.blocks.items()]
+
+    def close(self) -> None:
+        """ This method is to free the shared memory blocks.
+        """
+        for (colors, code_length), (codes, block, scores) in \
+                self.blocks.items():
+            codes.close()
+            codes.unlink()
+            if block is None:
+                continue
+            table = code_table(colors, code_length)
+            if table.scores is scores:
+                table.scores = None
+            scores.release()
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+    def __enter__(self) -> "SharedTableRegistry":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# the blocks attached by this process, kept open while it runs
+_attached = {}
+
+
+def attach(handles: list[tuple]) -> None:
+    """ This function is to attach the shared tables in a process of a pool,
+    as its initializer. The code table of each game is read from its shared
+    codes, unless this process has it already, and then reads its feedback
+    from the shared score table, if there is one.
+
+    Args:
+        handles (list[tuple]): the handles of SharedTableRegistry.
+    """
+    for codes_name, name, colors, code_length in handles:
+        if (colors, code_length) in _attached:
+            continue
+        if not has_table(colors, code_length):
+            # a forked process has the table already, a spawned one not
+            codes = shared_memory.SharedMemory(name=codes_name)
+            install_table(read_code_table(colors, code_length, codes.buf))
+            codes.close()
+        block = scores = None
+        if name is not None:
+            block = shared_memory.SharedMemory(name=name)
+            scores = ScoreTable(colors, code_length, block.buf)
+            code_table(colors, code_length).scores = scores
+        _attached[(colors, code_length)] = (block, scores)
+
+
+def attached(colors: tuple, code_length: int) -> ScoreTable:
+    """ This function is to return a score table attached by this process.
+
+    Args:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+
+    Returns:
+        ScoreTable: the table, or None if it was not attached.
+    """
+    entry = _attached.get((tuple(colors), code_length))
+    return None if entry is None else entry[1]
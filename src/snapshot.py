@@ -0,0 +1,132 @@
+import json
+import os
+import tempfile
+from src.adversary import AdversarialGameState
+from src.game_state import GameState
+
+SNAPSHOT_VERSION = 1
+
+
+def dump_state(state: GameState) -> bytes:
+    """ This function is to serialize a game into a compact JSON blob where
+    every color is stored as its index in the color list. An adversary has
+    no secret code until the game is over, so the codes it still keeps are
+    stored instead, as a hexadecimal mask.
+
+    Args:
+        state (GameState): the game to be saved.
+
+    Returns:
+        bytes: the snapshot.
+    """
+    index = {color: number for number, color in enumerate(state.colors)}
+    blob = {
+        "v": SNAPSHOT_VERSION,
+        "colors": state.colors,
+        "rounds": state.last_round + 1,
+        "secret": [index[color] for color in state.secret_code],
+        "round": state.round,
+        "selection": [index[color] for color in state.selection_stack],
+        "history": [[list(guess), black, red]
+                    for guess, black, red in state.history],
+    }
+    if isinstance(state, AdversarialGameState):
+        blob["length"] = state.code_length
+        blob["mask"] = format(state.mask, "x")
+    return json.dumps(blob, separators=(',', ':')).encode()
+
+
+def load_state(data: bytes) -> GameState:
+    """ This function is to rebuild a game from a snapshot.
+
+    Args:
+        data (bytes): the snapshot.
+
+    Raises:
+        ValueError: if the snapshot is invalid.
+
+    Returns:
+        GameState: the saved game.
+    """
+    try:
+        blob = json.loads(data)
+        if blob["v"] != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version {blob['v']}")
+        colors = [str(color) for color in blob["colors"]]
+        if "mask" in blob:
+            state = AdversarialGameState(colors=colors,
+                                         code_length=int(blob["length"]),
+                                         rounds=blob["rounds"])
+            state.mask = int(blob["mask"], 16)
+            if not state.mask or state.mask & ~state.table.full:
+                raise ValueError("invalid codes in snapshot")
+        else:
+            state = GameState(colors=colors,
+                              code_length=len(blob["secret"]),
+                              rounds=blob["rounds"])
+        state.secret_code = [colors[number] for number in blob["secret"]]
+        state.round = int(blob["round"])
+        state.selection_stack = [colors[number]
+                                 for number in blob["selection"]]
+        if not 0 <= state.round <= state.last_round or \
+                len(blob["history"]) != state.round or \
+                len(state.selection_stack) > state.code_length:
+            raise ValueError("inconsistent snapshot")
+        for guess, black, red in blob["history"]:
+            if not all(0 <= number < len(colors) for number in guess):
+                raise ValueError("invalid color in snapshot")
+            state.history.append(guess, black, red)
+    except (KeyError, IndexError, TypeError) as e:
+        raise ValueError(f"invalid snapshot: {e!r}")
+    return state
+
+
+def save_snapshot(path: str, state: GameState) -> None:
+    """ This function is to write a snapshot atomically: it is written to a
+    temporary file in the same directory and then renamed over the old one,
+    so a crash never leaves a half-written snapshot.
+
+    Args:
+        path (str): the path of the snapshot.
+        state (GameState): the game to be saved.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(dir=directory,
+                                             prefix=".snapshot-")
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(dump_state(state))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def read_snapshot(path: str) -> GameState:
+    """ This function is to read a snapshot.
+
+    Args:
+        path (str): the path of the snapshot.
+
+    Returns:
+        GameState: the saved game, or None if there is no usable snapshot.
+    """
+    try:
+        with open(path, 'rb') as file:
+            return load_state(file.read())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def remove_snapshot(path: str) -> None:
+    """ This function is to remove the snapshot of a finished game.
+
+    Args:
+        path (str): the path of the snapshot.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,229 @@
+import functools
+import math
+import random
+from src.code_table import CodeTable, code_table
+from src.symmetry import free_colors, unique_guesses
+
+# the number of (guess, candidate) pairs scored per turn, which keeps a
+# turn within tens of milliseconds on large boards
+GUESS_BUDGET = 4000000
+# the fixed cost of scoring a guess, counted in candidates
+GUESS_OVERHEAD = 3000
+# the fewest guesses evaluated per turn
+MIN_GUESSES = 64
+# the candidates are renumbered once they are this many times fewer than
+# the numbered codes
+COMPACT_RATIO = 8
+# the number of chosen guesses kept per table
+GUESS_CACHE_SIZE = 4096
+# the book of a Solver that uses the shipped tree or book of its game
+DEFAULT_BOOK = "default"
+
+
+def worst_case(counts: list[int]) -> float:
+    """ This function is to rate a guess by its largest feedback class.
+
+    Args:
+        counts (list[int]): the number of codes of each feedback class.
+
+    Returns:
+        float: the number of codes left in the worst case.
+    """
+    return max(counts)
+
+
+def expected_size(counts: list[int]) -> float:
+    """ This function is to rate a guess by the expected number of codes
+    left after its feedback.
+
+    Args:
+        counts (list[int]): the number of codes of each feedback class.
+
+    Returns:
+        float: the expected number of codes left.
+    """
+    return sum(count * count for count in counts) / sum(counts)
+
+
+def negative_entropy(counts: list[int]) -> float:
+    """ This function is to rate a guess by the information its feedback
+    gives, negated so that a lower rating is better.
+
+    Args:
+        counts (list[int]): the number of codes of each feedback class.
+
+    Returns:
+        float: the negative entropy of the feedback, in bits.
+    """
+    total = sum(counts)
+    return sum(count / total * math.log2(count / total)
+               for count in counts)
+
+
+# a strategy rates the feedback classes of a guess, the lowest is chosen
+STRATEGIES = {
+    "minimax": worst_case,
+    "expected": expected_size,
+    "entropy": negative_entropy,
+}
+
+
+def guess_pool(table: CodeTable, mask: int, budget: int,
+               guesses: list) -> list:
+    """ This function is to list the guesses evaluated for a set of
+    candidates. Every guess is evaluated when the budget allows; otherwise, a
+    sample of the candidates and of the guesses, seeded by the set itself so
+    the same set always gets the same guess.
+
+    Args:
+        table (CodeTable): the table of the candidates.
+        mask (int): the set of candidates.
+        budget (int): the number of (guess, code) pairs to be scored.
+        guesses (list): the guesses that are not equivalent to each other.
+
+    Returns:
+        list: the guesses.
+    """
+    limit = max(MIN_GUESSES, budget // (len(table) + GUESS_OVERHEAD))
+    if len(guesses) <= limit:
+        return guesses
+    candidates = table.members(mask)
+    if len(candidates) <= limit // 2:
+        pool = candidates
+    else:
+        pool = random.Random(mask).sample(candidates, limit // 2)
+    rng = random.Random(~mask)
+    return pool + rng.sample(guesses, limit - len(pool))
+
+
+@functools.lru_cache(maxsize=GUESS_CACHE_SIZE)
+def best_guess(table: CodeTable, strategy: str, mask: int,
+               budget: int = GUESS_BUDGET, free: tuple = None,
+               first: bool = False) -> tuple:
+    """ This function is to choose the guess a strategy rates best for a
+    set of candidates. Guesses equivalent under the symmetries left by the
+    guesses so far are rated once, and among equally rated guesses, a
+    candidate is preferred, since it may win at once. The choices are
+    memoized by the set of candidates.
+
+    Args:
+        table (CodeTable): the table of the candidates.
+        strategy (str): the name of the strategy.
+        mask (int): the set of candidates.
+        budget (int): the number of (guess, code) pairs to be scored.
+        free (tuple): the colors no guess used so far, none by default.
+        first (bool): if no guess was made yet.
+
+    Returns:
+        tuple: the chosen guess.
+    """
+    rate = STRATEGIES[strategy]
+    best = None
+    best_key = None
+    guesses = unique_guesses(table.colors, table.code_length, free or (),
+                             first)
+    for guess in guess_pool(table, mask, budget, guesses):
+        counts = table.partition(mask, guess)
+        key = (rate(list(counts.values())),
+               (table.code_length, 0) not in counts)
+        if best_key is None or key < best_key:
+            best, best_key = guess, key
+    return best
+
+
+class Solver:
+    """ This class plays the codebreaker. It keeps the codes that are still
+    consistent with the feedback of every guess so far, and chooses its
+    guess each round with a strategy: "random" guesses any candidate, while
+    "minimax", "expected" and "entropy" guess the code whose feedback
+    classes have the smallest largest class, the smallest expected size or
+    the largest entropy.
+
+    Attributes:
+        colors (list): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        strategy (str): how the guesses are chosen.
+        table (CodeTable): the numbered codes, renumbered as the
+                           candidates get fewer.
+        mask (int): the set of codes consistent with the feedback so far.
+        history (list): the guess and the black and red pegs of each round.
+        book (OpeningBook): the book or decision tree answering the guesses
+                            it knows without search, if any.
+    """
+
+    def __init__(self, colors: list, code_length: int = 4,
+                 rng: random.Random = None, strategy: str = "random",
+                 budget: int = GUESS_BUDGET, book=DEFAULT_BOOK) -> None:
+        """ Construct all the necessary attributes for Solver object.
+
+        Args:
+            colors (list): the colors of the game.
+            code_length (int): the number of colors in a secret code.
+            rng (random.Random): the random generator choosing guesses.
+            strategy (str): "random", "minimax", "expected" or "entropy".
+            budget (int): the number of (guess, code) pairs scored per
+                          turn.
+            book (OpeningBook): the book answering the first guesses of a
+                                strategy: by default, the shipped optimal
+                                decision tree or opening book of the game,
+                                and None for none.
+
+        Raises:
+            ValueError: if the strategy is unknown.
+        """
+        if strategy != "random" and strategy not in STRATEGIES:
+            raise ValueError(f"unknown strategy {strategy!r}")
+        self.colors = list(colors)
+        self.code_length = code_length
+        self.rng = rng or random.Random()
+        self.strategy = strategy
+        self.budget = budget
+        self.table = code_table(tuple(self.colors), code_length)
+        self.mask = self.table.full
+        self.history = []
+        if book == DEFAULT_BOOK:
+            book = None
+            if strategy != "random":
+                # imported here, since the books are built by solvers
+                from src.decision_tree import default_book
+                book = default_book(tuple(self.colors), code_length,
+                                    strategy)
+        self.book = book
+
+    @property
+    def candidates(self) -> list[tuple]:
+        """ The codes consistent with the feedback so far. """
+        return self.table.members(self.mask)
+
+    def next_guess(self) -> tuple:
+        """ This method is to choose the next guess.
+
+        Returns:
+            tuple: the guess of the strategy.
+        """
+        if self.strategy == "random" or self.mask.bit_count() == 1:
+            return self.rng.choice(self.candidates)
+        if self.book is not None:
+            guess = self.book.lookup(self.history)
+            if guess is not None:
+                return guess
+        free = free_colors(self.colors,
+                           (guess for guess, _, _ in self.history))
+        return best_guess(self.table, self.strategy, self.mask,
+                          self.budget, free, not self.history)
+
+    def update(self, guess: tuple, black: int, red: int) -> None:
+        """ This method is to keep only the codes that would have given the
+        same feedback to a guess.
+
+        Args:
+            guess (tuple): the guessed code.
+            black (int): the number of colors in the correct position.
+            red (int): the number of colors in the wrong position.
+        """
+        self.history.append((tuple(guess), black, red))
+        self.mask = self.table.classes(self.mask, tuple(guess)).get(
+            (black, red), 0)
+        if 0 < self.mask.bit_count() <= len(self.table) // COMPACT_RATIO:
+            self.table = self.table.subset(self.mask)
+            self.mask = self.table.full
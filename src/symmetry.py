@@ -0,0 +1,150 @@
+import functools
+import itertools
+from src.code_table import code_table
+
+
+def free_colors(colors, guesses) -> tuple:
+    """ This function is to return the colors that no guess used so far.
+    The secret code is drawn uniformly, so relabeling these colors among
+    themselves changes neither the candidates nor any feedback.
+
+    Args:
+        colors (Iterable[str]): the colors of the game.
+        guesses (Iterable[tuple]): the guesses so far.
+
+    Returns:
+        tuple: the unused colors, in the order of the colors.
+    """
+    used = set()
+    for guess in guesses:
+        used.update(guess)
+    return tuple(color for color in colors if color not in used)
+
+
+def canonical(guess: tuple, free: tuple) -> tuple:
+    """ This function is to return the representative of a guess under the
+    relabeling of the free colors: the free colors of the guess are replaced
+    by the first free colors, in order of appearance.
+
+    Args:
+        guess (tuple): the guess.
+        free (tuple): the free colors.
+
+    Returns:
+        tuple: the representative of the guess.
+    """
+    relabel = {}
+    for color in guess:
+        if color in free and color not in relabel:
+            relabel[color] = free[len(relabel)]
+    return tuple(relabel.get(color, color) for color in guess)
+
+
+@functools.lru_cache(maxsize=256)
+def unique_guesses(colors: tuple, code_length: int, free: tuple,
+                   first: bool) -> list:
+    """ This function is to keep one guess of each class of equivalent
+    guesses. Before the first guess, every color is free and the pegs can be
+    permuted too, so all codes without repeated colors are equivalent.
+
+    Args:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        free (tuple): the free colors.
+        first (bool): if no guess was made yet.
+
+    Returns:
+        list: the guesses to be evaluated, in the order of the table.
+    """
+    guesses = code_table(colors, code_length).guesses
+    if first:
+        return list(guesses[:1])
+    seen = set()
+    unique = []
+    for guess in guesses:
+        representative = canonical(guess, free)
+        if representative not in seen:
+            seen.add(representative)
+            unique.append(guess)
+    return unique
+
+
+@functools.lru_cache(maxsize=16)
+def anchor_symmetries(colors: tuple, code_length: int,
+                      anchor: tuple) -> tuple:
+    """ This function is to list the relabelings of colors and pegs that
+    keep a guess unchanged, as permutations of the numbers of the codes.
+    They change no feedback of that guess, so two sets of candidates mapped
+    to each other by one of them need the same guesses to be solved.
+
+    Args:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a secret code.
+        anchor (tuple): the guess kept unchanged, without repeated colors.
+
+    Returns:
+        tuple: per relabeling, the number of the image of each code and
+               the number of the code mapped to each one, the identity
+               first.
+    """
+    table = code_table(colors, code_length)
+    number = {code: index for index, code in enumerate(table.guesses)}
+    free = [color for color in colors if color not in anchor]
+    symmetries = []
+    for pegs in itertools.permutations(range(code_length)):
+        # the color at peg i moves to peg pegs[i], so the color of the
+        # anchor at peg i must become its color at peg pegs[i]
+        relabel = {anchor[i]: anchor[pegs[i]] for i in range(code_length)}
+        for others in itertools.permutations(free):
+            relabel.update(zip(free, others))
+            forward = [0] * len(table)
+            for index, code in enumerate(table.guesses):
+                image = [None] * code_length
+                for peg, color in enumerate(code):
+                    image[pegs[peg]] = relabel[color]
+                forward[index] = number[tuple(image)]
+            backward = [0] * len(table)
+            for index, image in enumerate(forward):
+                backward[image] = index
+            symmetries.append((tuple(forward), tuple(backward)))
+    return tuple(symmetries)
+
+
+def relabel_set(mask: int, permutation: tuple) -> int:
+    """ This function is to map a set of codes by a permutation of their
+    numbers.
+
+    Args:
+        mask (int): the set of codes.
+        permutation (tuple): per code number, the number of its image.
+
+    Returns:
+        int: the set of the images.
+    """
+    image = 0
+    while mask:
+        low = mask & -mask
+        image |= 1 << permutation[low.bit_length() - 1]
+        mask ^= low
+    return image
+
+
+def canonical_set(mask: int, symmetries: tuple) -> tuple:
+    """ This function is to return the representative of a set of codes
+    under some relabelings: the smallest of its images.
+
+    Args:
+        mask (int): the set of codes.
+        symmetries (tuple): the relabelings, as given by
+                            anchor_symmetries.
+
+    Returns:
+        tuple: the representative, and the relabeling mapping the set to
+               it.
+    """
+    best, best_symmetry = mask, symmetries[0] if symmetries else None
+    for symmetry in symmetries[1:]:
+        image = relabel_set(mask, symmetry[0])
+        if image < best:
+            best, best_symmetry = image, symmetry
+    return best, best_symmetry
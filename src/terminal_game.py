@@ -0,0 +1,215 @@
+import sys
+from src.config import CODE_LENGTH, MastermindConfig
+from src.game_state import GameState
+from src.leaderboard_client import LeaderboardClient, read_leaders, \
+    save_score
+
+# the mark of each peg, in the order light_up_regs lights them up
+BLACK_PEG = "B"
+RED_PEG = "R"
+NO_PEG = "."
+# the word typed instead of a guess to leave the game
+QUIT = "quit"
+
+
+class TerminalGame:
+    """ This class plays the Mastermind game in a terminal, for players
+    without a display. It has the rules, the rounds and the leaderboard of
+    the game window but never imports turtle or tkinter, so it starts at
+    once, even over SSH.
+
+    A guess is typed as color names or numbers, like "red blue green
+    yellow" or "1 2 3 4". The pegs of each checked round are written like
+    the hints of the window: a black peg per correct color in the correct
+    position, then a red peg per correct color in the wrong position.
+
+    Attributes:
+        state (GameState): the state of the current game.
+        leaderboard_path (str): the path of the leaderboard file.
+        leaderboard_client (LeaderboardClient): the client of the shared
+                                                leaderboard service, or None.
+        stdin (TextIO): the stream the players type in.
+        stdout (TextIO): the stream the game is written to.
+        name (str): the name of the player.
+    """
+
+    def __init__(self, config: MastermindConfig, stdin=None,
+                 stdout=None) -> None:
+        """ Construct all the necessary attributes for TerminalGame object.
+
+        Args:
+            config (MastermindConfig): the configuration of the game.
+            stdin (TextIO): the stream the players type in, sys.stdin by
+                            default.
+            stdout (TextIO): the stream the game is written to, sys.stdout
+                             by default.
+        """
+        self.state = GameState(colors=list(config.colors),
+                               code_length=CODE_LENGTH)
+        self.leaderboard_path = config.leaderboard_path
+        self.leaderboard_client = None
+        if config.leaderboard_address:
+            self.leaderboard_client = LeaderboardClient(
+                config.leaderboard_address)
+        self.stdin = stdin if stdin is not None else sys.stdin
+        self.stdout = stdout if stdout is not None else sys.stdout
+        self.name = ""
+
+    def write(self, text: str = "") -> None:
+        """ This method is to write a line.
+
+        Args:
+            text (str): the line.
+        """
+        self.stdout.write(text + "\n")
+
+    def ask(self, prompt: str) -> str:
+        """ This method is to ask the players a question.
+
+        Args:
+            prompt (str): the question.
+
+        Returns:
+            str: the answer, or None if the input is closed.
+        """
+        self.stdout.write(prompt)
+        self.stdout.flush()
+        line = self.stdin.readline()
+        if not line:
+            return None
+        return line.strip()
+
+    def parse_guess(self, text: str) -> list[str]:
+        """ This method is to convert a typed guess into colors.
+
+            i.e. "red, 2 Green yellow" -> ["red", "blue", "green", "yellow"]
+
+        Args:
+            text (str): the color names or numbers, separated by spaces or
+                        commas.
+
+        Raises:
+            ValueError: if a word is not a color, or the guess does not have
+                        the number of colors of a code.
+
+        Returns:
+            list[str]: the colors of the guess.
+        """
+        colors = self.state.colors
+        names = {color.lower(): color for color in colors}
+        guess = []
+        for word in text.replace(",", " ").split():
+            if word.isdigit() and 1 <= int(word) <= len(colors):
+                guess.append(colors[int(word) - 1])
+            elif word.lower() in names:
+                guess.append(names[word.lower()])
+            else:
+                raise ValueError(f"unknown color: {word}")
+        if len(guess) != self.state.code_length:
+            raise ValueError(f"a guess has {self.state.code_length} colors")
+        return guess
+
+    def format_pegs(self, black: int, red: int) -> str:
+        """ This method is to draw the pegs of a round.
+
+            i.e. (1, 2) -> "B R R ."
+
+        Args:
+            black (int): the number of correct colors in correct position.
+            red (int): the number of correct colors in wrong position.
+
+        Returns:
+            str: the pegs.
+        """
+        empty = self.state.code_length - black - red
+        return " ".join([BLACK_PEG] * black + [RED_PEG] * red
+                        + [NO_PEG] * empty)
+
+    def show_colors(self) -> None:
+        """ This method is to write the colors the players can pick.
+        """
+        self.write("Colors: " + "  ".join(
+            f"{number}={color}"
+            for number, color in enumerate(self.state.colors, start=1)))
+
+    def show_leaderboard(self) -> None:
+        """ This method is to write the best players.
+        """
+        try:
+            leaders = read_leaders(self.leaderboard_path,
+                                   client=self.leaderboard_client)
+        except FileNotFoundError:
+            self.write("Leaderboard: not found")
+            return
+        self.write("Leaders:")
+        for scores, name in leaders:
+            self.write(f"  {scores}: {name}")
+
+    def play_round(self) -> bool:
+        """ This method is to ask a guess and check it.
+
+        Returns:
+            bool: False if the players left the game.
+        """
+        state = self.state
+        prompt = f"Round {state.round + 1}/{state.last_round + 1}> "
+        while True:
+            text = self.ask(prompt)
+            if text is None or text.lower() == QUIT:
+                return False
+            try:
+                guess = self.parse_guess(text)
+            except ValueError as e:
+                self.write(f"  {e}")
+                continue
+            for color in guess:
+                state.select(color)
+            if state.can_check():
+                break
+            # a color was picked twice
+            state.selection_stack = []
+            self.write(f"  pick {state.code_length} different colors")
+        result = state.check()
+        pegs = self.format_pegs(result.get_number_of_correct_position(),
+                                result.get_number_of_wrong_position())
+        self.write(f"  {' '.join(guess):<40} {pegs}")
+        if not state.is_over:
+            state.next_round()
+        return True
+
+    def play(self) -> bool:
+        """ This method is to play one game with a new secret code. The
+        scores of a winner are saved to the leaderboard.
+
+        Returns:
+            bool: False if the players left the game before its end.
+        """
+        self.state.generate_secret_code()
+        self.show_colors()
+        while not self.state.is_over:
+            if not self.play_round():
+                return False
+        if self.state.is_win:
+            self.write(f"You won in {self.state.round + 1} rounds!")
+            save_score(self.leaderboard_path, self.state.round + 1,
+                       self.name, client=self.leaderboard_client)
+            self.show_leaderboard()
+        else:
+            self.write("You lost. The secret code was: "
+                       + " ".join(self.state.secret_code))
+        return True
+
+    def run(self) -> None:
+        """ This method is to sign in the player, then play games until the
+        players do not want to play again.
+        """
+        self.name = self.ask("Enter your name: ")
+        if self.name is None:
+            return
+        self.show_leaderboard()
+        while self.play():
+            answer = self.ask("Play again? (yes/no) ")
+            if answer is None or answer.lower() not in ("y", "yes"):
+                break
+        if self.leaderboard_client is not None:
+            self.leaderboard_client.close()
@@ -0,0 +1,58 @@
+class TextLayer:
+    """ This class writes lines of text one below the other with a single
+    pen, like the rows of the leaderboard. The lines are rewritten only if
+    they or their style changed since the last rendering, and clearing them
+    removes only what this layer's pen wrote.
+
+    Attributes:
+        pen (turtle.Turtle): the pen writing the lines.
+        x (float): the x-coordinate of the lines.
+        y (float): the y-coordinate of the first line.
+        spacing (float): the vertical interval between two lines.
+        rendered (tuple): the lines, font and color written last, or None.
+    """
+
+    def __init__(self, pen, x: float, y: float, spacing: float) -> None:
+        """ Construct all the necessary attributes for TextLayer object.
+
+        Args:
+            pen (turtle.Turtle): the pen writing the lines.
+            x (float): the x-coordinate of the lines.
+            y (float): the y-coordinate of the first line.
+            spacing (float): the vertical interval between two lines.
+        """
+        self.pen = pen
+        self.x = x
+        self.y = y
+        self.spacing = spacing
+        self.rendered = None
+
+    def render(self, lines, font: tuple, color: str) -> bool:
+        """ This method is to write the lines, replacing the ones written
+        before, unless they are the same.
+
+        Args:
+            lines (Iterable[str]): the lines, from top to bottom.
+            font (tuple): the font of the text.
+            color (str): the color of the text.
+
+        Returns:
+            bool: True if the lines were rewritten.
+        """
+        key = (tuple(lines), tuple(font), color)
+        if key == self.rendered:
+            return False
+        self.pen.clear()
+        self.pen.color(color)
+        for number, line in enumerate(key[0]):
+            self.pen.penup()
+            self.pen.setpos(self.x, self.y - number * self.spacing)
+            self.pen.write(line, font=font)
+        self.rendered = key
+        return True
+
+    def clear(self) -> None:
+        """ This method is to remove the lines written by this layer.
+        """
+        self.pen.clear()
+        self.rendered = None
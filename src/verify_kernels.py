@@ -0,0 +1,299 @@
+import argparse
+import functools
+import itertools
+import sys
+import time
+from src.bulk_score import TABLE_LIMIT, BulkScorer
+from src.code_space import CodeSpace, rng_stream
+from src.code_table import code_table
+from src.config import MastermindConfig
+from src.mastermind_kernal import MastermindKernal
+from src.scoring import score
+from src.shared_tables import ScoreTable
+
+# the boards with at most this many pairs are checked exhaustively
+EXHAUSTIVE_LIMIT = 1 << 21
+# the number of pairs scored by each kernel at once
+CHUNK_SIZE = 16384
+# per line written by the bulk scorer, the black and red pegs
+PEGS = {f"{black} {red}": (black, red)
+        for black in range(16) for red in range(16)}
+# the colors, code length and repeats of the boards checked by default
+BOARDS = ((5, 3, False), (6, 4, False), (6, 4, True), (8, 5, False),
+          (8, 5, True))
+
+
+def reference_kernel(colors: tuple, code_length: int, pairs: list) -> list:
+    """ This function is to score pairs with MastermindKernal, the
+    reference every other kernel is checked against.
+
+    Args:
+        colors (tuple): the colors of the game.
+        code_length (int): the number of colors in a code.
+        pairs (list): the secret codes and the guesses.
+
+    Returns:
+        list: the black and red pegs of each pair.
+    """
+    results = []
+    for secret, guess in pairs:
+        result = MastermindKernal(secret_code=secret, picked_colors=guess)
+        results.append((result.get_number_of_correct_position(),
+                        result.get_number_of_wrong_position()))
+    return results
+
+
+def scoring_kernel(colors: tuple, code_length: int, pairs: list) -> list:
+    """ This function is to score pairs with the scoring function of the
+    solvers and the session server.
+    """
+    return [score(secret, guess) for secret, guess in pairs]
+
+
+@functools.lru_cache(maxsize=4)
+def bulk_scorer(colors: tuple, code_length: int) -> BulkScorer:
+    """ This function is to return the bulk scorer of a game.
+    """
+    return BulkScorer(colors, code_length)
+
+
+def bulk_kernel(colors: tuple, code_length: int, pairs: list) -> list:
+    """ This function is to score pairs with the bulk scoring command,
+    including writing them as lines and reading the pegs back.
+    """
+    lines = [f"{','.join(secret)} {','.join(guess)}"
+             for secret, guess in pairs]
+    return [PEGS[label]
+            for label in bulk_scorer(colors, code_length).score_batch(lines)]
+
+
+def bitset_kernel(colors: tuple, code_length: int, pairs: list) -> list:
+    """ This function is to score pairs by splitting the secret codes of
+    each guess into feedback classes with the bitwise operations of the code
+    table.
+    """
+    table = code_table(colors, code_length)
+    return split_kernel(pairs, table.index,
+                        lambda mask, guess: table.classes(mask, guess))
+
+
+@functools.lru_cache(maxsize=4)
+def score_table(colors: tuple, code_length: int) -> ScoreTable:
+    """ This function is to return a score table of a game, in the memory of
+    this process.
+    """
+    table = code_table(colors, code_length)
+    scores = ScoreTable(colors, code_length,
+                        bytearray(ScoreTable.nbytes(table)))
+    scores.fill()
+    return scores
+
+
+def lookup_kernel(colors: tuple, code_length: int, pairs: list) -> list:
+    """ This function is to score pairs by reading the score table.
+    """
+    index = code_table(colors, code_length).index
+    scores = score_table(colors, code_length)
+    return [scores.score(index[guess], index[secret])
+            for secret, guess in pairs]
+
+
+def row_kernel(colors: tuple, code_length: int, pairs: list) -> list:
+    """ This function is to score pairs by splitting the secret codes of
+    each guess into feedback classes with the rows of the score table.
+    """
+    index = code_table(colors, code_length).index
+    scores = score_table(colors, code_length)
+    return split_kernel(pairs, index,
+                        lambda mask, guess: scores.classes(mask,
+                                                           index[guess]))
+
+
+def split_kernel(pairs: list, index: dict, classes) -> list:
+    """ This function is to score pairs with a function splitting a set of
+    codes into feedback classes.
+
+    Args:
+        pairs (list): the secret codes and the guesses.
+        index (dict): per code, its number.
+        classes (Callable): the function splitting a set by a guess.
+
+    Returns:
+        list: the black and red pegs of each pair.
+    """
+    secrets = {}
+    for secret, guess in pairs:
+        secrets[guess] = secrets.get(guess, 0) | 1 << index[secret]
+    feedback = {}
+    for guess, mask in secrets.items():
+        for pegs, codes in classes(mask, guess).items():
+            for number, bit in enumerate(bin(codes)[:1:-1]):
+                if bit == '1':
+                    feedback[guess, number] = pegs
+    return [feedback[guess, index[secret]] for secret, guess in pairs]
+
+
+# per kernel, the function and if it scores codes with repeated colors
+KERNELS = {
+    "reference": (reference_kernel, True),
+    "scoring": (scoring_kernel, True),
+    "bulk": (bulk_kernel, True),
+    "bitsets": (bitset_kernel, False),
+    "lookup": (lookup_kernel, False),
+    "rows": (row_kernel, False),
+}
+
+
+def palette(count: int) -> tuple:
+    """ This function is to return the colors of a board, the default colors
+    of the game first.
+
+    Args:
+        count (int): the number of colors.
+
+    Returns:
+        tuple: the colors.
+    """
+    colors = list(MastermindConfig().colors[:count])
+    colors += [f"color{number}" for number in range(len(colors), count)]
+    return tuple(colors)
+
+
+def board_kernels(space: CodeSpace) -> list[str]:
+    """ This function is to list the kernels that can score a board.
+
+    Args:
+        space (CodeSpace): the codes of the board.
+
+    Returns:
+        list[str]: the names of the kernels, the reference first.
+    """
+    names = []
+    for name, (_, repeats) in KERNELS.items():
+        if space.repeats and not repeats:
+            continue
+        if name in ("lookup", "rows") and len(space) ** 2 > TABLE_LIMIT:
+            # the score table would not fit
+            continue
+        names.append(name)
+    return names
+
+
+def board_pairs(space: CodeSpace, samples: int, seed: int):
+    """ This function is to stream the pairs of a board, every pair if there
+    are few, or seeded random pairs.
+
+    Args:
+        space (CodeSpace): the codes of the board.
+        samples (int): the number of random pairs of a large board.
+        seed (int): the seed of the random pairs.
+
+    Returns:
+        tuple: if every pair is checked, and the stream of pairs.
+    """
+    if len(space) ** 2 <= EXHAUSTIVE_LIMIT:
+        return True, itertools.product(space, space)
+    rng = rng_stream(seed, 0)
+    return False, ((space.sample(rng), space.sample(rng))
+                   for _ in range(samples))
+
+
+def verify_board(colors: int, code_length: int, repeats: bool,
+                 samples: int = 100000, seed: int = 0) -> dict:
+    """ This function is to check every kernel against the reference on a
+    board, timing each one.
+
+    Args:
+        colors (int): the number of colors.
+        code_length (int): the number of colors in a code.
+        repeats (bool): if a code may repeat a color.
+        samples (int): the number of random pairs of a large board.
+        seed (int): the seed of the random pairs.
+
+    Returns:
+        dict: the board, and per kernel the number of pairs that differ
+              from the reference, the first one, and the pairs scored per
+              second.
+    """
+    space = CodeSpace(palette(colors), code_length, repeats)
+    names = board_kernels(space)
+    exhaustive, pairs = board_pairs(space, samples, seed)
+    report = {name: {"mismatches": 0, "first_mismatch": None,
+                     "seconds": 0.0} for name in names}
+    # build the tables of each kernel before timing it
+    warm_up = [(space.unrank(0), space.unrank(len(space) - 1))]
+    for name in names:
+        KERNELS[name][0](space.colors, code_length, warm_up)
+    count = 0
+    while True:
+        chunk = list(itertools.islice(pairs, CHUNK_SIZE))
+        if not chunk:
+            break
+        count += len(chunk)
+        expected = None
+        for name in names:
+            start = time.perf_counter()
+            results = KERNELS[name][0](space.colors, code_length, chunk)
+            report[name]["seconds"] += time.perf_counter() - start
+            if expected is None:
+                expected = results
+                continue
+            for pair, result, reference in zip(chunk, results, expected):
+                if result != reference:
+                    if report[name]["first_mismatch"] is None:
+                        report[name]["first_mismatch"] = [
+                            list(pair[0]), list(pair[1]), list(result),
+                            list(reference)]
+                    report[name]["mismatches"] += 1
+    for figures in report.values():
+        seconds = figures.pop("seconds")
+        figures["pairs_per_second"] = round(count / seconds) if seconds \
+            else None
+    return {"colors": colors, "code_length": code_length,
+            "repeats": repeats, "exhaustive": exhaustive, "pairs": count,
+            "kernels": report}
+
+
+def main():
+    """ The main function checks the scoring kernels against the reference
+    on the default boards, or on one board, and prints their throughput
+    side by side.
+    """
+    parser = argparse.ArgumentParser(
+        description="Check the scoring kernels against MastermindKernal.")
+    parser.add_argument("--colors", type=int, default=None,
+                        help="the number of colors of one board")
+    parser.add_argument("--length", type=int, default=4,
+                        help="the code length of the board")
+    parser.add_argument("--repeats", action="store_true",
+                        help="allow repeated colors on the board")
+    parser.add_argument("--samples", type=int, default=100000,
+                        help="the number of random pairs of large boards")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="the seed of the random pairs")
+    args = parser.parse_args()
+    boards = BOARDS if args.colors is None else \
+        ((args.colors, args.length, args.repeats),)
+    failed = False
+    for colors, code_length, repeats in boards:
+        result = verify_board(colors, code_length, repeats, args.samples,
+                              args.seed)
+        mode = "every pair" if result["exhaustive"] else "random pairs"
+        print(f"{colors} colors, {code_length} pegs"
+              f"{', repeats' if repeats else ''}: {result['pairs']} "
+              f"{mode}")
+        reference = result["kernels"]["reference"]["pairs_per_second"]
+        for name, figures in result["kernels"].items():
+            speed = figures["pairs_per_second"]
+            status = "ok"
+            if figures["mismatches"]:
+                status = (f"{figures['mismatches']} wrong, first "
+                          f"{figures['first_mismatch']}")
+            print(f"  {name:<10} {speed:>12,} pairs/s "
+                  f"{speed / reference:>7.1f}x  {status}")
+            failed = failed or bool(figures["mismatches"])
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
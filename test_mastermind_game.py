@@ -1,7 +1,54 @@
 
+import asyncio
+import io
+import json
+import math
+import multiprocessing
+import os
+import random
+import socket
+import threading
+import time
+import tempfile
 import unittest
+from unittest import mock
 # Importing all classes and functions from the game script
 from src.mastermind_kernal import MastermindKernal
+from src import leaderboard, protocol
+from src.leaderboard_server import LeaderboardServer
+from src import leaderboard_client
+from src.leaderboard_client import LeaderboardClient
+from src.config import ConfigError, MastermindConfig, load_config, \
+    parse_config
+from src import import_timing
+from src.error_logger import ErrorLogger
+from src import game_recorder, replay
+from src.analytics import analyze
+from src.session_server import MAX_PALETTES, SessionServer
+from src.session_client import RemoteGameState
+from src import load_generator
+from src.solver import Solver, STRATEGIES
+from src.code_table import code_table
+from src.symmetry import anchor_symmetries, free_colors, relabel_set, \
+    unique_guesses
+from src.hint_engine import HintEngine, HintWorker
+from src.adversary import AdversarialGameState
+from src import opening_book
+from src.optimal import OptimalSearch, optimal_tree
+from src.decision_tree import DecisionTree, default_book, load_tree
+from src.scoring import score
+from src.game_state import GameState
+from src import snapshot
+from src.round_history import RoundHistory
+from src.code_space import CodeSpace, rng_stream
+from src.shared_tables import SHARED_TABLE_LIMIT, ScoreTable, \
+    SharedTableRegistry, attach, attached
+from src.bulk_score import BulkScorer, INVALID
+from src import verify_kernels
+from src.memory_diagnostics import MemoryDiagnostics, read_samples, trend
+from src.text_layer import TextLayer
+from src.terminal_game import TerminalGame
+from src import mastermind
 
 
 class TestMastermindGame(unittest.TestCase):
@@ -79,6 +126,1579 @@ class TestMastermindGame(unittest.TestCase):
     #     pass
 
 
+async def exchange(address: str, lines: list) -> list:
+    """
+    Send raw lines to a service, then read its replies until it closes the
+    connection or stops answering.
+    """
+    _, path = protocol.parse_address(address)
+    reader, writer = await asyncio.open_unix_connection(path)
+    writer.write(b"".join(lines))
+    await writer.drain()
+    replies = []
+    while True:
+        try:
+            line = await asyncio.wait_for(reader.readline(), timeout=0.2)
+        except asyncio.TimeoutError:
+            break
+        if not line:
+            break
+        replies.append(protocol.decode(line))
+    writer.close()
+    return replies
+
+
+class TestLeaderboardService(unittest.IsolatedAsyncioTestCase):
+    """
+    Test suite for the leaderboard file and the leaderboard service.
+    """
+
+    def setUp(self):
+        """
+        Create a temporary leaderboard file.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "leaderboard.txt")
+        with open(self.path, 'w') as file:
+            file.write("7: Jenny Yi\n3: Tong Cai\nnot a record\n5: A: B\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_leaderboard(self):
+        """
+        Test reading the best players from the leaderboard file.
+        """
+        self.assertEqual(leaderboard.read_leaderboard(self.path, top=2),
+                         [(3, "Tong Cai"), (5, "A: B")])
+
+    async def test_server_coalesces_writes(self):
+        """
+        Test that concurrent clients see new records at once and that the
+        records are committed to the file in batches.
+        """
+        address = f"unix:{self.directory.name}/leaderboard.sock"
+        server = LeaderboardServer(path=self.path, flush_interval=0.01)
+        await server.start(address)
+
+        async def player(number):
+            reader, writer = await protocol.open_connection(address)
+            writer.write(protocol.encode(
+                {"op": "add", "score": 10 + number, "name": f"P{number}"}))
+            await writer.drain()
+            reply = protocol.decode(await reader.readline())
+            writer.close()
+            return reply
+
+        replies = await asyncio.gather(*(player(n) for n in range(200)))
+        self.assertTrue(all(reply["ok"] for reply in replies))
+        self.assertEqual(server.top(4), [(3, "Tong Cai"), (5, "A: B"),
+                                         (7, "Jenny Yi"), (10, "P0")])
+        await server.close()
+        self.assertLess(server.commits, 200)
+        self.assertEqual(len(list(leaderboard.iter_leaderboard(self.path))),
+                         203)
+
+    def test_client_fallback(self):
+        """
+        Test that an unreachable service raises an OSError for the game to
+        fall back to the leaderboard file.
+        """
+        client = LeaderboardClient(
+            f"unix:{self.directory.name}/missing.sock")
+        with self.assertRaises(OSError):
+            client.top()
+        # the failure is remembered, so the next call fails fast
+        with self.assertRaises(ConnectionError):
+            client.add(3, "Tong Cai")
+
+    def serve_lines(self, replies):
+        """
+        Serve one request per connection on a Unix socket in a thread,
+        answering it with the next reply, or with nothing on a None reply,
+        then closing the connection. Returns the address and the received
+        requests.
+        """
+        path = os.path.join(self.directory.name, "lines.sock")
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen()
+        received = []
+
+        def run():
+            for reply in replies:
+                connection, _ = listener.accept()
+                with connection, connection.makefile('rb') as reader:
+                    received.append(protocol.decode(reader.readline()))
+                    if reply is not None:
+                        connection.sendall(protocol.encode(reply))
+            listener.close()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        return f"unix:{path}", received
+
+    def test_add_is_not_sent_twice(self):
+        """
+        Test that a record whose reply is lost is neither sent again nor
+        written to the leaderboard file.
+        """
+        address, received = self.serve_lines([None])
+        client = LeaderboardClient(address)
+        leaderboard_client.save_score(self.path, 4, "Ann", client=client)
+        client.close()
+        self.assertEqual(received, [{"op": "add", "score": 4,
+                                     "name": "Ann"}])
+        self.assertNotIn((4, "Ann"),
+                         list(leaderboard.iter_leaderboard(self.path)))
+
+    def test_closed_connection_is_replaced(self):
+        """
+        Test that a connection closed by the service is replaced before
+        sending, and that a rejected record is written to the file.
+        """
+        address, received = self.serve_lines(
+            [{"leaders": [[2, "Ann"]]}, {"error": "bad name"}])
+        client = LeaderboardClient(address)
+        self.assertEqual(client.top(), [(2, "Ann")])
+        # let the closing of the first connection arrive
+        time.sleep(0.05)
+        leaderboard_client.save_score(self.path, 4, "Ann", client=client)
+        client.close()
+        self.assertEqual(len(received), 2)
+        self.assertIn((4, "Ann"),
+                      list(leaderboard.iter_leaderboard(self.path)))
+
+    async def test_bad_requests_are_answered(self):
+        """
+        Test that messages which are not objects, out-of-range counts and
+        over-long lines get an error reply instead of a dropped connection.
+        """
+        server = LeaderboardServer(path=self.path, capacity=3)
+        address = f"unix:{self.directory.name}/board.sock"
+        await server.start(address)
+        replies = await exchange(address, [
+            b'[1]\n', b'"x"\n', b'{"op":"top","k":-2}\n',
+            b'{"op":"top","k":1e999}\n', b'{"op":"top","k":100}\n'])
+        self.assertIn("error", replies[0])
+        self.assertIn("error", replies[1])
+        self.assertEqual(replies[2], {"leaders": []})
+        self.assertIn("error", replies[3])
+        self.assertEqual(len(replies[4]["leaders"]), 3)
+        replies = await exchange(address, [b"[" * 100000 + b"\n",
+                                           b'{"op":"ping"}\n'])
+        self.assertEqual(replies, [{"error": "the line is too long"}])
+        await server.close()
+
+    async def test_failed_commit_is_retried(self):
+        """
+        Test that records whose commit failed stay pending and that the
+        flusher keeps running.
+        """
+        path = os.path.join(self.directory.name, "missing", "board.txt")
+        server = LeaderboardServer(path=path, flush_interval=0.01)
+        server.add(4, "Ann")
+        with self.assertLogs("mastermind.leaderboard", "ERROR"):
+            await server.start(f"unix:{self.directory.name}/board.sock")
+            await asyncio.sleep(0.05)
+        self.assertEqual(server.commits, 0)
+        self.assertFalse(server.flusher.done())
+        os.mkdir(os.path.dirname(path))
+        for _ in range(100):
+            if server.commits:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(server.pending, [])
+        await server.close()
+        self.assertEqual(leaderboard.read_leaderboard(path), [(4, "Ann")])
+
+
+class TestConfig(unittest.TestCase):
+    """
+    Test suite for the configuration loader.
+    """
+
+    def test_parse_config(self):
+        """
+        Test parsing blank lines, comments, values containing '=' and
+        missing parameters.
+        """
+        config = parse_config("# comment\n\nwidth = 600\n"
+                              "title = a=b\n"
+                              "font = Comic Sans MS, 12, bold\n")
+        self.assertEqual(config.width, 600)
+        self.assertEqual(config.title, "a=b")
+        self.assertEqual(config.font, ("Comic Sans MS", 12, "bold"))
+        self.assertEqual(config.height, MastermindConfig().height)
+        self.assertEqual(config.mastermind_kwargs()["row_interval"],
+                         MastermindConfig().row_interval)
+        with self.assertRaises(ConfigError):
+            parse_config("width = wide\n")
+        with self.assertRaises(ConfigError):
+            parse_config("colors = red, red, blue, green\n")
+
+    def test_load_config_cache(self):
+        """
+        Test that an unchanged file is not parsed again.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "config.txt")
+            with open(path, 'w') as file:
+                file.write("font_color = blue\n")
+            config = load_config(path)
+            self.assertIs(load_config(path), config)
+            with open(path, 'w') as file:
+                file.write("font_color = red\n")
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(load_config(path).font_color, "red")
+
+
+class TestHeadlessImport(unittest.TestCase):
+    """
+    Test suite for the start-up paths of the game.
+    """
+
+    def test_headless_path_without_tkinter(self):
+        """
+        Test that the game logic is imported without tkinter.
+        """
+        _, loads_tkinter = import_timing.measure(
+            import_timing.PATHS["headless"], runs=1)
+        self.assertFalse(loads_tkinter)
+
+
+class TestErrorLogger(unittest.TestCase):
+    """
+    Test suite for the queued JSON-lines logger.
+    """
+
+    def test_execute_and_log(self):
+        """
+        Test that exceptions, callback exceptions and events are written
+        as JSON lines with tracebacks, and that the file rotates.
+        """
+        def broken_game():
+            logger.log_event("check", round=3, message="not the message")
+            try:
+                raise KeyError("click")
+            except KeyError as e:
+                logger.report_callback_exception(type(e), e, e.__traceback__)
+            raise ValueError("bad color string: r")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "errors.jsonl")
+            logger = ErrorLogger(path=path, max_bytes=10 ** 6)
+            logger.execute_and_log(broken_game)
+            with open(path) as file:
+                records = [json.loads(line) for line in file]
+            self.assertEqual([record["level"] for record in records],
+                             ["INFO", "ERROR", "ERROR"])
+            self.assertEqual(records[0]["message"], "check")
+            self.assertEqual(records[0]["fields"],
+                             {"round": 3, "message": "not the message"})
+            self.assertIn("KeyError", records[1]["traceback"])
+            self.assertIn("broken_game", records[2]["traceback"])
+
+            logger = ErrorLogger(path=path, max_bytes=200)
+            logger.execute_and_log(
+                lambda: [logger.log_event("select", color="red")
+                         for _ in range(10)])
+            self.assertTrue(os.path.exists(path + ".1"))
+
+
+class TestGameRecorder(unittest.TestCase):
+    """
+    Test suite for the binary game-event recorder.
+    """
+
+    def test_record_and_read_session(self):
+        """
+        Test that a recorded session is read back with the same header and
+        events.
+        """
+        colors = ["red", "blue", "green", "yellow", "purple", "black"]
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = game_recorder.GameRecorder(directory)
+            recorder.start(colors, ["red", "green", "yellow", "black"])
+            recorder.record(game_recorder.SELECT, color=1, round_index=0)
+            recorder.record(game_recorder.UNDO, color=1, round_index=0)
+            recorder.record(game_recorder.CHECK, round_index=0,
+                            feedback=game_recorder.pack_feedback(1, 2))
+            recorder.record(game_recorder.LOSE, round_index=9)
+            recorder.close()
+            session = game_recorder.read_session(recorder.path)
+        self.assertEqual(session.colors, colors)
+        self.assertEqual(session.secret, (0, 2, 3, 5))
+        self.assertEqual(len(session.records), 4 * game_recorder.RECORD.size)
+        events = [event[1:] for event in session.events()]
+        self.assertEqual(events, [
+            (game_recorder.SELECT, 1, 0, game_recorder.NONE),
+            (game_recorder.UNDO, 1, 0, game_recorder.NONE),
+            (game_recorder.CHECK, game_recorder.NONE, 0, 0x12),
+            (game_recorder.LOSE, game_recorder.NONE, 9, game_recorder.NONE)])
+        self.assertEqual(game_recorder.unpack_feedback(0x12), (1, 2))
+
+    def test_secret_picked_at_the_end(self):
+        """
+        Test that a session started without a secret code gets the one
+        given when it is closed, and is refused if it never gets one.
+        """
+        colors = ["red", "blue", "green", "yellow", "purple", "black"]
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = game_recorder.GameRecorder(directory)
+            recorder.start(colors, [], code_length=4)
+            recorder.record(game_recorder.CHECK, round_index=0,
+                            feedback=game_recorder.pack_feedback(0, 4))
+            recorder.close(secret=[3, 2, 1, 0])
+            session = game_recorder.read_session(recorder.path)
+            self.assertEqual(session.secret, (3, 2, 1, 0))
+            self.assertEqual(len(session.records), game_recorder.RECORD.size)
+            recorder.start(colors, [], code_length=4)
+            recorder.close()
+            with self.assertRaises(ValueError):
+                game_recorder.read_session(recorder.path)
+
+
+def record_random_session(directory: str, seed: int) -> str:
+    """
+    Play a random game through GameState and record it like the UI does.
+    """
+    rng = random.Random(seed)
+    colors = ["red", "blue", "green", "yellow", "purple", "black"]
+    state = GameState(colors=colors)
+    state.secret_code = rng.sample(colors, 4)
+    recorder = game_recorder.GameRecorder(directory)
+    recorder.start(colors, state.secret_code)
+    while True:
+        if state.selection_stack and rng.random() < 0.2:
+            color = state.undo()
+            recorder.record(game_recorder.UNDO, colors.index(color),
+                            state.round)
+            continue
+        while not state.can_check():
+            color = rng.choice(colors)
+            if state.select(color):
+                recorder.record(game_recorder.SELECT, colors.index(color),
+                                state.round)
+        result = state.check()
+        recorder.record(game_recorder.CHECK, round_index=state.round,
+                        feedback=game_recorder.pack_feedback(
+                            result.get_number_of_correct_position(),
+                            result.get_number_of_wrong_position()))
+        if state.is_over:
+            recorder.record(game_recorder.WIN if state.is_win
+                            else game_recorder.LOSE, round_index=state.round)
+            break
+        state.next_round()
+    recorder.close()
+    return recorder.path
+
+
+class TestReplay(unittest.TestCase):
+    """
+    Test suite for replaying recorded sessions.
+    """
+
+    def test_replay_sessions(self):
+        """
+        Test that recorded sessions replay cleanly and that a corrupted
+        feedback is reported.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [record_random_session(directory, seed)
+                     for seed in range(20)]
+            results = list(replay.replay_paths([directory]))
+            self.assertEqual(len(results), 20)
+            self.assertTrue(all(result.ok for result in results))
+            self.assertTrue(all(result.outcome in ("win", "lose")
+                                for result in results))
+            session = game_recorder.read_session(paths[0])
+            records = bytearray(session.records)
+            for offset in range(0, len(records), game_recorder.RECORD.size):
+                if records[offset + 4] == game_recorder.CHECK:
+                    records[offset + 7] ^= 0x10
+                    break
+            session.records = bytes(records)
+            self.assertFalse(replay.replay_session(session).ok)
+
+
+class TestAnalytics(unittest.TestCase):
+    """
+    Test suite for the streaming analytics.
+    """
+
+    def test_analyze(self):
+        """
+        Test that sequential and pooled analyses agree with the replayed
+        outcomes.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            for seed in range(30):
+                record_random_session(directory, seed)
+            path = os.path.join(directory, "leaderboard.txt")
+            leaderboard.write_leaderboard(path, [(3, "A"), (3, "B"), (5, "C")])
+            results = list(replay.replay_paths([directory]))
+            report = analyze([directory],
+                             leaderboard_path=path).report(top=400)
+            pooled = analyze([directory], workers=2).report(top=400)
+        wins = sum(result.outcome == "win" for result in results)
+        self.assertEqual(report["sessions"], 30)
+        self.assertEqual(report["outcomes"].get("win", 0), wins)
+        self.assertEqual(report["win_rate"], wins / 30)
+        self.assertEqual(sum(report["guess_counts"].values()), wins)
+        self.assertEqual(report["leaderboard_scores"], {3: 2, 5: 1})
+        self.assertEqual(sum(count for _, count in report["openings"]), 30)
+        self.assertIsNotNone(report["round_time_ms"]["p50"])
+        self.assertEqual(pooled["outcomes"], report["outcomes"])
+        self.assertEqual(pooled["hardest_secrets"],
+                         report["hardest_secrets"])
+
+
+class TestSessionServer(unittest.TestCase):
+    """
+    Test suite for the multi-session game server and its thin client.
+    """
+
+    def test_sessions_and_eviction(self):
+        """
+        Test independent sessions, the session cap and idle eviction.
+        """
+        server = SessionServer(max_sessions=2, idle_timeout=0.0)
+        first = server.handle({"op": "new"})["session"]
+        second = server.handle({"op": "new"})["session"]
+        state = server.sessions[first].state
+        for color in state.secret_code:
+            self.assertTrue(server.handle({"op": "select", "session": first,
+                                           "color": color})["ok"])
+        self.assertFalse(server.handle({"op": "select", "session": first,
+                                        "color": "red"})["ok"])
+        reply = server.handle({"op": "check", "session": first})
+        self.assertEqual((reply["black"], reply["win"]), (4, True))
+        self.assertEqual(server.handle(
+            {"op": "state", "session": second})["round"], 0)
+        server.handle({"op": "new"})
+        self.assertEqual(len(server.sessions), 2)
+        self.assertNotIn(first, server.sessions)
+        self.assertEqual(server.evict_idle(), 2)
+
+    def test_session_size_is_bounded(self):
+        """
+        Test that long color names are refused and that the shared color
+        lists stop growing at their cap.
+        """
+        server = SessionServer()
+        with self.assertRaises(ValueError):
+            server.new_session(["red", "blue", "green", "x" * 33])
+        for number in range(MAX_PALETTES + 10):
+            server.new_session(["red", "blue", "green", f"gray{number}"])
+        self.assertEqual(len(server.palettes), MAX_PALETTES)
+        reply = server.handle({"op": "new", "colors": ["a" * 32, "b", "c",
+                                                       "d"]})
+        self.assertEqual(reply["colors"][0], "a" * 32)
+
+    def test_bad_requests_are_answered(self):
+        """
+        Test that messages which are not objects and over-long lines get an
+        error reply instead of a dropped connection.
+        """
+        server = SessionServer()
+
+        async def run(address):
+            await server.start(address)
+            replies = await exchange(address, [b'[1]\n', b'"x"\n',
+                                               b'{"op":"ping"}\n'])
+            replies += await exchange(address, [b"x" * 100000 + b"\n"])
+            await server.close()
+            return replies
+
+        with tempfile.TemporaryDirectory() as directory:
+            replies = asyncio.run(run(f"unix:{directory}/sessions.sock"))
+        self.assertIn("error", replies[0])
+        self.assertIn("error", replies[1])
+        self.assertEqual(replies[2], {"ok": True, "sessions": 0})
+        self.assertEqual(replies[3], {"error": "the line is too long"})
+
+    def test_remote_game_state(self):
+        """
+        Test that RemoteGameState plays a game hosted by a running server,
+        and closes it on the server when a new game starts or it ends.
+        """
+        loop = asyncio.new_event_loop()
+        server = SessionServer()
+        with tempfile.TemporaryDirectory() as directory:
+            address = f"unix:{directory}/sessions.sock"
+            loop.run_until_complete(server.start(address))
+            thread = threading.Thread(target=loop.run_forever)
+            thread.start()
+            try:
+                state = RemoteGameState(address=address,
+                                        colors=server.colors)
+                state.generate_secret_code()
+                secret = server.sessions[state.session].state.secret_code
+                wrong = [color for color in server.colors
+                         if color not in secret][:1] + secret[1:]
+                for color in wrong:
+                    self.assertTrue(state.select(color))
+                self.assertEqual(state.undo(), wrong[-1])
+                self.assertTrue(state.select(wrong[-1]))
+                result = state.check()
+                self.assertEqual(result.get_number_of_correct_position(), 3)
+                self.assertFalse(state.is_over)
+                state.next_round()
+                for color in secret:
+                    state.select(color)
+                self.assertTrue(state.check().is_win())
+                self.assertEqual(state.secret_code, secret)
+                # a new game closes the previous one on the server
+                first = state.session
+                state.generate_secret_code()
+                self.assertEqual(list(server.sessions), [state.session])
+                self.assertNotEqual(state.session, first)
+                state.end_session()
+                self.assertEqual(len(server.sessions), 0)
+                state.client.close()
+            finally:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.run_until_complete(server.close())
+                loop.close()
+
+
+class TestLoadGenerator(unittest.IsolatedAsyncioTestCase):
+    """
+    Test suite for the solver and the load generator.
+    """
+
+    def test_solver(self):
+        """
+        Test that the solver finds every secret code within 10 rounds.
+        """
+        colors = ["red", "blue", "green", "yellow", "purple", "black"]
+        rng = random.Random(1)
+        for _ in range(20):
+            secret = tuple(rng.sample(colors, 4))
+            solver = Solver(colors, rng=rng)
+            for _ in range(10):
+                guess = solver.next_guess()
+                mmc = MastermindKernal(list(secret), list(guess))
+                feedback = (mmc.get_number_of_correct_position(),
+                            mmc.get_number_of_wrong_position())
+                self.assertEqual(score(secret, guess), feedback)
+                if guess == secret:
+                    break
+                solver.update(guess, *feedback)
+            self.assertEqual(guess, secret)
+
+    async def test_run(self):
+        """
+        Test a short run of solver-driven players against a server, which
+        closes every session it opened.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            address = f"unix:{directory}/sessions.sock"
+            server = SessionServer()
+            await server.start(address)
+            result = await load_generator.run(address, players=5,
+                                              mode="solver", duration=0.3,
+                                              rate=0, seed=0)
+            # every game was closed, also the ones cut off by the deadline
+            self.assertEqual(len(server.sessions), 0)
+            await server.close()
+        results = result["results"]
+        self.assertGreater(results["games"], 0)
+        self.assertEqual(results["operations"]["close"]["count"],
+                         results["operations"]["new"]["count"])
+        self.assertEqual(results["wins"], results["games"])
+        self.assertEqual(results["errors"], 0)
+        self.assertLessEqual(results["operations"]["check"]["p50_ms"],
+                             results["operations"]["check"]["p99_ms"])
+
+    async def test_lost_connection(self):
+        """
+        Test that a player whose connection is lost ends with an error,
+        without closing its game or stopping the run.
+        """
+        colors = ["red", "blue", "green", "yellow", "purple", "black"]
+
+        async def handle_client(reader, writer):
+            # the first game is opened, then the connection is dropped
+            await reader.readline()
+            writer.write(protocol.encode({"session": "s", "colors": colors}))
+            await writer.drain()
+            await reader.readline()
+            writer.close()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = f"{directory}/sessions.sock"
+            server = await asyncio.start_unix_server(handle_client, path)
+            result = await load_generator.run(f"unix:{path}", players=2,
+                                              mode="random", duration=0.3,
+                                              rate=0, seed=0)
+            server.close()
+            await server.wait_closed()
+        results = result["results"]
+        self.assertEqual(results["errors"], 2)
+        self.assertEqual(results["operations"]["new"]["count"], 2)
+        self.assertNotIn("close", results["operations"])
+
+
+class TestSnapshot(unittest.TestCase):
+    """
+    Test suite for saving and resuming unfinished games.
+    """
+
+    def test_save_and_read(self):
+        """
+        Test that a saved game is read back with its rounds and selections,
+        and that a broken snapshot is ignored.
+        """
+        random.seed(3)
+        state = GameState(["red", "blue", "green", "yellow", "purple",
+                           "black"])
+        state.generate_secret_code()
+        for _ in range(3):
+            for color in random.sample(state.colors, 4):
+                state.select(color)
+            state.check()
+            state.next_round()
+        state.select("blue")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game.snapshot")
+            snapshot.save_snapshot(path, state)
+            self.assertEqual(os.listdir(directory), ["game.snapshot"])
+            resumed = snapshot.read_snapshot(path)
+            self.assertEqual(resumed.secret_code, state.secret_code)
+            self.assertEqual(resumed.round, 3)
+            self.assertEqual(resumed.selection_stack, ["blue"])
+            self.assertEqual(resumed.history, state.history)
+            with open(path, 'wb') as file:
+                file.write(snapshot.dump_state(state)[:-5])
+            self.assertIsNone(snapshot.read_snapshot(path))
+            snapshot.remove_snapshot(path)
+            self.assertIsNone(snapshot.read_snapshot(path))
+
+    def test_adversary_game(self):
+        """
+        Test that an adversary's game is saved with the codes it still
+        keeps, and goes on consistently once resumed.
+        """
+        colors = ["red", "blue", "green", "yellow", "purple", "black"]
+        state = AdversarialGameState(colors, rng=random.Random(1))
+        state.generate_secret_code()
+        for guess in (colors[:4], colors[2:]):
+            for color in guess:
+                state.select(color)
+            state.check()
+            state.next_round()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game.snapshot")
+            snapshot.save_snapshot(path, state)
+            resumed = snapshot.read_snapshot(path)
+        self.assertIsInstance(resumed, AdversarialGameState)
+        self.assertEqual(resumed.mask, state.mask)
+        self.assertEqual(resumed.round, 2)
+        self.assertEqual(resumed.history, state.history)
+        while not resumed.is_over:
+            for color in colors[1:5]:
+                resumed.select(color)
+            resumed.check()
+            if not resumed.is_over:
+                resumed.next_round()
+        for guess, black, red in resumed.history.with_colors(colors):
+            self.assertEqual(score(tuple(resumed.secret_code), guess),
+                             (black, red))
+
+
+class TestRoundHistory(unittest.TestCase):
+    """
+    Test suite for the round history of a game.
+    """
+
+    def test_ring_buffer(self):
+        """
+        Test that the history keeps the newest rounds in order.
+        """
+        history = RoundHistory(capacity=3, code_length=2)
+        for number in range(5):
+            history.append([number, number + 1], black=number, red=1)
+        self.assertEqual(len(history), 3)
+        self.assertEqual(list(history), [((2, 3), 2, 1), ((3, 4), 3, 1),
+                                         ((4, 5), 4, 1)])
+        self.assertEqual(history[-1], ((4, 5), 4, 1))
+        with self.assertRaises(IndexError):
+            history[3]
+        history.clear()
+        self.assertEqual(list(history), [])
+
+    def test_game_history(self):
+        """
+        Test that every check of a game is stored with its feedback.
+        """
+        colors = ["red", "blue", "green", "yellow", "purple", "black"]
+        state = GameState(colors)
+        state.secret_code = ["red", "blue", "green", "yellow"]
+        for guess in (["blue", "red", "purple", "black"],
+                      ["red", "blue", "green", "yellow"]):
+            for color in guess:
+                state.select(color)
+            state.check()
+            state.next_round()
+        self.assertEqual(list(state.history.with_colors(colors)),
+                         [(("blue", "red", "purple", "black"), 0, 2),
+                          (("red", "blue", "green", "yellow"), 4, 0)])
+
+
+class TestStrategies(unittest.TestCase):
+    """
+    Test suite for the feedback partitions and the solver strategies.
+    """
+
+    def test_partition(self):
+        """
+        Test that the partition of a guess matches scoring every code.
+        """
+        table = code_table(("red", "blue", "green", "yellow", "purple",
+                            "black"))
+        rng = random.Random(5)
+        for guess in rng.sample(table.codes, 30):
+            counts = {}
+            for code in table.codes:
+                feedback = score(code, guess)
+                counts[feedback] = counts.get(feedback, 0) + 1
+            self.assertEqual(table.partition(table.full, guess), counts)
+
+    def test_strategies(self):
+        """
+        Test that every strategy finds sampled secret codes within 10
+        rounds.
+        """
+        colors = ["red", "blue", "green", "yellow", "purple", "black"]
+        rng = random.Random(6)
+        for strategy in STRATEGIES:
+            for _ in range(30):
+                secret = tuple(rng.sample(colors, 4))
+                solver = Solver(colors, strategy=strategy)
+                for _ in range(10):
+                    guess = solver.next_guess()
+                    if guess == secret:
+                        break
+                    solver.update(guess, *score(secret, guess))
+                self.assertEqual(guess, secret)
+
+
+class TestOpeningBook(unittest.TestCase):
+    """
+    Test suite for the opening book of the solver.
+    """
+
+    def test_book_matches_search(self):
+        """
+        Test that the guesses read from a saved book are the guesses the
+        strategy searches for.
+        """
+        colors = ["red", "blue", "green", "yellow", "purple", "black"]
+        book = opening_book.build_book(colors, strategy="minimax", plies=2)
+        with tempfile.TemporaryDirectory() as directory:
+            opening_book.save_book(directory, book)
+            loaded = opening_book.OpeningBook(
+                opening_book.book_path(directory, colors, 4, "minimax"),
+                colors, 4, "minimax")
+            rng = random.Random(7)
+            for _ in range(10):
+                secret = tuple(rng.sample(colors, 4))
+                booked = Solver(colors, strategy="minimax", book=loaded)
+                searched = Solver(colors, strategy="minimax", book=None)
+                for _ in range(3):
+                    guess = booked.next_guess()
+                    self.assertEqual(guess, searched.next_guess())
+                    if guess == secret:
+                        break
+                    booked.update(guess, *score(secret, guess))
+                    searched.update(guess, *score(secret, guess))
+            self.assertIsNone(loaded.lookup([(("red", "red", "red",
+                                               "red"), 0, 0)]))
+
+    def test_solver_reads_shipped_book(self):
+        """
+        Test that a solver follows the shipped tree or book of its game by
+        default, and searches when there is none or when it is given none.
+        """
+        colors = ["red", "blue", "green", "yellow", "purple", "black"]
+        solver = Solver(colors, strategy="entropy")
+        self.assertIsNotNone(solver.book)
+        self.assertEqual(solver.next_guess(), solver.book.lookup([]))
+        self.assertIsNone(Solver(colors, strategy="entropy",
+                                 book=None).book)
+        self.assertIsNone(Solver(colors[:5], 3, strategy="entropy").book)
+        self.assertIsNone(Solver(colors).book)
+
+
+class TestOptimalStrategy(unittest.TestCase):
+    """
+    Test suite for the optimal strategy search.
+    """
+
+    def test_small_board(self):
+        """
+        Test the optimal costs of a 5-color, 3-peg game, found by exhaustive
+        search, and that its decision tree plays every game at that cost.
+        """
+        colors = ["a", "b", "c", "d", "e"]
+        table = code_table(tuple(colors), 3)
+        self.assertEqual(OptimalSearch(table, "worst").solve(table.full), 4)
+        result = optimal_tree(colors, 3, "expected", workers=2)
+        self.assertEqual(result["cost"], 196)
+        tree = DecisionTree(colors, 3, result["tree"])
+        total = 0
+        for secret in table.codes:
+            solver = Solver(colors, 3, strategy="minimax", book=tree)
+            for rounds in range(1, 10):
+                guess = solver.next_guess()
+                if guess == secret:
+                    break
+                solver.update(guess, *score(secret, guess))
+            total += rounds
+        self.assertEqual(total, 196)
+
+    def test_canonical_transpositions(self):
+        """
+        Test that keying the transposition table by canonical sets keeps the
+        optimal cost and the decision tree, and searches fewer sets.
+        """
+        colors = ("red", "blue", "green", "yellow", "purple", "black")
+        table = code_table(colors)
+        first = table.guesses[0]
+        symmetries = anchor_symmetries(colors, 4, first)
+        self.assertEqual(len(symmetries), 48)
+        for forward, backward in symmetries:
+            self.assertEqual(forward[0], 0)
+            self.assertEqual(relabel_set(relabel_set(table.full, forward),
+                                         backward), table.full)
+        mask = table.classes(table.full, first)[(0, 3)]
+        plain = OptimalSearch(table, "worst")
+        anchored = OptimalSearch(table, "worst", anchor=first)
+        self.assertEqual(anchored.solve(mask), plain.solve(mask))
+        self.assertLess(anchored.nodes, plain.nodes)
+        tree = DecisionTree(colors, 4, [0, [[0, 3, anchored.decision_tree(
+            mask)]]])
+        for secret in table.members(mask):
+            history = [(first, 0, 3)]
+            while tree.lookup(history) != secret:
+                guess = tree.lookup(history)
+                history.append((guess, *score(secret, guess)))
+            self.assertLessEqual(len(history), anchored.solve(mask))
+
+    def test_shipped_trees(self):
+        """
+        Test that the solver and the hints follow the shipped decision tree
+        of the default game with no search, and that the tree files are
+        not read as opening books.
+        """
+        colors = ("red", "blue", "green", "yellow", "purple", "black")
+        tree = load_tree(colors)
+        self.assertIsNotNone(tree)
+        self.assertEqual(default_book(colors, 4, "expected").key, tree.key)
+        self.assertEqual(default_book(colors, 4, "minimax").key,
+                         load_tree(colors, 4, "worst").key)
+        self.assertIsNone(default_book(("a", "b", "c", "d", "e"), 3,
+                                       "entropy"))
+        path = os.path.join(opening_book.BOOK_DIR,
+                            f"tree-{tree.key}.json")
+        self.assertEqual(opening_book.OpeningBook(
+            path, colors, 4, "optimal-expected").load(), {})
+        table = code_table(colors)
+        total = 0
+        for secret in table.guesses:
+            solver = Solver(colors, strategy="expected")
+            self.assertEqual(solver.book.key, tree.key)
+            history = []
+            while True:
+                guess = solver.next_guess()
+                self.assertEqual(guess, tree.lookup(history))
+                self.assertEqual(HintEngine(colors, budget_ms=0).suggest(
+                    history), guess)
+                total += 1
+                if guess == secret:
+                    break
+                history.append((guess, *score(secret, guess)))
+                solver.update(guess, *score(secret, guess))
+        self.assertEqual(total, 1446)
+
+
+class TestSymmetry(unittest.TestCase):
+    """
+    Test suite for the symmetry reduction of the solver search.
+    """
+
+    def test_equivalent_guesses(self):
+        """
+        Test that equivalent guesses are rated once and rate the same.
+        """
+        colors = ("red", "blue", "green", "yellow", "purple", "black")
+        table = code_table(colors)
+        self.assertEqual(len(unique_guesses(colors, 4, colors, True)), 1)
+        first = ("red", "blue", "green", "yellow")
+        mask = table.classes(table.full, first)[(1, 1)]
+        free = free_colors(colors, [first])
+        self.assertEqual(free, ("purple", "black"))
+        self.assertEqual(len(unique_guesses(colors, 4, free, False)), 192)
+        for guess in table.guesses:
+            swapped = tuple({"purple": "black", "black": "purple"}.get(
+                color, color) for color in guess)
+            self.assertEqual(sorted(table.partition(mask, guess).values()),
+                             sorted(table.partition(mask, swapped).values()))
+
+
+class TestHintEngine(unittest.TestCase):
+    """
+    Test suite for the hints of the game window.
+    """
+
+    def test_hint_is_consistent(self):
+        """
+        Test that a hint is consistent with the feedback so far, even with
+        a tiny time budget, and that the worker thread delivers it.
+        """
+        colors = ["red", "blue", "green", "yellow", "purple", "black"]
+        secret = ("black", "green", "red", "purple")
+        history = []
+        for guess in (("red", "blue", "green", "yellow"),
+                      ("purple", "black", "blue", "green")):
+            history.append((guess, *score(secret, guess)))
+        for budget_ms in (0, 50):
+            engine = HintEngine(colors, budget_ms=budget_ms)
+            hint = engine.suggest(history)
+            for guess, black, red in history:
+                self.assertEqual(score(hint, guess), (black, red))
+        worker = HintWorker(lambda: HintEngine(colors))
+        self.assertIsNone(worker.engine)
+        self.assertTrue(worker.request(history, tag=2))
+        self.assertFalse(worker.request(history, tag=2))
+        for _ in range(500):
+            result = worker.poll()
+            if result is not None:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(result[0], 2)
+        self.assertIsInstance(worker.engine, HintEngine)
+        for guess, black, red in history:
+            self.assertEqual(score(result[1], guess), (black, red))
+        # three black pegs and one red peg is impossible
+        self.assertIsNone(engine.suggest(history + [(hint, 3, 1)]))
+
+
+class TestAdversary(unittest.TestCase):
+    """
+    Test suite for the adversarial codemaker.
+    """
+
+    def test_feedback_is_consistent(self):
+        """
+        Test that the secret code picked at the end matches every feedback
+        the adversary gave.
+        """
+        colors = ["red", "blue", "green", "yellow", "purple", "black"]
+        for seed in range(5):
+            rng = random.Random(seed)
+            state = AdversarialGameState(colors, rng=rng)
+            state.generate_secret_code()
+            self.assertEqual(state.secret_code, [])
+            solver = Solver(colors, rng=rng)
+            while not state.is_over:
+                for color in solver.next_guess():
+                    state.select(color)
+                result = state.check()
+                solver.update(tuple(state.selection_stack),
+                              result.get_number_of_correct_position(),
+                              result.get_number_of_wrong_position())
+                if not state.is_over:
+                    state.next_round()
+            self.assertEqual(len(state.secret_code), 4)
+            for guess, black, red in state.history.with_colors(colors):
+                self.assertEqual(score(tuple(state.secret_code), guess),
+                                 (black, red))
+            # the adversary never gives the secret code away early
+            self.assertGreaterEqual(len(state.history), 4)
+
+
+class TestCodeSpace(unittest.TestCase):
+    """
+    Test suite for the lazy code space.
+    """
+
+    def test_rank_and_unrank(self):
+        """
+        Test that codes are numbered in iteration order, with and without
+        repeated colors, and that chunks cover the space in order.
+        """
+        for repeats in (False, True):
+            space = CodeSpace("abcde", 3, repeats=repeats)
+            codes = list(space)
+            self.assertEqual(len(codes), len(space))
+            self.assertEqual(len(set(codes)), len(space))
+            for number, code in enumerate(codes):
+                self.assertEqual(space.unrank(number), code)
+                self.assertEqual(space.rank(code), number)
+            streamed = [code for start, stop in space.chunks(7)
+                        for code in space.codes(start, stop)]
+            self.assertEqual(streamed, codes)
+        self.assertEqual(len(CodeSpace("abcde", 3)), 60)
+        self.assertEqual(len(CodeSpace("abcde", 3, repeats=True)), 125)
+        with self.assertRaises(ValueError):
+            CodeSpace("abcde", 3).rank("aab")
+
+    def test_large_space(self):
+        """
+        Test that a space of 10**8 codes is sampled and split without being
+        built, and that worker streams are reproducible.
+        """
+        space = CodeSpace("0123456789", 8, repeats=True)
+        self.assertEqual(len(space), 10 ** 8)
+        self.assertEqual(space.unrank(12345678), tuple("12345678"))
+        first = [space.sample(rng_stream(7, worker)) for worker in range(4)]
+        again = [space.sample(rng_stream(7, worker)) for worker in range(4)]
+        self.assertEqual(first, again)
+        self.assertEqual(len(set(first)), 4)
+        chunks = list(space.chunks(10 ** 7, start=5))
+        self.assertEqual(chunks[0], (5, 10 ** 7 + 5))
+        self.assertEqual(chunks[-1][1], 10 ** 8)
+
+    def test_secret_code_is_uniform(self):
+        """
+        Test that secret codes are drawn among every ordering of the colors.
+        """
+        random.seed(0)
+        state = GameState(["red", "blue", "green", "yellow", "purple",
+                           "black"])
+        seen = set()
+        for _ in range(3000):
+            code = tuple(state.generate_secret_code())
+            self.assertEqual(len(set(code)), 4)
+            seen.add(code)
+        self.assertEqual(len(seen), 360)
+
+
+def read_shared_row(guess: int) -> bytes:
+    """
+    Read a row of the score table attached by a pool process.
+    """
+    return bytes(attached(tuple("abcde"), 3).row(guess))
+
+
+def read_shared_codes(_) -> tuple:
+    """
+    Read the code table of a game attached by a pool process.
+    """
+    table = code_table(tuple("abcde"), 3)
+    return table.codes, table.at, table.contains, table.scores is not None
+
+
+class TestSharedTables(unittest.TestCase):
+    """
+    Test suite for the score tables shared by pool processes.
+    """
+
+    def test_scores_and_classes(self):
+        """
+        Test that the shared table scores every pair like the kernal, splits
+        small sets like the bitwise operations, and is read by pool
+        processes, with the codes and bitsets, without being rebuilt.
+        """
+        table = code_table(tuple("abcde"), 3)
+        with SharedTableRegistry() as registry:
+            scores = registry.publish(table.colors, 3)
+            self.assertIs(table.scores, scores)
+            for guess_number, guess in enumerate(table.guesses):
+                for code_number, code in enumerate(table.codes):
+                    self.assertEqual(scores.score(guess_number, code_number),
+                                     score(code, guess))
+            rng = random.Random(0)
+            for size in (1, 5, 20):
+                mask = sum(1 << number for number
+                           in rng.sample(range(len(table)), size))
+                for guess in table.guesses[:10]:
+                    table.scores = None
+                    expected = table.classes(mask, guess)
+                    table.scores = scores
+                    self.assertEqual(table.classes(mask, guess), expected)
+                    self.assertEqual(list(table.classes(mask, guess)),
+                                     list(expected))
+            with multiprocessing.Pool(2, attach,
+                                      (registry.handles(),)) as pool:
+                rows = pool.map(read_shared_row, [0, 7])
+            self.assertEqual(rows, [bytes(scores.row(0)),
+                                    bytes(scores.row(7))])
+            # a spawned process reads the codes and bitsets it lacks
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(1, attach, (registry.handles(),)) as pool:
+                shared = pool.map(read_shared_codes, [0])[0]
+            self.assertEqual(shared, (table.codes, table.at,
+                                      table.contains, True))
+        self.assertIsNone(table.scores)
+
+    def test_publish_limit(self):
+        """
+        Test that a score table larger than the limit is not published, and
+        the game is then split with the bitwise operations.
+        """
+        table = code_table(tuple("abcde"), 3)
+        with SharedTableRegistry() as registry:
+            self.assertIsNone(registry.publish(
+                table.colors, 3, limit=ScoreTable.nbytes(table) - 1))
+            [(_, name, colors, code_length)] = registry.handles()
+            self.assertEqual((name, colors, code_length),
+                             (None, table.colors, 3))
+            self.assertIsNone(table.scores)
+        self.assertGreater(ScoreTable.nbytes(code_table(
+            tuple("abcdefghij"), 5)), SHARED_TABLE_LIMIT)
+
+
+class TestBulkScore(unittest.TestCase):
+    """
+    Test suite for scoring streams of (secret, guess) pairs.
+    """
+
+    def test_score_stream(self):
+        """
+        Test that pairs in color-name or index form are scored like the
+        kernal, and that unreadable lines are marked without stopping.
+        """
+        colors = ["red", "blue", "green", "yellow", "purple", "black"]
+        space = CodeSpace(colors, 4, repeats=True)
+        rng = random.Random(0)
+        lines = []
+        expected = []
+        for number in range(500):
+            secret, guess = space.sample(rng), space.sample(rng)
+            texts = [",".join(secret), ",".join(guess)]
+            if number % 2:
+                texts[0] = ",".join(str(colors.index(color))
+                                    for color in secret)
+            lines.append(" ".join(texts) + "\n")
+            result = MastermindKernal(secret_code=list(secret),
+                                      picked_colors=list(guess))
+            expected.append(f"{result.get_number_of_correct_position()} "
+                            f"{result.get_number_of_wrong_position()}")
+        lines += ["red,blue\n", "red,blue,green,white 0,1,2,3\n", "\n"]
+        expected += [INVALID] * 3
+        scorer = BulkScorer(colors)
+        output = "".join(scorer.score_stream(lines + lines))
+        self.assertEqual(output.splitlines(), expected + expected)
+        self.assertEqual(scorer.invalid, 6)
+
+    def test_large_board(self):
+        """
+        Test that a board too large for the score table, the pair cache
+        and the preloaded codes is scored like the kernal, with the codes
+        numbered by their rank among every code.
+        """
+        colors = [f"color{number}" for number in range(10)]
+        space = CodeSpace(colors, 5, repeats=True)
+        scorer = BulkScorer(colors, 5)
+        self.assertIsNone(scorer.feedback)
+        self.assertIsNone(scorer.cache)
+        rng = random.Random(1)
+        pairs = [(space.sample(rng), space.sample(rng)) for _ in range(300)]
+        lines = [f"{','.join(secret)} "
+                 f"{','.join(str(colors.index(color)) for color in guess)}"
+                 for secret, guess in pairs]
+        self.assertEqual(scorer.score_batch(lines),
+                         ["%d %d" % score(secret, guess)
+                          for secret, guess in pairs])
+        secret = pairs[0][0]
+        self.assertEqual(scorer.codes[",".join(secret)][0],
+                         space.rank(secret))
+
+
+def swapped_kernel(colors: tuple, code_length: int, pairs: list) -> list:
+    """
+    Score pairs with the black and red pegs swapped, as a wrong kernel.
+    """
+    return [score(secret, guess)[::-1] for secret, guess in pairs]
+
+
+class TestVerifyKernels(unittest.TestCase):
+    """
+    Test suite for the differential check of the scoring kernels.
+    """
+
+    def test_kernels_agree(self):
+        """
+        Test that every kernel agrees with the reference on every pair of a
+        small board and on random pairs of a large one.
+        """
+        small = verify_kernels.verify_board(5, 3, False)
+        self.assertTrue(small["exhaustive"])
+        self.assertEqual(small["pairs"], 60 * 60)
+        self.assertEqual(list(small["kernels"]),
+                         list(verify_kernels.KERNELS))
+        large = verify_kernels.verify_board(7, 4, True, samples=3000)
+        self.assertFalse(large["exhaustive"])
+        self.assertEqual(large["pairs"], 3000)
+        self.assertEqual(list(large["kernels"]),
+                         ["reference", "scoring", "bulk"])
+        for result in (small, large):
+            for figures in result["kernels"].values():
+                self.assertEqual(figures["mismatches"], 0)
+                self.assertGreater(figures["pairs_per_second"], 0)
+
+    def test_wrong_kernel_is_reported(self):
+        """
+        Test that a kernel giving wrong feedback is reported with its first
+        wrong pair.
+        """
+        verify_kernels.KERNELS["swapped"] = (swapped_kernel, True)
+        try:
+            result = verify_kernels.verify_board(4, 2, False)
+        finally:
+            del verify_kernels.KERNELS["swapped"]
+        figures = result["kernels"]["swapped"]
+        self.assertGreater(figures["mismatches"], 0)
+        secret, guess, wrong, expected = figures["first_mismatch"]
+        self.assertEqual(wrong, expected[::-1])
+        self.assertEqual(tuple(expected), score(tuple(secret), tuple(guess)))
+
+
+class TestMemoryDiagnostics(unittest.TestCase):
+    """
+    Test suite for the memory samples of long sessions.
+    """
+
+    def test_samples_and_trend(self):
+        """
+        Test that samples record the counts of the window and the lines
+        whose allocations grew, and that the trend is computed per game.
+        """
+        retained = []
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "memory.jsonl")
+            diagnostics = MemoryDiagnostics(path)
+            diagnostics.start()
+            try:
+                diagnostics.sample("start", {"turtles": 10,
+                                             "canvas_items": 50})
+                for game in range(1, 4):
+                    # a leak of one list of buffers per game
+                    retained.append([bytearray(1000) for _ in range(200)])
+                    diagnostics.sample("game", {
+                        "turtles": 10 + 30 * game,
+                        "canvas_items": 50 + 90 * game})
+            finally:
+                diagnostics.stop()
+            with open(path, 'a') as file:
+                file.write('{"event": "ga')
+            samples = read_samples(path)
+        self.assertEqual([sample["event"] for sample in samples],
+                         ["start", "game", "game", "game"])
+        self.assertEqual(samples[-1]["games"], 3)
+        # the leaking line of this file is reported
+        self.assertTrue(any(
+            os.path.basename(site["where"].rsplit(":", 1)[0]) ==
+            "test_mastermind_game.py" and site["size"] >= 200000
+            for site in samples[1]["growth"]))
+        result = trend(samples)
+        self.assertEqual(result["games"], 3)
+        self.assertEqual(result["per_game"]["turtles"], 30)
+        self.assertEqual(result["per_game"]["canvas_items"], 90)
+        self.assertGreater(result["per_game"]["traced"], 150000)
+
+
+class StubTurtle:
+    """
+    A turtle keeping its position and heading and counting its clears,
+    standing in for turtle.Turtle without a display.
+    """
+
+    def __init__(self):
+        self.position = (0, 0)
+        self.heading = 0
+        self.clears = 0
+        StubScreen.screen.created.append(self)
+
+    def __getattr__(self, name):
+        # drawing, styling and visibility only affect the display
+        return lambda *args, **kwargs: None
+
+    def clear(self):
+        self.clears += 1
+
+    def setpos(self, x, y):
+        self.position = (x, y)
+
+    def right(self, angle):
+        self.heading -= angle
+
+    def forward(self, distance):
+        x, y = self.position
+        self.position = (
+            x + distance * math.cos(math.radians(self.heading)),
+            y + distance * math.sin(math.radians(self.heading)))
+
+
+class StubScreen:
+    """
+    A screen answering every dialog with the same text, standing in for
+    turtle.Screen without a display.
+    """
+
+    screen = None
+
+    def __init__(self):
+        self.created = []
+        self.shapes = []
+        self.answer = "yes"
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    def getshapes(self):
+        return self.shapes
+
+    def addshape(self, path):
+        self.shapes.append(path)
+
+    def bgcolor(self):
+        return "white"
+
+    def textinput(self, title, prompt):
+        return self.answer
+
+    def turtles(self):
+        return self.created
+
+
+class StubTurtleModule:
+    """
+    The turtle module of a window without a display.
+    """
+
+    Turtle = StubTurtle
+
+    @staticmethod
+    def Screen():
+        return StubScreen.screen
+
+
+class TestPlayAgain(unittest.TestCase):
+    """
+    Test suite for starting a new game in the same window.
+    """
+
+    def test_new_game_resets_state(self):
+        """
+        Test that a new secret code starts a new game after a lost one,
+        for the local and the adversarial codemakers.
+        """
+        colors = ["red", "blue", "green", "yellow", "purple", "black"]
+        for state in (GameState(colors, rounds=2),
+                      AdversarialGameState(colors, rounds=2,
+                                           rng=random.Random(0))):
+            state.generate_secret_code()
+            while not state.is_over:
+                for color in colors[:4]:
+                    state.select(color)
+                state.check()
+                if not state.is_over:
+                    state.next_round()
+            self.assertTrue(state.is_over)
+            state.generate_secret_code()
+            self.assertEqual(state.round, 0)
+            self.assertEqual(len(state.history), 0)
+            self.assertEqual(state.selection_stack, [])
+            self.assertFalse(state.is_over or state.is_win)
+            self.assertTrue(state.select("red"))
+
+    def test_new_game_resets_window(self):
+        """
+        Test that playing again after a lost game clears the pens of the
+        board, the selection area and the hint, moves the arrow back to
+        the first row, and creates no turtle.
+        """
+        StubScreen.screen = StubScreen()
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(mastermind, "turtle", StubTurtleModule), \
+                mock.patch.object(mastermind.time, "sleep"):
+            path = os.path.join(directory, "leaderboard.txt")
+            with open(path, "w") as file:
+                file.write("3: Tong Cai\n")
+            colors = ["red", "blue", "green", "yellow", "purple", "black"]
+            window = mastermind.Mastermind(**parse_config(
+                f"leaderboard_path = {path}\n").mastermind_kwargs())
+            window.initilize_turtle()
+            window.generate_frame()
+            window.generate_check_button()
+            window.generate_x_button()
+            window.generate_quit_button()
+            window.generate_hint_button()
+            window.generate_marbles()
+            window.generate_regs()
+            window.generate_selections()
+            window.generate_arrow()
+            window.generate_leaderboard()
+            window.generate_secret_code()
+            start = window.arrow.position
+            window.show_hint(tuple(colors[:4]))
+            guess = colors[:4]
+            if guess == window.secret_code:
+                guess = colors[1:5]
+            # the game is lost, and the players do not play again at once
+            StubScreen.screen.answer = "no"
+            for _ in range(window.row_number):
+                for color in guess:
+                    window.click_selection_button(color)
+                window.click_check_button()
+            self.assertTrue(window.state.is_over)
+            self.assertNotEqual(window.arrow.position, start)
+            turtles = len(StubScreen.screen.turtles())
+            clears = {name: getattr(window, name).clears
+                      for name in ("board_pen", "selection_pen",
+                                   "hint_pen")}
+            window.new_game()
+            self.assertEqual(window.games, 1)
+            for name, count in clears.items():
+                self.assertGreater(getattr(window, name).clears, count)
+            self.assertEqual(window.round, 0)
+            self.assertEqual(window.arrow.position, start)
+            self.assertEqual(len(StubScreen.screen.turtles()), turtles)
+            self.assertFalse(window.state.is_over)
+
+
+class RecordingPen:
+    """
+    A pen recording what it writes, standing in for a turtle.
+    """
+
+    def __init__(self):
+        self.position = (0, 0)
+        self.written = []
+        self.clears = 0
+
+    def clear(self):
+        self.written = []
+        self.clears += 1
+
+    def color(self, color):
+        self.current_color = color
+
+    def penup(self):
+        pass
+
+    def setpos(self, x, y):
+        self.position = (x, y)
+
+    def write(self, text, font=None):
+        self.written.append((self.position, text, font, self.current_color))
+
+
+class TestTextLayer(unittest.TestCase):
+    """
+    Test suite for the text layer of the leaderboard.
+    """
+
+    def test_rewrites_only_changes(self):
+        """
+        Test that the rows are written one below the other with one pen,
+        and rewritten only when a row or the style changed.
+        """
+        pen = RecordingPen()
+        layer = TextLayer(pen=pen, x=100, y=300, spacing=50)
+        font = ("Arial", 18, "normal")
+        rows = ["Leaders: ", "3: Tong Cai", "5: Jenny Yi"]
+        self.assertTrue(layer.render(rows, font=font, color="blue"))
+        self.assertEqual([(position, text) for position, text, _, _
+                          in pen.written],
+                         [((100, 300), "Leaders: "),
+                          ((100, 250), "3: Tong Cai"),
+                          ((100, 200), "5: Jenny Yi")])
+        self.assertFalse(layer.render(list(rows), font=font, color="blue"))
+        self.assertEqual(pen.clears, 1)
+        rows.insert(1, "2: New Player")
+        self.assertTrue(layer.render(rows, font=font, color="blue"))
+        self.assertEqual(len(pen.written), 4)
+        self.assertTrue(layer.render(rows, font=font, color="red"))
+        self.assertEqual({color for _, _, _, color in pen.written}, {"red"})
+        layer.clear()
+        self.assertEqual(pen.written, [])
+        self.assertTrue(layer.render(rows, font=font, color="red"))
+
+
+class TestTerminalGame(unittest.TestCase):
+    """
+    Test suite for the terminal frontend.
+    """
+
+    def play(self, lines, path, seed=5):
+        """
+        Play a game of typed lines with a seeded secret code, returning the
+        secret code and the output.
+        """
+        config = MastermindConfig(leaderboard_path=path)
+        random.seed(seed)
+        secret = list(CodeSpace(list(config.colors)).sample())
+        random.seed(seed)
+        stdout = io.StringIO()
+        game = TerminalGame(config, stdin=io.StringIO(lines(secret)),
+                            stdout=stdout)
+        game.run()
+        return secret, stdout.getvalue()
+
+    def test_win_is_saved(self):
+        """
+        Test that a won game prints the pegs and saves the scores.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "leaderboard.txt")
+            open(path, 'w').close()
+            secret, output = self.play(
+                lambda secret: "Ann\nfoo\nred red blue green\n"
+                f"{' '.join(secret[::-1])}\n{','.join(secret)}\nno\n",
+                path)
+            self.assertEqual(leaderboard.read_leaderboard(path),
+                             [(2, "Ann")])
+        self.assertIn("unknown color: foo", output)
+        self.assertIn("pick 4 different colors", output)
+        self.assertIn("B B B B", output)
+        self.assertIn("You won in 2 rounds!", output)
+        self.assertIn("2: Ann", output)
+
+    def test_lose_reveals_secret(self):
+        """
+        Test that the secret code is shown after ten wrong guesses.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "leaderboard.txt")
+            secret, output = self.play(
+                lambda secret: "Ann\n" + f"{' '.join(secret[::-1])}\n" * 10,
+                path)
+            self.assertFalse(os.path.exists(path))
+        self.assertIn("Round 10/10>", output)
+        self.assertIn("The secret code was: " + " ".join(secret), output)
+
+    def test_parse_and_pegs(self):
+        """
+        Test that guesses are read as names or numbers and pegs are drawn
+        black first.
+        """
+        game = TerminalGame(MastermindConfig(), stdin=io.StringIO(),
+                            stdout=io.StringIO())
+        self.assertEqual(game.parse_guess("RED, 2 green 4"),
+                         ["red", "blue", "green", "yellow"])
+        with self.assertRaises(ValueError):
+            game.parse_guess("red blue green")
+        with self.assertRaises(ValueError):
+            game.parse_guess("red blue green 7")
+        self.assertEqual(game.format_pegs(1, 2), "B R R .")
+
+    def test_terminal_path_without_tkinter(self):
+        """
+        Test that the terminal frontend is imported without tkinter.
+        """
+        _, loads_tkinter = import_timing.measure(
+            import_timing.PATHS["terminal"], runs=1)
+        self.assertFalse(loads_tkinter)
+
+
 # This allows the test suite to be run from the command line
 if __name__ == '__main__':
     unittest.main()